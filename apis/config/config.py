@@ -8,6 +8,7 @@ class Config(BaseSettings):
     db_password: str = Field(env="DB_PASSWORD")
     db_host: str = Field(env="DB_HOST")
     db_port: int = Field(env="DB_PORT")
+    content_addressed_storage: bool = Field(default=False, env="CONTENT_ADDRESSED_STORAGE")
 
     class Config:
         env_file = ".env"
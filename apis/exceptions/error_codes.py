@@ -7,4 +7,5 @@ class ProductErrorCode(Enum):
 
 class FileErrorCode(Enum):
     FILE_NOT_FOUND = "FILE_NOT_FOUND"
-    INVALID_FILE_TYPE = "INVALID_FILE_TYPE"
\ No newline at end of file
+    INVALID_FILE_TYPE = "INVALID_FILE_TYPE"
+    UPLOAD_NOT_FOUND = "UPLOAD_NOT_FOUND"
\ No newline at end of file
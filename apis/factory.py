@@ -1,11 +1,20 @@
 
+from apis.config import config
 from apis.repositories import ProductsRepository
 from apis.repositories.files_repository import FilesRepository, ProductFilesRepository
+from apis.repositories.upload_sessions_repository import UploadSessionsRepository
 from apis.service import (
     ProductsService,
 )
 from apis.service.files_service import FilesService
+from apis.service.file_tree_sync import FileTreeSync
+from django.utils import timezone
+from libs.cache import LRUCache
 from libs.file_tree import FileTreeStructure
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
 
 class Factory:
     def __init__(self):
@@ -13,8 +22,15 @@ class Factory:
         self.__products_service = None
         self.__files_repository = None
         self.__product_files_repository = None
+        self.__upload_sessions_repository = None
         self.__files_service = None
         self.__file_tree = None
+        self.__file_tree_loaded_at = None
+        self.__file_tree_sync = None
+        self.__product_cache = None
+        # The first requests of a worker can race to build these; only one may load
+        self.__file_tree_lock = threading.Lock()
+        self.__file_tree_sync_lock = threading.Lock()
         
     def create_products_repository(self):
         if not self.__products_repository:
@@ -25,13 +41,16 @@ class Factory:
         if not self.__products_service:
             products_repo = self.create_products_repository()
             self.__products_service = ProductsService(
-                products_repository=products_repo
+                products_repository=products_repo,
+                cache=self.create_product_cache()
             )
         return self.__products_service
 
     def create_files_repository(self):
         if not self.__files_repository:
-            self.__files_repository = FilesRepository()
+            self.__files_repository = FilesRepository(
+                content_addressed=config.content_addressed_storage
+            )
         return self.__files_repository
     
     def create_product_files_repository(self):
@@ -39,6 +58,11 @@ class Factory:
             self.__product_files_repository = ProductFilesRepository()
         return self.__product_files_repository
     
+    def create_upload_sessions_repository(self):
+        if not self.__upload_sessions_repository:
+            self.__upload_sessions_repository = UploadSessionsRepository()
+        return self.__upload_sessions_repository
+    
     def create_files_service(self):
         if not self.__files_service:
             files_repo = self.create_files_repository()
@@ -49,15 +73,64 @@ class Factory:
                 files_repository=files_repo,
                 product_files_repository=product_files_repo,
                 products_repository=products_repo,
-                file_tree=file_tree
+                file_tree=file_tree,
+                tree_sync=self.create_file_tree_sync(),
+                product_cache=self.create_product_cache(),
+                upload_sessions_repository=self.create_upload_sessions_repository()
             )
         return self.__files_service
     
+    def create_product_cache(self):
+        if self.__product_cache is None:
+            # Per-process cache; the TTL bounds staleness against other workers
+            self.__product_cache = LRUCache(max_entries=10_000, ttl=60)
+        return self.__product_cache
+
     def create_file_tree(self):
-        if not self.__file_tree:
-            self.__file_tree = FileTreeStructure() 
+        if self.__file_tree is None:
+            with self.__file_tree_lock:
+                # Checked again: another thread may have loaded it while this one waited
+                if self.__file_tree is None:
+                    # Shared by every request thread; writers are serialized inside the tree.
+                    # Indexed so the search endpoint never walks the whole tree
+                    file_tree = FileTreeStructure(indexed=True)
+                    # Taken before reading, so rows committed meanwhile are caught by the first sync
+                    loaded_at = timezone.now()
+                    # Rebuild from earlier uploads; assigned only once loaded so a failure retries
+                    report = file_tree.bulk_load(self.create_files_repository().iter_tree_entries())
+                    logger.info(
+                        "Loaded file tree: %(files)d files, %(folders)d folders, "
+                        "%(skipped)d skipped in %(seconds).2fs", report
+                    )
+                    self.__file_tree_loaded_at = loaded_at
+                    self.__file_tree = file_tree
         return self.__file_tree
 
-    
+    def create_file_tree_sync(self):
+        if self.__file_tree_sync is None:
+            file_tree = self.create_file_tree()
+            with self.__file_tree_sync_lock:
+                if self.__file_tree_sync is None:
+                    # Catches this worker's tree up with uploads handled by other workers
+                    self.__file_tree_sync = FileTreeSync(
+                        files_repository=self.create_files_repository(),
+                        file_tree=file_tree,
+                        since=self.__file_tree_loaded_at,
+                    )
+        return self.__file_tree_sync
+
+    def warm_up(self):
+        """
+        Load the file tree and its sync before the first request needs them
+
+        Called from the WSGI/ASGI entry points, which management commands and
+        migrations never import. A failure is logged, not raised, so the
+        server still starts; the first request then loads the tree lazily.
+        """
+        try:
+            self.create_file_tree_sync()
+        except Exception:
+            logger.exception("Could not load the file tree at startup; the first request will load it")
+
 
 factory = Factory()
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apis.factory import factory
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete resumable upload sessions idle past their expiry, and their chunks; "
+        "run periodically, e.g. hourly from cron"
+    )
+
+    def handle(self, *args, **options):
+        expired = factory.create_files_service().expire_upload_sessions()
+        self.stdout.write(f"Expired {expired} upload sessions")
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apis.factory import factory
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete file move log entries old enough that every worker's tree sync has replayed them; "
+        "run periodically, e.g. daily from cron"
+    )
+
+    def handle(self, *args, **options):
+        pruned = factory.create_files_service().prune_move_log()
+        self.stdout.write(f"Pruned {pruned} file move log entries")
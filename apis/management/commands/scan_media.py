@@ -0,0 +1,83 @@
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apis.factory import factory
+from libs.file_tree import DirectoryScanner
+
+STATE_FILE_NAME = ".file_tree_scan.json"
+
+
+class Command(BaseCommand):
+    help = (
+        "Index files sitting in MEDIA_ROOT that have no files row, such as restores "
+        "and manual copies, so they appear in the file tree"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=8, help="Directories listed concurrently")
+        parser.add_argument("--batch-size", type=int, default=5000, help="Files added to the tree per batch")
+        parser.add_argument(
+            "--incremental", action="store_true",
+            help="Skip directories whose mtime is unchanged since the last scan",
+        )
+        parser.add_argument(
+            "--state", default=None,
+            help=f"Scan state file (default: MEDIA_ROOT/{STATE_FILE_NAME})",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Report new files without creating rows")
+
+    def handle(self, *args, **options):
+        root = str(settings.MEDIA_ROOT)
+        state_path = options["state"] or os.path.join(root, STATE_FILE_NAME)
+        state = self._load_state(state_path) if options["incremental"] else None
+
+        try:
+            scanner = DirectoryScanner(
+                root, workers=options["workers"], batch_size=options["batch_size"], state=state
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        files_repository = factory.create_files_repository()
+        # Uploads are stored under generated names; their rows already cover them
+        stored_paths = files_repository.stored_file_paths()
+        file_tree = factory.create_file_tree()
+
+        def register(nodes):
+            if not options["dry_run"]:
+                files_repository.register_stored_files(
+                    (node.path, node.size, node.mime_type) for node in nodes
+                )
+
+        try:
+            report = scanner.scan_into(file_tree, skip=stored_paths, on_added=register)
+        except FileNotFoundError as e:
+            raise CommandError(str(e))
+
+        if not options["dry_run"]:
+            self._save_state(state_path, scanner.state)
+        self.stdout.write(
+            "Scanned {files} files in {directories} directories "
+            "({unchanged_directories} unchanged, {errors} unreadable) in {seconds:.2f}s, "
+            "{files_per_second:.0f} files/s; {added} new, {skipped} already indexed or skipped".format(**report)
+        )
+
+    def _load_state(self, path):
+        try:
+            with open(path, encoding="utf-8") as state_file:
+                return json.load(state_file)
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            self.stderr.write(f"Ignoring unreadable scan state {path}; running a full scan")
+            return None
+
+    def _save_state(self, path, state):
+        # Written beside and renamed over the old file, so a crash never leaves it half written
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as state_file:
+            json.dump(state, state_file, separators=(",", ":"))
+        os.replace(temp_path, path)
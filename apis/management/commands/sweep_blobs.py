@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apis.factory import factory
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete content-addressed blob files that no blob row points to, such as those "
+        "staged by rolled back uploads; run periodically, e.g. daily from cron"
+    )
+
+    def handle(self, *args, **options):
+        removed = factory.create_files_service().sweep_blob_files()
+        self.stdout.write(f"Removed {removed} orphaned blob files")
@@ -0,0 +1,63 @@
+import io
+import os
+import tempfile
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from apis.factory import Factory
+from apis.models.files_model import FileModel
+
+
+class TestScanMediaCommand(TestCase):
+    def setUp(self):
+        """Set up a media root holding one uploaded file and two copied in by hand."""
+        self.media = tempfile.TemporaryDirectory()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media.name)
+        self.settings_override.enable()
+        for path in ("docs/0b6e.pdf", "docs/restored.pdf", "copied.txt"):
+            os.makedirs(os.path.join(self.media.name, os.path.dirname(path)), exist_ok=True)
+            with open(os.path.join(self.media.name, path), "wb") as f:
+                f.write(b"data")
+        FileModel.objects.create(
+            file_name="report.pdf", file_path="docs/0b6e.pdf", file_size=4,
+            file_type="application/pdf", file_data=b"",
+        )
+        # A fresh factory per run, as in a new management command process
+        self.factory_patch = patch("apis.management.commands.scan_media.factory", new_callable=Factory)
+        self.factory_patch.start()
+
+    def tearDown(self):
+        self.factory_patch.stop()
+        self.settings_override.disable()
+        self.media.cleanup()
+
+    def scan(self, *args):
+        out = io.StringIO()
+        call_command("scan_media", *args, stdout=out)
+        return out.getvalue()
+
+    def test_registers_unknown_files(self):
+        """Test files without rows get one whose tree path is their stored path, once."""
+        output = self.scan("--workers", "2")
+        self.assertIn("3 files", output)
+        self.assertIn("2 new", output)
+        rows = FileModel.objects.filter(file_data=b"").exclude(file_name="report.pdf")
+        self.assertEqual(
+            sorted(rows.values_list("file_name", "file_path", "file_size", "file_type")),
+            [("copied.txt", "copied.txt", 4, "text/plain"),
+             ("restored.pdf", "docs/restored.pdf", 4, "application/pdf")],
+        )
+        self.assertTrue(os.path.exists(os.path.join(self.media.name, ".file_tree_scan.json")))
+
+        self.factory_patch.stop()
+        self.factory_patch.start()
+        self.assertIn("0 new", self.scan("--incremental"))
+        self.assertEqual(FileModel.objects.count(), 3)
+
+    def test_dry_run(self):
+        """Test a dry run creates no rows and saves no state."""
+        self.assertIn("2 new", self.scan("--dry-run"))
+        self.assertEqual(FileModel.objects.count(), 1)
+        self.assertFalse(os.path.exists(os.path.join(self.media.name, ".file_tree_scan.json")))
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apis', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='filemodel',
+            index=models.Index(fields=['updated_at', 'id'], name='files_updated_at_id_idx'),
+        ),
+    ]
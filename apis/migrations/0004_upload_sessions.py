@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apis', '0003_file_blobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadSessionModel',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('file_name', models.CharField(max_length=255)),
+                ('folder_path', models.CharField(blank=True, default='', max_length=255)),
+                ('product_id', models.UUIDField(blank=True, null=True)),
+                ('file_type', models.CharField(blank=True, max_length=50, null=True)),
+                ('total_size', models.BigIntegerField()),
+                ('chunk_size', models.IntegerField()),
+                ('total_chunks', models.IntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('expires_at', models.DateTimeField()),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('file', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='apis.filemodel')),
+            ],
+            options={
+                'db_table': 'upload_sessions',
+                'indexes': [models.Index(fields=['expires_at'], name='upload_sess_expires_aebd1e_idx')],
+            },
+        ),
+    ]
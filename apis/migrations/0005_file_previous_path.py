@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apis', '0004_upload_sessions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='filemodel',
+            name='previous_file_name',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='filemodel',
+            name='previous_file_path',
+            field=models.CharField(blank=True, max_length=1024, null=True),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apis', '0005_file_previous_path'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='filemodel',
+            name='previous_file_name',
+        ),
+        migrations.RemoveField(
+            model_name='filemodel',
+            name='previous_file_path',
+        ),
+        migrations.CreateModel(
+            name='FileMoveModel',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('file_id', models.UUIDField()),
+                ('previous_tree_path', models.CharField(max_length=1280)),
+                ('file_size', models.BigIntegerField()),
+                ('file_created_at', models.DateTimeField()),
+                ('moved_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'file_moves',
+                'indexes': [models.Index(fields=['moved_at', 'id'], name='file_moves_moved_at_id_idx')],
+            },
+        ),
+    ]
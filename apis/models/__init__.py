@@ -1,5 +1,8 @@
 from .products_model import ProductModel
 from .product_files_model import ProductFileModel
 from .files_model import FileModel
+from .file_blobs_model import FileBlobModel
+from .upload_sessions_model import UploadSessionModel
+from .file_moves_model import FileMoveModel
 
-__all__ = ['ProductModel', 'ProductFileModel', 'FileModel']
\ No newline at end of file
+__all__ = ['ProductModel', 'ProductFileModel', 'FileModel', 'FileBlobModel', 'UploadSessionModel', 'FileMoveModel']
\ No newline at end of file
@@ -0,0 +1,15 @@
+from django.db import models
+
+
+class FileBlobModel(models.Model):
+    """Content stored once under a path derived from its SHA-256, shared by every file row with that content"""
+    digest = models.CharField(primary_key=True, max_length=64)
+    blob_path = models.CharField(max_length=1024)
+    size = models.BigIntegerField()
+    # Live file rows pointing here; the blob is reclaimed when it drops to zero
+    ref_count = models.IntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "file_blobs"
@@ -0,0 +1,32 @@
+from django.db import models
+import uuid
+
+
+class FileMoveModel(models.Model):
+    """
+    Append-only log of file rows leaving a tree path, one entry per row and move
+
+    Other workers replay it in order to drop the entries moved files left
+    behind, including moves made between two of their polls.
+    """
+    id = models.UUIDField(primary_key=True, editable=False)
+    # Not a foreign key: entries outlive the rows they describe until pruned
+    file_id = models.UUIDField()
+    previous_tree_path = models.CharField(max_length=1280)
+    # The moved row's size and creation time, to tell its tree entry from a newer file at the same path
+    file_size = models.BigIntegerField()
+    file_created_at = models.DateTimeField()
+    moved_at = models.DateTimeField()
+
+    # Auto create uuid
+    def save(self, *args, **kwargs):
+        if not self.id:
+            self.id = uuid.uuid4()
+        super().save(*args, **kwargs)
+
+    class Meta:
+        db_table = "file_moves"
+        indexes = [
+            # Keyset scans for cross-worker file tree sync
+            models.Index(fields=["moved_at", "id"], name="file_moves_moved_at_id_idx"),
+        ]
@@ -9,6 +9,12 @@ class FileModel(models.Model):
     file_size = models.BigIntegerField()
     file_type = models.CharField(max_length=100)
     file_data = models.BinaryField()
+    # SHA-256 of the content, hex encoded
+    digest = models.CharField(max_length=64, null=True, blank=True)
+    # Shared content in content-addressed mode; file_path then only names the tree folder
+    blob = models.ForeignKey(
+        "FileBlobModel", null=True, blank=True, on_delete=models.SET_NULL, related_name="files"
+    )
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -27,4 +33,6 @@ class FileModel(models.Model):
         indexes = [
             models.Index(fields=["file_name"]),
             models.Index(fields=["created_at"]),
+            # Keyset scans for cross-worker file tree sync
+            models.Index(fields=["updated_at", "id"], name="files_updated_at_id_idx"),
         ]
\ No newline at end of file
@@ -0,0 +1,36 @@
+from django.db import models
+import uuid
+
+
+class UploadSessionModel(models.Model):
+    """A resumable upload: the target file's metadata while its chunks arrive"""
+    id = models.UUIDField(primary_key=True, editable=False)
+    file_name = models.CharField(max_length=255)
+    folder_path = models.CharField(max_length=255, blank=True, default="")
+    product_id = models.UUIDField(null=True, blank=True)
+    file_type = models.CharField(max_length=50, null=True, blank=True)
+    total_size = models.BigIntegerField()
+    chunk_size = models.IntegerField()
+    total_chunks = models.IntegerField()
+    # The file created on completion
+    file = models.ForeignKey(
+        "FileModel", null=True, blank=True, on_delete=models.SET_NULL, related_name="+"
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Pushed back by every chunk; the sweeper removes sessions past it
+    expires_at = models.DateTimeField()
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    # Auto create uuid
+    def save(self, *args, **kwargs):
+        if not self.id:
+            self.id = uuid.uuid4()
+        super().save(*args, **kwargs)
+
+    class Meta:
+        db_table = "upload_sessions"
+        indexes = [
+            models.Index(fields=["expires_at"]),
+        ]
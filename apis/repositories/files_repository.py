@@ -1,26 +1,407 @@
 from libs.repositories.base_repository import BaseRepository
 from apis.models.files_model import FileModel
+from apis.models.file_blobs_model import FileBlobModel
+from apis.models.file_moves_model import FileMoveModel
 from apis.models.product_files_model import ProductFileModel
+import hashlib
+import logging
 import os
+import re
+import time
 import uuid
+from collections import Counter, defaultdict
+from datetime import timedelta
+from typing import Callable
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q, Value
+from django.db.models.functions import Concat, Substr
+from django.utils import timezone
 from django.core.files.storage import default_storage
-from django.core.files.base import ContentFile
+from django.core.files.base import File
+from apis.exceptions import BadRequestException
+
+logger = logging.getLogger(__name__)
+
+
+# Bytes read from an upload and written to storage at a time
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Content-addressed blobs live under MEDIA_ROOT/blobs/
+BLOBS_DIR = "blobs"
+
+# Blob files younger than this may belong to a transaction still in flight, so sweeps keep them
+BLOB_SWEEP_GRACE = timedelta(hours=1)
+
+
+class _DigestingFile(File):
+    """
+    Upload wrapper whose chunks() feeds a running size and SHA-256 checksum
+    
+    It hides the upload's temporary_file_path, so storage copies a spooled
+    upload through chunks() instead of renaming it unread.
+    """
+    
+    def __init__(self, uploaded_file):
+        super().__init__(uploaded_file, name=uploaded_file.name)
+        self.sha256 = hashlib.sha256()
+        self.bytes_read = 0
+    
+    def chunks(self, chunk_size=None):
+        # File.chunks reads through the wrapped file; InMemoryUploadedFile.chunks
+        # would hand over one copy of the whole upload
+        for chunk in super().chunks(UPLOAD_CHUNK_SIZE):
+            self.sha256.update(chunk)
+            self.bytes_read += len(chunk)
+            yield chunk
+
+
+def blob_path_for(digest: str) -> str:
+    """Storage path of the content with a SHA-256 digest, fanned out over two folder levels"""
+    return f"{BLOBS_DIR}/{digest[:2]}/{digest[2:4]}/{digest}"
+
+
+def _digest_upload(uploaded_file):
+    """SHA-256 hex digest and size of an upload, read in chunks without writing it anywhere"""
+    content = _DigestingFile(uploaded_file)
+    for _ in content.chunks():
+        pass
+    return content.sha256.hexdigest(), content.bytes_read
+
+
+def to_tree_path(file_name: str, file_path: str) -> str:
+    """Tree path of a stored file: its storage folder plus its original name"""
+    # Uploads are stored as <folder>/<uuid><ext> but shown as <folder>/<original name>
+    folder = os.path.dirname(file_path)
+    return f"{folder}/{file_name}" if folder else file_name
+
+
+def _tree_path_filter(path: str, is_directory: bool) -> Q:
+    """Live rows shown at a tree path: anywhere below it for a folder, at it for a file"""
+    if is_directory:
+        return Q(deleted_at=None, file_path__startswith=f"{path}/")
+    folder, _, name = path.rpartition('/')
+    stored_in_folder = f"^{re.escape(folder + '/')}[^/]+$" if folder else "^[^/]+$"
+    return Q(deleted_at=None, file_name=name, file_path__regex=stored_in_folder)
 
 
 class FilesRepository(BaseRepository):
     """Repository for file operations"""
     
-    def __init__(self):
+    def __init__(self, content_addressed: bool = False):
+        """
+        Initialize the repository
+        
+        Args:
+            content_addressed: Store each distinct content once as a shared blob
+        """
         super().__init__(FileModel)
+        self.content_addressed = content_addressed
     
     def create_file_record(self, file_data: dict) -> FileModel:
         """Create a new file record in the database"""
         return self.create(file_data)
     
+    def iter_tree_entries(self, chunk_size: int = 2000):
+        """
+        Stream live files as FileTreeStructure.bulk_load entries
+        
+        Rows are fetched in chunks through a server-side cursor and only the
+        name, path, size and timestamp columns are selected, never file_data.
+        
+        Args:
+            chunk_size: Rows fetched per database round trip
+            
+        Returns:
+            Iterator of (tree path, file size, created_at, updated_at) tuples
+        """
+        rows = (
+            FileModel.objects.filter(deleted_at=None)
+            .order_by()
+            .values_list("file_name", "file_path", "file_size", "created_at", "updated_at")
+            .iterator(chunk_size=chunk_size)
+        )
+        for file_name, file_path, file_size, created_at, updated_at in rows:
+            yield to_tree_path(file_name, file_path), file_size, created_at, updated_at
+    
+    def stored_file_paths(self) -> set:
+        """Storage paths referenced by any row, deleted or not, and every blob path"""
+        paths = set(FileModel.objects.order_by().values_list("file_path", flat=True).iterator(chunk_size=2000))
+        paths.update(FileBlobModel.objects.order_by().values_list("blob_path", flat=True).iterator(chunk_size=2000))
+        return paths
+    
+    def register_stored_files(self, entries, batch_size: int = 1000) -> int:
+        """
+        Create rows for files already sitting in storage
+        
+        The stored path doubles as the tree path: file_name is its last
+        segment, so to_tree_path maps the row back to the same path.
+        
+        Args:
+            entries: Iterable of (storage path, file size, MIME type)
+            batch_size: Rows per INSERT
+            
+        Returns:
+            Number of rows created
+        """
+        records = [
+            FileModel(
+                id=uuid.uuid4(),
+                file_name=os.path.basename(file_path),
+                file_path=file_path,
+                file_size=file_size,
+                file_type=file_type,
+                file_data=b"",
+            )
+            for file_path, file_size, file_type in entries
+        ]
+        FileModel.objects.bulk_create(records, batch_size=batch_size)
+        return len(records)
+    
+    def find_changes_after(self, updated_at, file_id=None, limit: int = 500) -> list:
+        """
+        Fetch one batch of rows changed after an (updated_at, id) watermark
+        
+        Rows come back oldest first in (updated_at, id) order, so the last row
+        of a batch is the watermark for the next one. The keyset filter is
+        served by the files_updated_at_id_idx index; deleted rows are included
+        so callers can see soft deletes.
+        
+        Args:
+            updated_at: Watermark timestamp
+            file_id: Watermark id; None returns every row with updated_at >= the timestamp
+            limit: Maximum rows in the batch
+            
+        Returns:
+            List of (id, file_name, file_path, file_size, created_at, updated_at, deleted_at) tuples
+        """
+        if file_id is None:
+            changed = Q(updated_at__gte=updated_at)
+        else:
+            changed = Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, id__gt=file_id)
+        return list(
+            FileModel.objects.filter(changed)
+            .order_by("updated_at", "id")
+            .values_list(
+                "id", "file_name", "file_path", "file_size", "created_at", "updated_at", "deleted_at"
+            )[:limit]
+        )
+    
+    def find_moves_after(self, moved_at, move_id=None, limit: int = 500) -> list:
+        """
+        Fetch one batch of the move log past a (moved_at, id) watermark
+        
+        Works like find_changes_after, over the file_moves_moved_at_id_idx index.
+        
+        Args:
+            moved_at: Watermark timestamp
+            move_id: Watermark id; None returns every entry with moved_at >= the timestamp
+            limit: Maximum entries in the batch
+            
+        Returns:
+            List of (id, file_id, previous_tree_path, file_size, file_created_at, moved_at) tuples
+        """
+        if move_id is None:
+            moved = Q(moved_at__gte=moved_at)
+        else:
+            moved = Q(moved_at__gt=moved_at) | Q(moved_at=moved_at, id__gt=move_id)
+        return list(
+            FileMoveModel.objects.filter(moved)
+            .order_by("moved_at", "id")
+            .values_list("id", "file_id", "previous_tree_path", "file_size", "file_created_at", "moved_at")[:limit]
+        )
+    
+    def delete_moves_before(self, moved_at) -> int:
+        """Prune move log entries older than moved_at; returns how many were deleted"""
+        return FileMoveModel.objects.filter(moved_at__lt=moved_at).delete()[0]
+    
+    def soft_delete_tree_path(self, path: str, is_directory: bool) -> int:
+        """
+        Soft delete every live row at a tree path in one UPDATE
+        
+        updated_at is bumped too, so other workers' tree syncs see the change.
+        
+        Args:
+            path: Tree path of a file or folder
+            is_directory: Whether path is a folder
+            
+        Returns:
+            Number of rows deleted
+        """
+        now = timezone.now()
+        rows = FileModel.objects.filter(_tree_path_filter(path, is_directory))
+        # Locked so a concurrent delete of the same rows cannot release their blobs twice
+        released = Counter(rows.exclude(blob=None).select_for_update().values_list("blob_id", flat=True))
+        count = rows.update(deleted_at=now, updated_at=now)
+        if released:
+            self._release_blobs(released)
+        return count
+    
+    def _release_blobs(self, released: Counter):
+        """
+        Drop references to blobs and reclaim those left unreferenced
+        
+        Must run inside the caller's transaction. Blob rows are locked and
+        deleted, so an upload of the same content waits for the commit and
+        then stores the content again; the files are only removed once the
+        transaction commits, so a rollback keeps every file its rows point to.
+        """
+        by_count = defaultdict(list)
+        for digest, count in released.items():
+            by_count[count].append(digest)
+        for count, digests in by_count.items():
+            FileBlobModel.objects.filter(digest__in=digests).update(ref_count=F("ref_count") - count)
+        
+        unreferenced = list(
+            FileBlobModel.objects.select_for_update().filter(digest__in=list(released), ref_count__lte=0)
+        )
+        FileBlobModel.objects.filter(digest__in=[blob.digest for blob in unreferenced]).delete()
+        if unreferenced:
+            reclaimed = [(blob.digest, blob.blob_path) for blob in unreferenced]
+            transaction.on_commit(lambda: self._remove_blob_files(reclaimed))
+    
+    def _remove_blob_files(self, reclaimed):
+        """
+        Delete the files of reclaimed blobs, given as (digest, blob path) pairs
+        
+        An upload may have stored the same content since the commit; its
+        blob has a row again and keeps its file.
+        """
+        restored = set(
+            FileBlobModel.objects.filter(digest__in=[digest for digest, _ in reclaimed])
+            .values_list("digest", flat=True)
+        )
+        for digest, blob_path in reclaimed:
+            if digest in restored:
+                continue
+            try:
+                if default_storage.exists(blob_path):
+                    default_storage.delete(blob_path)
+            except OSError:
+                logger.exception("Could not remove reclaimed blob %s", blob_path)
+    
+    def sweep_blob_files(self, older_than: timedelta = BLOB_SWEEP_GRACE) -> int:
+        """
+        Delete blob files no blob row points to, and abandoned temporary ones
+        
+        Transactions that roll back after staging new content leave temporary
+        files behind, and a process that dies right after a commit can leave
+        a reclaimed blob's file. Files modified within older_than are kept.
+        
+        Args:
+            older_than: Minimum age of a file before it is deleted
+            
+        Returns:
+            Number of files deleted
+        """
+        cutoff = time.time() - older_than.total_seconds()
+        orphans, by_digest = [], {}
+        for folder, _, names in os.walk(default_storage.path(BLOBS_DIR)):
+            for name in names:
+                path = os.path.join(folder, name)
+                try:
+                    if os.stat(path).st_mtime >= cutoff:
+                        continue
+                except FileNotFoundError:
+                    continue
+                if name.startswith('.'):
+                    orphans.append(path)  # Staged content; published ones are renamed away
+                else:
+                    by_digest[name] = path
+        
+        digests = list(by_digest)
+        for start in range(0, len(digests), 1000):
+            batch = digests[start:start + 1000]
+            stored = set(FileBlobModel.objects.filter(digest__in=batch).values_list("digest", flat=True))
+            orphans.extend(by_digest[digest] for digest in batch if digest not in stored)
+        
+        removed = 0
+        for path in orphans:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            removed += 1
+        return removed
+    
+    def move_tree_path(self, path: str, new_path: str, is_directory: bool) -> int:
+        """
+        Re-point every live row at a tree path to a new path in one UPDATE
+        
+        file_path keeps the stored name and swaps its folder prefix; a file
+        also takes the new name as file_name. Each row's old tree path is
+        appended to the move log for other workers' tree sync. The stored
+        files are moved to match once the transaction commits, so a rollback
+        leaves them where the rows point.
+        
+        Args:
+            path: Current tree path of a file or folder
+            new_path: Tree path it moves to
+            is_directory: Whether path is a folder
+            
+        Returns:
+            Number of rows updated
+        """
+        if is_directory:
+            old_prefix, new_prefix = f"{path}/", f"{new_path}/"
+        else:
+            old_folder = path.rpartition('/')[0]
+            new_folder = new_path.rpartition('/')[0]
+            old_prefix = f"{old_folder}/" if old_folder else ""
+            new_prefix = f"{new_folder}/" if new_folder else ""
+        
+        now = timezone.now()
+        rows = FileModel.objects.filter(_tree_path_filter(path, is_directory))
+        # Locked so a concurrent move of the same rows cannot log a path they no longer have
+        moved = list(
+            rows.select_for_update().values_list("id", "file_name", "file_path", "file_size", "created_at")
+        )
+        updates = {
+            "file_path": Concat(Value(new_prefix), Substr("file_path", len(old_prefix) + 1)),
+            "updated_at": now,
+        }
+        if not is_directory:
+            updates["file_name"] = new_path.rpartition('/')[2]
+        count = rows.update(**updates)
+        FileMoveModel.objects.bulk_create(
+            [
+                FileMoveModel(
+                    id=uuid.uuid4(), file_id=file_id, previous_tree_path=to_tree_path(file_name, file_path),
+                    file_size=file_size, file_created_at=created_at, moved_at=now,
+                )
+                for file_id, file_name, file_path, file_size, created_at in moved
+            ],
+            batch_size=1000,
+        )
+        
+        moves = [(file_path, new_prefix + file_path[len(old_prefix):]) for _, _, file_path, _, _ in moved]
+        transaction.on_commit(lambda: self._move_stored_files(moves))
+        return count
+    
+    def _move_stored_files(self, moves):
+        """Move stored files within local storage; a failure is logged and the rest still move"""
+        for old_path, new_path in moves:
+            try:
+                self._move_stored_file(old_path, new_path)
+            except OSError:
+                logger.exception("Could not move stored file %s to %s", old_path, new_path)
+    
+    def _move_stored_file(self, old_path: str, new_path: str):
+        """Move a stored file within local storage, if it exists"""
+        source = default_storage.path(old_path)
+        if old_path == new_path or not os.path.exists(source):
+            return
+        target = default_storage.path(new_path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(source, target)
+    
     def save_uploaded_file(self, uploaded_file, folder_path: str = "") -> dict:
         """
         Save uploaded file to local storage and return file info
         
+        The upload is streamed to storage in UPLOAD_CHUNK_SIZE chunks, and
+        its size and SHA-256 checksum are taken from the same chunks, so
+        memory per upload stays at one chunk whatever the file size.
+        
         Args:
             uploaded_file: Django UploadedFile object
             folder_path: Optional folder path within media directory
@@ -38,18 +419,166 @@ class FilesRepository(BaseRepository):
         else:
             full_path = unique_filename
         
-        # Save file to storage
-        file_path = default_storage.save(full_path, ContentFile(uploaded_file.read()))
+        if self.content_addressed:
+            return self._save_blob_reference(uploaded_file, full_path, unique_filename)
         
-        # Get file size
-        file_size = default_storage.size(file_path)
+        # Save file to storage
+        content = _DigestingFile(uploaded_file)
+        file_path = default_storage.save(full_path, content)
         
         return {
             'original_name': uploaded_file.name,
             'stored_name': unique_filename,
             'file_path': file_path,
-            'file_size': file_size,
+            'file_size': content.bytes_read,
+            'checksum': content.sha256.hexdigest(),
             'content_type': uploaded_file.content_type or 'application/octet-stream',
+            'blob_digest': None,
+            'deduplicated': False,
+        }
+    
+    def _save_blob_reference(self, uploaded_file, full_path: str, unique_filename: str) -> dict:
+        """
+        Content-addressed save: reference the blob holding this content, storing it first if new
+        
+        The upload is hashed before anything is written, so a duplicate costs
+        one primary key lookup and a reference count bump. file_path keeps the
+        generated name under the folder only to place the file in the tree;
+        nothing is stored there.
+        """
+        digest, size = _digest_upload(uploaded_file)
+        blob, created = self._acquire_blob(
+            digest, size, lambda temp_path: self._write_blob(uploaded_file, temp_path, digest)
+        )
+        return {
+            'original_name': uploaded_file.name,
+            'stored_name': unique_filename,
+            'file_path': full_path,
+            'file_size': size,
+            'checksum': digest,
+            'content_type': uploaded_file.content_type or 'application/octet-stream',
+            'blob_digest': blob.digest,
+            'deduplicated': not created,
+        }
+    
+    @transaction.atomic
+    def _acquire_blob(self, digest: str, size: int, write: Callable[[str], str]):
+        """
+        Add one reference to the blob for digest, creating it if missing
+        
+        Args:
+            digest: SHA-256 hex digest of the content
+            size: Content size in bytes
+            write: Stores the content at a storage path and returns the path
+                used; called only when the blob has no file
+            
+        Returns:
+            (blob, whether it was created)
+        """
+        blob = FileBlobModel.objects.select_for_update().filter(digest=digest).first()
+        if blob is not None:
+            FileBlobModel.objects.filter(digest=digest).update(ref_count=F("ref_count") + 1)
+            # A stat, not a write; restores content whose file went missing
+            if not default_storage.exists(blob.blob_path):
+                self._stage_blob_file(blob.blob_path, write)
+            return blob, False
+        
+        try:
+            # Savepoint, so losing a race to create the same blob leaves the transaction usable
+            with transaction.atomic():
+                blob = FileBlobModel.objects.create(
+                    digest=digest, blob_path=blob_path_for(digest), size=size, ref_count=1
+                )
+        except IntegrityError:
+            return self._acquire_blob(digest, size, write)
+        self._stage_blob_file(blob.blob_path, write)
+        return blob, True
+    
+    def _stage_blob_file(self, blob_path: str, write: Callable[[str], str]):
+        """
+        Have write store content beside blob_path, renamed into place once the transaction commits
+        
+        Until then the content sits in a hidden temporary file, which scans
+        skip; one left by a rolled back transaction is removed by
+        sweep_blob_files.
+        """
+        folder, name = os.path.split(blob_path)
+        temp_path = write(f"{folder}/.{name}.{uuid.uuid4().hex}.tmp")
+        transaction.on_commit(lambda: self._publish_blob_file(temp_path, blob_path))
+    
+    def _publish_blob_file(self, temp_path: str, blob_path: str):
+        """Rename staged content to its blob path"""
+        try:
+            os.replace(default_storage.path(temp_path), default_storage.path(blob_path))
+        except OSError:
+            logger.exception("Could not publish blob %s", blob_path)
+    
+    def _publish_assembled_file(self, move_into: Callable[[str], str], stored_path: str):
+        """Rename an assembled file to its storage path"""
+        try:
+            move_into(stored_path)
+        except OSError:
+            logger.exception("Could not publish assembled file %s", stored_path)
+    
+    def _write_blob(self, uploaded_file, temp_path: str, digest: str) -> str:
+        """Stream an upload to temp_path, checking it still hashes to digest; returns the path used"""
+        content = _DigestingFile(uploaded_file)
+        temp_path = default_storage.save(temp_path, content)
+        if content.sha256.hexdigest() != digest:
+            default_storage.delete(temp_path)
+            raise BadRequestException("File changed while it was being stored")
+        return temp_path
+    
+    def store_assembled_file(
+        self, source_path: str, original_name: str, folder_path: str,
+        content_type: str, digest: str, size: int,
+    ) -> dict:
+        """
+        Move a fully assembled local file into storage, as save_uploaded_file stores an upload
+        
+        The file is renamed into place, not copied, once the transaction
+        commits; until then it stays at source_path, so a rollback leaves
+        nothing in storage. In content-addressed mode it is dropped instead
+        when its content is already stored.
+        
+        Args:
+            source_path: Absolute path of the assembled file, on the storage filesystem
+            original_name: Client-side file name
+            folder_path: Optional folder path within media directory
+            content_type: MIME type reported by the client
+            digest: SHA-256 hex digest of the file
+            size: File size in bytes
+            
+        Returns:
+            Dictionary with file information, shaped like save_uploaded_file's
+        """
+        unique_filename = f"{uuid.uuid4()}{os.path.splitext(original_name)[1]}"
+        full_path = os.path.join(folder_path, unique_filename) if folder_path else unique_filename
+        
+        def move_into(stored_path):
+            target = default_storage.path(stored_path)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(source_path, target)
+            return stored_path
+        
+        blob_digest, deduplicated = None, False
+        if self.content_addressed:
+            blob, created = self._acquire_blob(digest, size, move_into)
+            blob_digest, deduplicated = blob.digest, not created
+            if os.path.exists(source_path):
+                os.remove(source_path)
+        else:
+            transaction.on_commit(lambda: self._publish_assembled_file(move_into, full_path))
+        
+        return {
+            'original_name': original_name,
+            'stored_name': unique_filename,
+            'file_path': full_path,
+            'file_size': size,
+            'checksum': digest,
+            'content_type': content_type or 'application/octet-stream',
+            'blob_digest': blob_digest,
+            'deduplicated': deduplicated,
         }
     
     
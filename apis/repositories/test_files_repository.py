@@ -0,0 +1,231 @@
+import hashlib
+import os
+import tempfile
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile, TemporaryUploadedFile
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apis.models.file_blobs_model import FileBlobModel
+from apis.models.files_model import FileModel
+from apis.repositories.files_repository import (
+    UPLOAD_CHUNK_SIZE,
+    FilesRepository,
+    _DigestingFile,
+    blob_path_for,
+)
+
+
+class TestFilesRepository(TestCase):
+    def setUp(self):
+        """Set up file rows as uploads store them."""
+        self.repository = FilesRepository()
+        FileModel.objects.create(
+            file_name="report.pdf", file_path="docs/2024/0b6e.pdf", file_size=10,
+            file_type="application/pdf", file_data=b"",
+        )
+        FileModel.objects.create(
+            file_name="logo.png", file_path="9f1c.png", file_size=20,
+            file_type="image/png", file_data=b"",
+        )
+        FileModel.objects.create(
+            file_name="gone.txt", file_path="docs/77aa.txt", file_size=30,
+            file_type="text/plain", file_data=b"", deleted_at=timezone.now(),
+        )
+
+    def test_iter_tree_entries(self):
+        """Test live rows stream as tree paths under their original names."""
+        entries = sorted(self.repository.iter_tree_entries(chunk_size=1))
+        self.assertEqual([(path, size) for path, size, _, _ in entries], [
+            ("docs/2024/report.pdf", 10),
+            ("logo.png", 20),
+        ])
+        self.assertIsNotNone(entries[0][2])
+
+
+class TestSaveUploadedFile(TestCase):
+    def setUp(self):
+        self.media = tempfile.TemporaryDirectory()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media.name)
+        self.settings_override.enable()
+        self.repository = FilesRepository()
+        self.data = bytes(range(256)) * 1000
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.media.cleanup()
+
+    def test_streams_spooled_and_in_memory_uploads(self):
+        """Test both upload kinds are stored whole, with size and checksum taken on the way."""
+        spooled = TemporaryUploadedFile("big.bin", "application/octet-stream", len(self.data), None)
+        spooled.write(self.data)
+        for upload in (spooled, SimpleUploadedFile("small.bin", self.data)):
+            info = self.repository.save_uploaded_file(upload, "docs")
+            self.assertEqual(info["file_size"], len(self.data))
+            self.assertEqual(info["checksum"], hashlib.sha256(self.data).hexdigest())
+            with default_storage.open(info["file_path"]) as stored:
+                self.assertEqual(stored.read(), self.data)
+        # Copied through chunks(), never moved out from under the upload handler
+        self.assertTrue(os.path.exists(spooled.temporary_file_path()))
+        spooled.close()
+
+    def test_reads_in_fixed_size_chunks(self):
+        """Test storage only ever sees chunks of at most UPLOAD_CHUNK_SIZE bytes."""
+        content = _DigestingFile(SimpleUploadedFile("a.bin", self.data))
+        sizes = [len(chunk) for chunk in content.chunks()]
+        self.assertEqual(max(sizes), UPLOAD_CHUNK_SIZE)
+        self.assertEqual(sum(sizes), content.bytes_read)
+
+
+    def test_assembled_file_moves_only_on_commit(self):
+        """Test an assembled file stays where it is until the transaction commits."""
+        digest = hashlib.sha256(self.data).hexdigest()
+        source = os.path.join(self.media.name, "assembled.tmp")
+        with open(source, "wb") as f:
+            f.write(self.data)
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                info = self.repository.store_assembled_file(source, "a.bin", "docs", None, digest, len(self.data))
+                raise RuntimeError("registering the file failed")
+        self.assertEqual(callbacks, [])
+        self.assertTrue(os.path.exists(source))
+        self.assertFalse(default_storage.exists(info["file_path"]))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            info = self.repository.store_assembled_file(source, "a.bin", "docs", None, digest, len(self.data))
+            self.assertTrue(os.path.exists(source))
+        self.assertFalse(os.path.exists(source))
+        with default_storage.open(info["file_path"]) as stored:
+            self.assertEqual(stored.read(), self.data)
+
+
+class TestContentAddressedStorage(TestCase):
+    def setUp(self):
+        self.media = tempfile.TemporaryDirectory()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media.name)
+        self.settings_override.enable()
+        self.repository = FilesRepository(content_addressed=True)
+        self.data = b"same logo" * 1000
+        self.digest = hashlib.sha256(self.data).hexdigest()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.media.cleanup()
+
+    def upload(self, name, folder):
+        """Save an upload and create its row, as the upload service does, and commit."""
+        with self.captureOnCommitCallbacks(execute=True):
+            info = self.repository.save_uploaded_file(SimpleUploadedFile(name, self.data), folder)
+            self.repository.create_file_record({
+                'file_name': info['original_name'], 'file_path': info['file_path'],
+                'file_size': info['file_size'], 'file_type': info['content_type'], 'file_data': b'',
+                'digest': info['checksum'], 'blob_id': info['blob_digest'],
+            })
+        return info
+
+    def delete(self, path, is_directory):
+        """Soft delete a tree path and commit."""
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.repository.soft_delete_tree_path(path, is_directory)
+
+    def test_duplicates_share_one_blob(self):
+        """Test a duplicate upload references the stored blob without writing anything."""
+        first = self.upload("logo.png", "products/a")
+        with patch.object(FilesRepository, "_write_blob") as write_blob:
+            second = self.upload("logo-copy.png", "products/b")
+        write_blob.assert_not_called()
+
+        self.assertEqual((first["deduplicated"], second["deduplicated"]), (False, True))
+        self.assertEqual(first["checksum"], self.digest)
+        blob = FileBlobModel.objects.get(digest=self.digest)
+        self.assertEqual((blob.blob_path, blob.size, blob.ref_count), (blob_path_for(self.digest), len(self.data), 2))
+        with default_storage.open(blob.blob_path) as stored:
+            self.assertEqual(stored.read(), self.data)
+        self.assertEqual(sorted(os.listdir(os.path.dirname(default_storage.path(blob.blob_path)))), [self.digest])
+        self.assertIn(blob.blob_path, self.repository.stored_file_paths())
+
+    def test_deletes_reclaim_unreferenced_blobs(self):
+        """Test the blob outlives its first deleted reference and goes with the last one."""
+        self.upload("logo.png", "products/a")
+        self.upload("logo.png", "products/b")
+        blob_path = blob_path_for(self.digest)
+
+        self.assertEqual(self.delete("products/a", True), 1)
+        self.assertEqual(FileBlobModel.objects.get(digest=self.digest).ref_count, 1)
+        self.assertTrue(default_storage.exists(blob_path))
+
+        self.assertEqual(self.delete("products/b/logo.png", False), 1)
+        self.assertFalse(FileBlobModel.objects.filter(digest=self.digest).exists())
+        self.assertFalse(default_storage.exists(blob_path))
+
+        # Deleting again releases nothing twice; a new upload stores the content afresh
+        self.assertEqual(self.delete("products/b/logo.png", False), 0)
+        self.assertFalse(self.upload("logo.png", "products/c")["deduplicated"])
+        self.assertTrue(default_storage.exists(blob_path))
+
+    def test_missing_blob_content_is_restored(self):
+        """Test a blob row whose file went missing gets its content back from the next upload."""
+        self.upload("logo.png", "products/a")
+        default_storage.delete(blob_path_for(self.digest))
+        self.assertTrue(self.upload("logo.png", "products/b")["deduplicated"])
+        with default_storage.open(blob_path_for(self.digest)) as stored:
+            self.assertEqual(stored.read(), self.data)
+
+    def test_assembled_file_is_moved_or_dropped(self):
+        """Test an assembled file becomes the blob when new and is deleted when a duplicate."""
+        for expected_deduplicated in (False, True):
+            source = os.path.join(self.media.name, "assembled.tmp")
+            with open(source, "wb") as f:
+                f.write(self.data)
+            with self.captureOnCommitCallbacks(execute=True):
+                info = self.repository.store_assembled_file(
+                    source, "logo.png", "products", "image/png", self.digest, len(self.data)
+                )
+            self.assertEqual(info["deduplicated"], expected_deduplicated)
+            self.assertFalse(os.path.exists(source))
+        self.assertEqual(FileBlobModel.objects.get(digest=self.digest).ref_count, 2)
+        with default_storage.open(blob_path_for(self.digest)) as stored:
+            self.assertEqual(stored.read(), self.data)
+
+    def test_rolled_back_upload_leaves_only_a_staged_file(self):
+        """Test content stored by a rolled back upload never reaches the blob path and is swept."""
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                self.repository.save_uploaded_file(SimpleUploadedFile("logo.png", self.data), "products/a")
+                raise RuntimeError("request failed after storing")
+        self.assertEqual(callbacks, [])
+        blob_path = blob_path_for(self.digest)
+        self.assertFalse(FileBlobModel.objects.exists())
+        self.assertFalse(default_storage.exists(blob_path))
+        folder = os.path.dirname(default_storage.path(blob_path))
+        self.assertEqual(len(os.listdir(folder)), 1)
+
+        self.assertEqual(self.repository.sweep_blob_files(), 0)  # Too recent
+        self.assertEqual(self.repository.sweep_blob_files(older_than=timedelta(0)), 1)
+        self.assertEqual(os.listdir(folder), [])
+
+    def test_rolled_back_delete_keeps_blob_file(self):
+        """Test a reclaimed blob's file is only removed once the delete commits."""
+        self.upload("logo.png", "products/a")
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                self.repository.soft_delete_tree_path("products/a", True)
+                raise RuntimeError("request failed after deleting")
+        self.assertEqual(callbacks, [])
+        self.assertEqual(FileBlobModel.objects.get(digest=self.digest).ref_count, 1)
+        self.assertTrue(default_storage.exists(blob_path_for(self.digest)))
+
+    def test_sweep_removes_blob_files_without_rows(self):
+        """Test the sweeper deletes unreferenced blob files and keeps stored ones."""
+        self.upload("logo.png", "products/a")
+        orphan_digest = hashlib.sha256(b"orphan").hexdigest()
+        default_storage.save(blob_path_for(orphan_digest), SimpleUploadedFile("orphan", b"orphan"))
+
+        self.assertEqual(self.repository.sweep_blob_files(older_than=timedelta(0)), 1)
+        self.assertFalse(default_storage.exists(blob_path_for(orphan_digest)))
+        self.assertTrue(default_storage.exists(blob_path_for(self.digest)))
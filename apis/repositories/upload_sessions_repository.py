@@ -0,0 +1,192 @@
+from libs.repositories.base_repository import BaseRepository
+from apis.models.upload_sessions_model import UploadSessionModel
+from apis.repositories.files_repository import UPLOAD_CHUNK_SIZE
+from apis.exceptions import BadRequestException
+import hashlib
+import os
+import shutil
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+# Chunks of open sessions live under MEDIA_ROOT/.uploads/<upload id>/; hidden, so scan_media skips them
+UPLOADS_DIR = ".uploads"
+
+# Chunks copied into the assembled file at once
+ASSEMBLY_WORKERS = 4
+
+
+def _copy_into(source_path: str, target_fd: int, offset: int):
+    """Copy a whole file into target_fd at offset, in the kernel where the platform allows"""
+    with open(source_path, "rb") as source:
+        remaining = os.fstat(source.fileno()).st_size
+        position = 0
+        if hasattr(os, "copy_file_range"):
+            try:
+                while remaining:
+                    copied = os.copy_file_range(
+                        source.fileno(), target_fd, remaining, position, offset + position
+                    )
+                    if copied == 0:
+                        break
+                    position += copied
+                    remaining -= copied
+            except OSError:
+                pass  # Unsupported between these filesystems; finish with reads and writes
+        while remaining:
+            data = os.pread(source.fileno(), min(UPLOAD_CHUNK_SIZE, remaining), position)
+            if not data:
+                break
+            os.pwrite(target_fd, data, offset + position)
+            position += len(data)
+            remaining -= len(data)
+
+
+class UploadSessionsRepository(BaseRepository):
+    """Repository for resumable upload sessions and their chunk files"""
+
+    def __init__(self):
+        super().__init__(UploadSessionModel)
+
+    def find_open_session(self, upload_id, lock: bool = False) -> Optional[UploadSessionModel]:
+        """Session that is neither completed nor expired; lock selects it FOR UPDATE"""
+        sessions = UploadSessionModel.objects.filter(
+            id=upload_id, completed_at=None, expires_at__gt=timezone.now()
+        )
+        if lock:
+            sessions = sessions.select_for_update()
+        return sessions.first()
+
+    def _chunk_dir(self, upload_id) -> str:
+        return default_storage.path(os.path.join(UPLOADS_DIR, str(upload_id)))
+
+    def _chunk_path(self, upload_id, index: int) -> str:
+        return os.path.join(self._chunk_dir(upload_id), f"{index}.part")
+
+    def write_chunk(self, upload_id, index: int, stream, expected_size: int) -> int:
+        """
+        Store one chunk from a request stream
+
+        The chunk is copied UPLOAD_CHUNK_SIZE bytes at a time into a temporary
+        file and renamed into place only once complete, so chunks can arrive
+        in parallel and a retried chunk simply replaces the earlier copy.
+
+        Args:
+            upload_id: Session id
+            index: Chunk number, from 0
+            stream: File-like request body
+            expected_size: Exact size the chunk must have
+
+        Returns:
+            Number of bytes stored
+        """
+        directory = self._chunk_dir(upload_id)
+        os.makedirs(directory, exist_ok=True)
+        temp_path = os.path.join(directory, f"{index}.{uuid.uuid4().hex}.tmp")
+        written = 0
+        try:
+            with open(temp_path, "wb") as target:
+                while written <= expected_size:
+                    data = stream.read(min(UPLOAD_CHUNK_SIZE, expected_size + 1 - written)) if stream else b""
+                    if not data:
+                        break
+                    target.write(data)
+                    written += len(data)
+            if written != expected_size:
+                raise BadRequestException(f"Chunk {index} must be {expected_size} bytes")
+            os.replace(temp_path, self._chunk_path(upload_id, index))
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return written
+
+    def received_chunks(self, upload_id) -> List[int]:
+        """Numbers of the chunks stored so far, ascending"""
+        try:
+            with os.scandir(self._chunk_dir(upload_id)) as entries:
+                names = [entry.name for entry in entries if entry.name.endswith(".part")]
+        except FileNotFoundError:
+            return []
+        return sorted(int(name[:-len(".part")]) for name in names)
+
+    def assemble(self, session: UploadSessionModel) -> Tuple[str, str]:
+        """
+        Join a session's chunks into one file, hashing it on the way
+
+        The file is sized up front and each chunk is copied to its offset by
+        a thread pool, with copy_file_range where available, so the copies
+        stay in the kernel. The SHA-256 still reads every byte through
+        Python once: meanwhile, the chunks are read in order, UPLOAD_CHUNK_SIZE
+        bytes at a time. A whole-file SHA-256 cannot be combined from
+        per-chunk digests, so this read cannot move into write_chunk.
+
+        Returns:
+            (path of the assembled file, SHA-256 hex digest)
+        """
+        parts = [self._chunk_path(session.id, index) for index in range(session.total_chunks)]
+        target_path = os.path.join(self._chunk_dir(session.id), f"assembled.{uuid.uuid4().hex}.tmp")
+        target_fd = os.open(target_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        try:
+            os.ftruncate(target_fd, session.total_size)
+            sha256 = hashlib.sha256()
+            with ThreadPoolExecutor(max_workers=ASSEMBLY_WORKERS, thread_name_prefix="upload-assembly") as pool:
+                copies = [
+                    pool.submit(_copy_into, part, target_fd, index * session.chunk_size)
+                    for index, part in enumerate(parts)
+                ]
+                for part in parts:
+                    with open(part, "rb") as source:
+                        for data in iter(lambda: source.read(UPLOAD_CHUNK_SIZE), b""):
+                            sha256.update(data)
+                for copy in copies:
+                    copy.result()
+        except BaseException:
+            os.close(target_fd)
+            os.remove(target_path)
+            raise
+        os.close(target_fd)
+        return target_path, sha256.hexdigest()
+
+    def complete_session(self, upload_id, file_id) -> int:
+        """Mark a session completed with the file it produced"""
+        return UploadSessionModel.objects.filter(id=upload_id).update(
+            completed_at=timezone.now(), file_id=file_id
+        )
+
+    def extend_session(self, upload_id, expires_at) -> int:
+        """Push a session's expiry back"""
+        return UploadSessionModel.objects.filter(id=upload_id).update(expires_at=expires_at)
+
+    def discard_chunks(self, upload_id):
+        """Remove a session's chunk directory"""
+        shutil.rmtree(self._chunk_dir(upload_id), ignore_errors=True)
+
+    def expire_sessions(self) -> int:
+        """
+        Delete expired sessions and every chunk directory without an open session
+
+        Directories left by completed sessions whose cleanup never ran are
+        removed too.
+
+        Returns:
+            Number of sessions deleted
+        """
+        count = UploadSessionModel.objects.filter(expires_at__lte=timezone.now()).delete()[0]
+
+        # Listed before reading the open sessions: a directory created after the
+        # listing may belong to a session the query would miss
+        try:
+            with os.scandir(default_storage.path(UPLOADS_DIR)) as entries:
+                names = [entry.name for entry in entries]
+        except FileNotFoundError:
+            names = []
+        open_ids = {
+            str(upload_id)
+            for upload_id in UploadSessionModel.objects.filter(completed_at=None).values_list("id", flat=True)
+        }
+        stale = [name for name in names if name not in open_ids]
+        for name in stale:
+            self.discard_chunks(name)
+        return count
@@ -1,8 +1,24 @@
 from django.urls import path
 from apis.views import (
     FileUploadView,
+    FileTreeView,
+    FileSearchView,
+    FileMoveView,
+    FileRenameView,
+    UploadSessionsView,
+    UploadSessionDetailView,
+    UploadChunkView,
+    UploadSessionCompleteView,
 )
 
 urlpatterns = [
     path("/upload", FileUploadView.as_view(), name="upload_file"),
+    path("/tree", FileTreeView.as_view(), name="file_tree"),
+    path("/tree/move", FileMoveView.as_view(), name="file_move"),
+    path("/tree/rename", FileRenameView.as_view(), name="file_rename"),
+    path("/search", FileSearchView.as_view(), name="file_search"),
+    path("/uploads", UploadSessionsView.as_view(), name="upload_sessions"),
+    path("/uploads/<uuid:upload_id>", UploadSessionDetailView.as_view(), name="upload_session_detail"),
+    path("/uploads/<uuid:upload_id>/chunks/<int:index>", UploadChunkView.as_view(), name="upload_chunk"),
+    path("/uploads/<uuid:upload_id>/complete", UploadSessionCompleteView.as_view(), name="upload_session_complete"),
 ]
\ No newline at end of file
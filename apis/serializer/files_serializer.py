@@ -30,6 +30,256 @@ class UploadFileResponseSerializer(serializers.Serializer):
     file_path = serializers.CharField()
     file_size = serializers.IntegerField()
     file_type = serializers.CharField()
+    checksum = serializers.CharField(help_text="SHA-256 of the stored content, hex encoded")
+    deduplicated = serializers.BooleanField(help_text="Content was already stored and is shared")
     created_at = serializers.CharField()  # ISO format string
     message = serializers.CharField()
     tree_structure = serializers.DictField()
+    tree_version = serializers.IntegerField()
+
+
+# Upper bound on entries one browse response can hold (limit ** depth)
+MAX_BROWSE_ENTRIES = 10_000
+
+
+class BrowseTreeRequestSerializer(serializers.Serializer):
+    """Query serializer for browsing the file tree"""
+    path = serializers.CharField(
+        required=False,
+        allow_blank=True,
+        default="",
+        max_length=1024,
+        help_text="Folder to list; empty for the root"
+    )
+    depth = serializers.IntegerField(
+        required=False,
+        min_value=1,
+        max_value=3,
+        default=1,
+        help_text="Levels to expand; 1 lists direct children only"
+    )
+    limit = serializers.IntegerField(
+        required=False,
+        min_value=1,
+        max_value=500,
+        default=100,
+        help_text="Maximum children per listed folder"
+    )
+    cursor = serializers.CharField(
+        required=False,
+        allow_blank=True,
+        max_length=2048,
+        help_text="next_cursor from the previous page"
+    )
+    full = serializers.BooleanField(
+        required=False,
+        default=False,
+        help_text="Stream the whole subtree at path as JSON instead of one page"
+    )
+
+    def validate(self, attrs):
+        if not attrs["full"] and attrs["limit"] ** attrs["depth"] > MAX_BROWSE_ENTRIES:
+            raise serializers.ValidationError(
+                f"limit ** depth must not exceed {MAX_BROWSE_ENTRIES}"
+            )
+        return super().validate(attrs)
+
+
+class TreeEntrySerializer(serializers.Serializer):
+    """A file or folder in a browse response"""
+    name = serializers.CharField()
+    path = serializers.CharField()
+    is_directory = serializers.BooleanField()
+    size = serializers.IntegerField()
+    extension = serializers.CharField(allow_blank=True)
+    mime_type = serializers.CharField(allow_blank=True, allow_null=True)
+    created_at = serializers.CharField(allow_null=True)  # ISO format string
+    modified_at = serializers.CharField(allow_null=True)  # ISO format string
+    file_count = serializers.IntegerField(required=False)
+    folder_count = serializers.IntegerField(required=False)
+    total_files = serializers.IntegerField(required=False)
+    total_folders = serializers.IntegerField(required=False)
+    total_size = serializers.IntegerField(required=False)
+    children = serializers.ListField(child=serializers.DictField(), required=False)
+    next_cursor = serializers.CharField(allow_null=True, required=False)
+
+
+class BrowseTreeResponseSerializer(serializers.Serializer):
+    """Response serializer for browsing the file tree"""
+    path = serializers.CharField(allow_blank=True)
+    version = serializers.IntegerField()
+    file_count = serializers.IntegerField()
+    folder_count = serializers.IntegerField()
+    total_files = serializers.IntegerField()
+    total_folders = serializers.IntegerField()
+    total_size = serializers.IntegerField()
+    latest_modified_at = serializers.CharField(allow_null=True)  # ISO format string
+    children = TreeEntrySerializer(many=True)
+    next_cursor = serializers.CharField(allow_null=True)
+
+
+class SearchFilesRequestSerializer(serializers.Serializer):
+    """Query serializer for searching files in the tree"""
+    path = serializers.CharField(
+        required=False,
+        allow_blank=True,
+        default="",
+        max_length=1024,
+        help_text="Folder to search below; empty for the whole tree"
+    )
+    extension = serializers.CharField(
+        required=False,
+        allow_blank=True,
+        max_length=32,
+        help_text="File extension, e.g. pdf or .pdf"
+    )
+    mime_type = serializers.CharField(
+        required=False,
+        allow_blank=True,
+        max_length=255,
+        help_text="Exact MIME type, e.g. application/pdf"
+    )
+    min_size = serializers.IntegerField(
+        required=False,
+        min_value=0,
+        help_text="Smallest file size in bytes, inclusive"
+    )
+    max_size = serializers.IntegerField(
+        required=False,
+        min_value=0,
+        help_text="Largest file size in bytes, inclusive"
+    )
+    limit = serializers.IntegerField(
+        required=False,
+        min_value=1,
+        max_value=500,
+        default=100,
+        help_text="Maximum files returned"
+    )
+
+    def validate(self, attrs):
+        min_size, max_size = attrs.get("min_size"), attrs.get("max_size")
+        if min_size is not None and max_size is not None and min_size > max_size:
+            raise serializers.ValidationError("min_size must not exceed max_size")
+        return super().validate(attrs)
+
+
+class SearchFilesResponseSerializer(serializers.Serializer):
+    """Response serializer for searching files in the tree"""
+    path = serializers.CharField(allow_blank=True)
+    version = serializers.IntegerField()
+    results = TreeEntrySerializer(many=True)
+    has_more = serializers.BooleanField()
+
+
+class TreePathRequestSerializer(serializers.Serializer):
+    """Query serializer for deleting a file or folder"""
+    path = serializers.CharField(
+        required=True,
+        max_length=1024,
+        help_text="File or folder to delete"
+    )
+
+
+class MoveTreePathRequestSerializer(serializers.Serializer):
+    """Request serializer for moving a file or folder"""
+    path = serializers.CharField(
+        required=True,
+        max_length=1024,
+        help_text="File or folder to move"
+    )
+    new_path = serializers.CharField(
+        required=True,
+        max_length=1024,
+        help_text="Path it should have afterwards"
+    )
+
+
+class RenameTreePathRequestSerializer(serializers.Serializer):
+    """Request serializer for renaming a file or folder"""
+    path = serializers.CharField(
+        required=True,
+        max_length=1024,
+        help_text="File or folder to rename"
+    )
+    name = serializers.CharField(
+        required=True,
+        max_length=255,
+        help_text="New name, without slashes"
+    )
+
+
+class TreeChangeResponseSerializer(serializers.Serializer):
+    """Response serializer for deleting, moving or renaming a file or folder"""
+    path = serializers.CharField()
+    previous_path = serializers.CharField(required=False)
+    is_directory = serializers.BooleanField()
+    updated_count = serializers.IntegerField()
+    version = serializers.IntegerField()
+    message = serializers.CharField(max_length=255)
+
+
+# Chunk size bounds for resumable uploads; every chunk but the last has exactly chunk_size bytes
+MIN_UPLOAD_CHUNK_SIZE = 64 * 1024
+MAX_UPLOAD_CHUNK_SIZE = 64 * 1024 * 1024
+DEFAULT_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+class CreateUploadSessionRequestSerializer(serializers.Serializer):
+    """Request serializer for starting a resumable upload"""
+    file_name = serializers.RegexField(
+        r"^[^/]+$",
+        required=True,
+        max_length=255,
+        help_text="Name the file will have, without slashes"
+    )
+    folder_path = serializers.CharField(
+        required=False,
+        allow_blank=True,
+        default="",
+        max_length=255,
+        help_text="Folder path for organization"
+    )
+    product_id = serializers.UUIDField(
+        required=False,
+        allow_null=True,
+        help_text="Optional product ID to associate the file with"
+    )
+    file_type = serializers.CharField(
+        required=False,
+        allow_blank=True,
+        max_length=50,
+        help_text="Optional file type classification"
+    )
+    total_size = serializers.IntegerField(
+        required=True,
+        min_value=1,
+        help_text="Size of the whole file in bytes"
+    )
+    chunk_size = serializers.IntegerField(
+        required=False,
+        default=DEFAULT_UPLOAD_CHUNK_SIZE,
+        min_value=MIN_UPLOAD_CHUNK_SIZE,
+        max_value=MAX_UPLOAD_CHUNK_SIZE,
+        help_text="Size of every chunk but the last"
+    )
+
+
+class UploadSessionResponseSerializer(serializers.Serializer):
+    """Response serializer for a resumable upload's status"""
+    upload_id = serializers.UUIDField()
+    file_name = serializers.CharField()
+    folder_path = serializers.CharField(allow_blank=True)
+    total_size = serializers.IntegerField()
+    chunk_size = serializers.IntegerField()
+    total_chunks = serializers.IntegerField()
+    received_chunks = serializers.ListField(child=serializers.IntegerField())
+    missing_chunks = serializers.ListField(child=serializers.IntegerField())
+    expires_at = serializers.CharField()  # ISO format string
+
+
+class UploadChunkResponseSerializer(serializers.Serializer):
+    """Response serializer for one stored chunk"""
+    upload_id = serializers.UUIDField()
+    index = serializers.IntegerField()
+    size = serializers.IntegerField()
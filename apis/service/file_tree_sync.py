@@ -0,0 +1,224 @@
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from django.utils import timezone
+
+from apis.exceptions import BadRequestException
+from apis.repositories.files_repository import FilesRepository, to_tree_path
+from libs.file_tree.file_tree import FileTreeStructure
+
+logger = logging.getLogger(__name__)
+
+# Age at which move log entries may be pruned; a worker that has not polled for
+# half of it reconciles its whole tree instead of trusting the log
+MOVE_LOG_RETENTION = timedelta(days=1)
+
+
+class FileTreeSync:
+    """
+    Keeps one worker's in-memory file tree in step with changes made by others
+
+    Each poll reads the files table past an (updated_at, id) watermark in
+    keyset-ordered batches and applies only those rows to the tree: live rows
+    are added and soft-deleted rows removed. Every poll re-reads an overlap
+    window behind the watermark, so rows whose transaction committed late or
+    whose worker clock lags are still picked up; rows are applied in
+    updated_at order and re-applying one is a no-op, so overlapping reads are
+    safe. Moves are replayed first from an append-only move log read the same
+    way: each entry names a path a file row left, and the file there is
+    removed along with any folders that leaves empty, before the row itself is
+    added at its current path. Replaying every entry in order, rather than
+    only each row's latest move, handles files moved several times between
+    two polls. A worker idle for long enough that entries it needs may have
+    been pruned reconciles its whole tree against the table instead.
+    """
+
+    def __init__(
+        self,
+        files_repository: FilesRepository,
+        file_tree: FileTreeStructure,
+        since: datetime,
+        poll_interval: float = 1.0,
+        batch_size: int = 500,
+        overlap: timedelta = timedelta(seconds=5),
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize the sync
+
+        Args:
+            files_repository: Source of changed rows
+            file_tree: Tree to apply changes to
+            since: Time the tree was loaded from the table; the first watermark
+            poll_interval: Minimum seconds between polls in sync_if_stale
+            batch_size: Rows fetched per query
+            overlap: How far behind the watermark each poll starts reading
+            clock: Monotonic time source, injectable for tests
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.files_repository = files_repository
+        self.file_tree = file_tree
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.overlap = overlap
+        self.clock = clock
+        self.watermark = (since, None)
+        self.move_watermark = (since, None)
+        # When the last completed poll started; the log is replayed up to here
+        self.synced_at = since
+        self._last_poll: Optional[float] = None
+        self._poll_lock = threading.Lock()
+
+    def poll(self) -> int:
+        """
+        Replay the move log and apply every row changed since the watermarks, advancing both
+
+        Returns:
+            Number of files added to or removed from the tree
+        """
+        started_at = timezone.now()
+        stale = started_at - self.synced_at > MOVE_LOG_RETENTION / 2
+        # Moves first: a move's row was updated in the same transaction, so it is re-added afterwards
+        applied = self._apply_moves()
+        since, last_id = self.watermark
+        if self.overlap:
+            since, last_id = since - self.overlap, None
+
+        while True:
+            rows = self.files_repository.find_changes_after(since, last_id, self.batch_size)
+            for file_id, file_name, file_path, file_size, created_at, updated_at, deleted_at in rows:
+                tree_path = to_tree_path(file_name, file_path)
+                if deleted_at is not None:
+                    node = self.file_tree.get_node(tree_path)
+                    if node is not None and not node.is_directory:
+                        self.file_tree.remove(tree_path)
+                        applied += 1
+                    continue
+                version = self.file_tree.version
+                try:
+                    self.file_tree.add_file(tree_path, file_size, created_at, updated_at)
+                except BadRequestException as e:
+                    # Too deep or clashing with a folder: skipped, as at startup
+                    logger.debug("Skipped file %s in tree sync: %s", file_id, e)
+                    continue
+                if self.file_tree.version != version:
+                    applied += 1
+            if rows:
+                since, last_id = rows[-1][5], rows[-1][0]
+                if since >= self.watermark[0]:
+                    self.watermark = (since, last_id)
+            if len(rows) < self.batch_size:
+                break
+        if stale:
+            applied += self.reconcile(started_at)
+        self.synced_at = started_at
+        return applied
+
+    def reconcile(self, started_at: Optional[datetime] = None) -> int:
+        """
+        Bring the tree fully in line with the live rows of the files table
+
+        Missing files are added, and files no live row has are removed along
+        with the folders they leave empty. Files modified within the overlap
+        window before started_at are kept, since their rows may have committed
+        after the read began; the next poll settles them.
+
+        Args:
+            started_at: When the read of the table began; now by default
+
+        Returns:
+            Number of files added to or removed from the tree
+        """
+        started_at = started_at or timezone.now()
+        live = set()
+        added = 0
+        batch = []
+        for entry in self.files_repository.iter_tree_entries():
+            live.add(entry[0])
+            batch.append(entry)
+            if len(batch) >= self.batch_size:
+                added += len(self.file_tree.add_files(batch))
+                batch = []
+        if batch:
+            added += len(self.file_tree.add_files(batch))
+
+        recent = started_at - self.overlap
+        orphans = [
+            node.path for node in list(self.file_tree.all_nodes.values())
+            if not node.is_directory and node.path not in live
+            and (node.modified_at is None or node.modified_at < recent)
+        ]
+        for path in orphans:
+            self.file_tree.remove(path)
+            parent_path = path.rpartition('/')[0]
+            if parent_path:
+                self.file_tree.prune_empty_folders(parent_path)
+        if added or orphans:
+            logger.info("Reconciled file tree: %d files added, %d removed", added, len(orphans))
+        return added + len(orphans)
+
+    def _apply_moves(self) -> int:
+        """Replay the move log past its watermark and advance it; returns the number of files removed"""
+        since, last_id = self.move_watermark
+        if self.overlap:
+            since, last_id = since - self.overlap, None
+
+        applied = 0
+        while True:
+            moves = self.files_repository.find_moves_after(since, last_id, self.batch_size)
+            for _, _, previous_tree_path, file_size, file_created_at, _ in moves:
+                applied += self._remove_moved_file(previous_tree_path, file_size, file_created_at)
+            if moves:
+                since, last_id = moves[-1][5], moves[-1][0]
+                if since >= self.move_watermark[0]:
+                    self.move_watermark = (since, last_id)
+            if len(moves) < self.batch_size:
+                return applied
+
+    def _remove_moved_file(self, previous_path: str, file_size: int, created_at) -> int:
+        """
+        Remove the entry a moved row left at a previous path
+
+        The entry is only taken to be the moved file if its size and creation
+        time match the row's; a file added there since is kept. Paths this
+        tree never had, such as a middle step of a chained move, are skipped.
+
+        Returns:
+            1 if the entry was removed, else 0
+        """
+        node = self.file_tree.get_node(previous_path)
+        if node is None or node.is_directory or node.size != file_size or node.created_at != created_at:
+            return 0
+        self.file_tree.remove(previous_path)
+        parent_path = previous_path.rpartition('/')[0]
+        if parent_path:
+            self.file_tree.prune_empty_folders(parent_path)
+        return 1
+
+    def sync_if_stale(self) -> int:
+        """
+        Poll unless one ran within poll_interval or is running in another thread
+
+        A failed poll is logged and leaves the tree as it was, so reads keep
+        working from slightly stale data.
+
+        Returns:
+            Number of files added to or removed from the tree
+        """
+        now = self.clock()
+        if self._last_poll is not None and now - self._last_poll < self.poll_interval:
+            return 0
+        if not self._poll_lock.acquire(blocking=False):
+            return 0
+        try:
+            self._last_poll = now
+            return self.poll()
+        except Exception:
+            logger.exception("File tree sync failed")
+            return 0
+        finally:
+            self._poll_lock.release()
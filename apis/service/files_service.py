@@ -1,16 +1,50 @@
 import os
+import json
+import base64
+import binascii
 import logging
-from typing import  Dict, Any
+import mimetypes
+from datetime import timedelta
+from itertools import islice
+from typing import  Dict, Any, Iterator, List, Optional, Tuple
 from django.core.files.uploadedfile import UploadedFile
 from apis.repositories.files_repository import FilesRepository, ProductFilesRepository
 from apis.repositories.products_repository import ProductsRepository
-from libs.file_tree.file_tree import FileTreeStructure
+from apis.repositories.upload_sessions_repository import UploadSessionsRepository
+from apis.service.products_service import product_exists_cache_key
+from apis.service.file_tree_sync import MOVE_LOG_RETENTION, FileTreeSync
+from libs.cache import LRUCache
+from libs.file_tree.file_tree import FileTreeNode, FileTreeStructure
+from libs.file_tree.json_stream import iter_tree_json
 from apis.exceptions import NotFoundException, BadRequestException
-from apis.exceptions.error_codes import ProductErrorCode
+from apis.exceptions.error_codes import FileErrorCode, ProductErrorCode
 from django.db import transaction
+from django.utils import timezone
 
 logger = logging.getLogger(__name__)
 
+# Resumable uploads bypass upload_file's 50MB limit up to this size
+MAX_RESUMABLE_UPLOAD_SIZE = 5 * 1024 ** 3
+# Idle time after which the sweeper removes an unfinished upload
+UPLOAD_SESSION_TTL = timedelta(hours=24)
+
+
+def encode_tree_cursor(node: FileTreeNode) -> str:
+    """Opaque cursor pointing just after node in its directory's child order"""
+    raw = json.dumps([node.is_directory, node.name], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_tree_cursor(cursor: str) -> Tuple[bool, str]:
+    """Inverse of encode_tree_cursor; raises BadRequestException when malformed"""
+    try:
+        is_directory, name = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, TypeError, binascii.Error):
+        raise BadRequestException("Invalid cursor")
+    if not isinstance(is_directory, bool) or not isinstance(name, str):
+        raise BadRequestException("Invalid cursor")
+    return is_directory, name
+
 
 class FilesService:
     """Service for file upload and management operations"""
@@ -20,14 +54,36 @@ class FilesService:
         files_repository: FilesRepository,
         product_files_repository: ProductFilesRepository,
         products_repository: ProductsRepository,
-        file_tree: FileTreeStructure 
+        file_tree: FileTreeStructure,
+        tree_sync: FileTreeSync = None,
+        product_cache: LRUCache = None,
+        upload_sessions_repository: UploadSessionsRepository = None
     ):
         self.files_repository = files_repository
         self.product_files_repository = product_files_repository
         self.products_repository = products_repository
         self.file_tree = file_tree
+        self.tree_sync = tree_sync
+        self.product_cache = product_cache
+        self.upload_sessions_repository = upload_sessions_repository
+
+    def sync_tree(self) -> int:
+        """Apply uploads made by other workers, at most once per sync poll interval"""
+        if self.tree_sync is None:
+            return 0
+        return self.tree_sync.sync_if_stale()
+
+    def _product_exists(self, product_id: str) -> bool:
+        """Check that a non-deleted product exists, caching positive answers"""
+        cache_key = product_exists_cache_key(product_id)
+        if self.product_cache is not None and self.product_cache.get(cache_key):
+            return True
+
+        product = self.products_repository.find_one(id=product_id, deleted_at=None)
+        if product and self.product_cache is not None:
+            self.product_cache.put(cache_key, True)
+        return product is not None
     
-    @transaction.atomic
     def upload_file(
         self, 
         body: dict = None
@@ -61,55 +117,476 @@ class FilesService:
             
             # Validate product exists if product_id is provided
             if product_id:
-                product = self.products_repository.find_one(id=product_id, deleted_at=None)
-                if not product:
-                    raise NotFoundException(
-                        detail="Product not found",
-                        code=ProductErrorCode.PRODUCT_NOT_FOUND.value,
-                    )
-            
-            # Save file to storage
-            file_info = self.files_repository.save_uploaded_file(uploaded_file, folder_path)
+                self._require_product(product_id)
             
-            # Create file record in database
-            file_data = {
-                'file_name': file_info['original_name'],
-                'file_path': file_info['file_path'],
-                'file_size': file_info['file_size'],
-                'file_type': file_info['content_type'],
-                'file_data': b'',  
-            }
+            with transaction.atomic():
+                # Save file to storage
+                file_info = self.files_repository.save_uploaded_file(uploaded_file, folder_path)
+                response = self._register_file(file_info, folder_path, product_id, file_type)
+            return self._with_tree(response)
             
-            file_record = self.files_repository.create_file_record(file_data)
+        except Exception as e:
+            logger.error(f"Error uploading file: {str(e)}")
+            raise
+
+    def _require_product(self, product_id: str):
+        """Raise NotFoundException unless the product exists"""
+        if not self._product_exists(product_id):
+            raise NotFoundException(
+                detail="Product not found",
+                code=ProductErrorCode.PRODUCT_NOT_FOUND.value,
+            )
+    
+    def _register_file(
+        self, file_info: Dict[str, Any], folder_path: str, product_id: Optional[str], file_type: str
+    ) -> Dict[str, Any]:
+        """
+        Record a stored file: its row, its tree node and its product association
+        
+        Must run inside a transaction; the tree node is only added once it
+        commits, so a rollback never leaves a file in the tree without a row.
+        
+        Args:
+            file_info: What the repository returned when storing the file
+            folder_path: Folder the file was uploaded to
+            product_id: Optional product ID to associate the file with
+            file_type: Optional file type classification
             
-            # Add to file tree structure
-            tree_path = os.path.join(folder_path, file_info['original_name']) if folder_path else file_info['original_name']
-            self.file_tree.add_file(
-                file_path=tree_path,
-                file_size=file_info['file_size'],
-                created_at=file_record.created_at,
-                modified_at=file_record.updated_at
+        Returns:
+            Dictionary with upload result, without the tree (see _with_tree)
+        """
+        # Create file record in database
+        file_data = {
+            'file_name': file_info['original_name'],
+            'file_path': file_info['file_path'],
+            'file_size': file_info['file_size'],
+            'file_type': file_info['content_type'],
+            'file_data': b'',  
+            'digest': file_info['checksum'],
+            'blob_id': file_info['blob_digest'],
+        }
+        
+        file_record = self.files_repository.create_file_record(file_data)
+        
+        # Catch up with other workers so the returned tree is current
+        self.sync_tree()
+        
+        # Add to file tree structure
+        tree_path = os.path.join(folder_path, file_info['original_name']) if folder_path else file_info['original_name']
+        transaction.on_commit(lambda: self.file_tree.add_file(
+            file_path=tree_path,
+            file_size=file_info['file_size'],
+            created_at=file_record.created_at,
+            modified_at=file_record.updated_at
+        ))
+        
+        # Associate with product if provided
+        if product_id:
+            self.product_files_repository.create_product_file_association(
+                product_id=product_id,
+                file_id=str(file_record.id),
+                file_type=file_type
             )
+        
+        return {
+            "file_id": str(file_record.id),
+            "file_name": file_record.file_name,
+            "file_path": file_record.file_path,
+            "file_size": file_record.file_size,
+            "file_type": file_record.file_type,
+            "checksum": file_info['checksum'],
+            "deduplicated": file_info['deduplicated'],
+            "created_at": file_record.created_at.isoformat(),
+            "message": "File uploaded successfully"
+        }
+    
+    def _with_tree(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        """Add the tree to an upload result, once the upload's transaction has committed"""
+        response["tree_structure"] = self.file_tree.to_tree_dict()
+        response["tree_version"] = self.file_tree.version
+        return response
+    
+    def create_upload_session(self, body: dict) -> Dict[str, Any]:
+        """
+        Start a resumable upload
+        
+        Everything upload_file checks up front is checked here, so a transfer
+        is never refused only once all of it has arrived.
+        
+        Args:
+            body: file_name, total_size, chunk_size, folder_path and the
+                optional product_id and file_type
             
-            # Associate with product if provided
+        Returns:
+            Dictionary with the session status
+        """
+        file_name: str = body['file_name']
+        folder_path: str = body.get('folder_path', '').strip('/')
+        product_id: str = str(body.get('product_id')) if body.get('product_id') else None
+        total_size: int = body['total_size']
+        chunk_size: int = body['chunk_size']
+        
+        if total_size > MAX_RESUMABLE_UPLOAD_SIZE:
+            raise BadRequestException(f"File size exceeds maximum limit of {MAX_RESUMABLE_UPLOAD_SIZE} bytes")
+        if product_id:
+            self._require_product(product_id)
+        tree_path = f"{folder_path}/{file_name}" if folder_path else file_name
+        if tree_path.count('/') >= self.file_tree.max_depth:
+            raise BadRequestException(f"Maximum directory depth ({self.file_tree.max_depth}) exceeded")
+        
+        session = self.upload_sessions_repository.create({
+            'file_name': file_name,
+            'folder_path': folder_path,
+            'product_id': product_id,
+            'file_type': body.get('file_type') or None,
+            'total_size': total_size,
+            'chunk_size': chunk_size,
+            'total_chunks': -(-total_size // chunk_size),
+            'expires_at': timezone.now() + UPLOAD_SESSION_TTL,
+        })
+        return self._upload_session_status(session, [])
+    
+    def get_upload_session(self, upload_id: str) -> Dict[str, Any]:
+        """Status of an open upload, with the chunks received and still missing"""
+        session = self._open_upload_session(upload_id)
+        return self._upload_session_status(
+            session, self.upload_sessions_repository.received_chunks(session.id)
+        )
+    
+    def upload_chunk(self, upload_id: str, index: int, stream) -> Dict[str, Any]:
+        """
+        Store one chunk of an open upload
+        
+        Chunks may arrive in any order, in parallel and more than once. Every
+        chunk but the last must be exactly chunk_size bytes. Each one pushes
+        the session's expiry back.
+        
+        Args:
+            upload_id: Session id
+            index: Chunk number, from 0
+            stream: File-like request body
+            
+        Returns:
+            Dictionary with the chunk number and size
+        """
+        session = self._open_upload_session(upload_id)
+        if not 0 <= index < session.total_chunks:
+            raise BadRequestException(f"Chunk index must be between 0 and {session.total_chunks - 1}")
+        expected_size = (
+            session.chunk_size if index < session.total_chunks - 1
+            else session.total_size - session.chunk_size * (session.total_chunks - 1)
+        )
+        size = self.upload_sessions_repository.write_chunk(session.id, index, stream, expected_size)
+        self.upload_sessions_repository.extend_session(session.id, timezone.now() + UPLOAD_SESSION_TTL)
+        return {"upload_id": str(session.id), "index": index, "size": size}
+    
+    def complete_upload_session(self, upload_id: str) -> Dict[str, Any]:
+        """
+        Assemble a fully received upload and register the file, as upload_file does
+        
+        The session row is locked meanwhile, so a repeated completion waits
+        and then finds the session closed. The assembled file only moves into
+        storage when the transaction commits; if anything fails first it is
+        deleted and the session stays open for another attempt.
+        
+        Returns:
+            Dictionary with upload result
+        """
+        with transaction.atomic():
+            session = self._open_upload_session(upload_id, lock=True)
+            received = self.upload_sessions_repository.received_chunks(session.id)
+            if len(received) != session.total_chunks:
+                raise BadRequestException(
+                    f"{session.total_chunks - len(received)} of {session.total_chunks} chunks are missing"
+                )
+            product_id = str(session.product_id) if session.product_id else None
             if product_id:
-                self.product_files_repository.create_product_file_association(
-                    product_id=product_id,
-                    file_id=str(file_record.id),
-                    file_type=file_type
+                self._require_product(product_id)
+            
+            assembled_path, digest = self.upload_sessions_repository.assemble(session)
+            try:
+                file_info = self.files_repository.store_assembled_file(
+                    assembled_path,
+                    session.file_name,
+                    session.folder_path,
+                    mimetypes.guess_type(session.file_name)[0],
+                    digest,
+                    session.total_size,
                 )
+                response = self._register_file(file_info, session.folder_path, product_id, session.file_type or '')
+                self.upload_sessions_repository.complete_session(session.id, response["file_id"])
+            except BaseException:
+                if os.path.exists(assembled_path):
+                    os.remove(assembled_path)
+                raise
+            transaction.on_commit(lambda: self.upload_sessions_repository.discard_chunks(session.id))
+        return self._with_tree(response)
+    
+    def expire_upload_sessions(self) -> int:
+        """Delete expired upload sessions and their chunks; returns the number of sessions removed"""
+        return self.upload_sessions_repository.expire_sessions()
+    
+    def prune_move_log(self) -> int:
+        """Delete move log entries older than MOVE_LOG_RETENTION; returns how many"""
+        return self.files_repository.delete_moves_before(timezone.now() - MOVE_LOG_RETENTION)
+    
+    def sweep_blob_files(self) -> int:
+        """Delete blob files left without a blob row by rolled back transactions; returns how many"""
+        return self.files_repository.sweep_blob_files()
+    
+    def _open_upload_session(self, upload_id: str, lock: bool = False):
+        session = self.upload_sessions_repository.find_open_session(upload_id, lock=lock)
+        if session is None:
+            raise NotFoundException(
+                detail="Upload not found or expired",
+                code=FileErrorCode.UPLOAD_NOT_FOUND.value,
+            )
+        return session
+    
+    def _upload_session_status(self, session, received: List[int]) -> Dict[str, Any]:
+        received_set = set(received)
+        return {
+            "upload_id": str(session.id),
+            "file_name": session.file_name,
+            "folder_path": session.folder_path,
+            "total_size": session.total_size,
+            "chunk_size": session.chunk_size,
+            "total_chunks": session.total_chunks,
+            "received_chunks": received,
+            "missing_chunks": [index for index in range(session.total_chunks) if index not in received_set],
+            "expires_at": session.expires_at.isoformat(),
+        }
+    
+    def browse_tree(
+        self,
+        path: str = "",
+        depth: int = 1,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Browse one page of a directory, optionally expanding a few levels
+        
+        Args:
+            path: Directory to list (empty for the root)
+            depth: Number of levels to expand; 1 lists direct children only
+            limit: Maximum children per directory listed
+            cursor: next_cursor from a previous page of the same directory
+            
+        Returns:
+            Dictionary with the directory's aggregates, a page of children
+            (expanded directories carry their own first page and cursor),
+            the next cursor and the tree version
+        """
+        path = path.strip('/')
+        version = self.file_tree.version
+        summary = self._folder_summary(path)
+        
+        start_after = decode_tree_cursor(cursor) if cursor else None
+        children, next_cursor = self._browse_level(path, depth, limit, start_after)
+        return {
+            "path": path,
+            "version": version,
+            **summary,
+            "latest_modified_at": (
+                summary["latest_modified_at"].isoformat() if summary["latest_modified_at"] else None
+            ),
+            "children": children,
+            "next_cursor": next_cursor,
+        }
+
+    def stream_tree(self, path: str = "") -> Iterator[bytes]:
+        """
+        Encode a whole folder subtree as JSON without materializing it
+        
+        Args:
+            path: Folder to encode (empty for the full tree)
             
-            return {
-                "file_id": str(file_record.id),
-                "file_name": file_record.file_name,
-                "file_path": file_record.file_path,
-                "file_size": file_record.file_size,
-                "file_type": file_record.file_type,
-                "created_at": file_record.created_at.isoformat(),
-                "tree_structure": self.file_tree.to_tree_dict(),
-                "message": "File uploaded successfully"
-            }
+        Returns:
+            Iterator of JSON byte chunks shaped like FileTreeStructure.to_tree_dict
+        """
+        path = path.strip('/')
+        self._folder_summary(path)  # Fail before the response starts streaming
+        return iter_tree_json(self.file_tree, path)
+
+    def search_files(
+        self,
+        path: str = "",
+        extension: Optional[str] = None,
+        mime_type: Optional[str] = None,
+        min_size: Optional[int] = None,
+        max_size: Optional[int] = None,
+        limit: int = 100,
+    ) -> Dict[str, Any]:
+        """
+        Find files below a folder by extension, MIME type and size
+        
+        Args:
+            path: Folder to search below (empty for the whole tree)
+            extension: Extension with or without its leading dot, any case
+            mime_type: Exact MIME type
+            min_size: Smallest size in bytes, inclusive
+            max_size: Largest size in bytes, inclusive
+            limit: Maximum files returned
             
-        except Exception as e:
-            logger.error(f"Error uploading file: {str(e)}")
-            raise
\ No newline at end of file
+        Returns:
+            Dictionary with up to limit matching files, whether more matched
+            and the tree version
+        """
+        path = path.strip('/')
+        version = self.file_tree.version
+        self._folder_summary(path)
+        if extension:
+            extension = "." + extension.lstrip('.').lower()
+        
+        matches = self.file_tree.query(
+            path,
+            extension=extension or None,
+            mime_type=mime_type or None,
+            min_size=min_size,
+            max_size=max_size,
+        )
+        # Take one extra match to learn whether the results were cut off
+        page = list(islice(matches, limit + 1))
+        return {
+            "path": path,
+            "version": version,
+            "results": [self._browse_entry(node, 0, limit) for node in page[:limit]],
+            "has_more": len(page) > limit,
+        }
+
+    @transaction.atomic
+    def delete_path(self, path: str) -> Dict[str, Any]:
+        """
+        Delete a file, or a folder with everything below it
+        
+        Args:
+            path: Tree path of the file or folder
+            
+        Returns:
+            Dictionary with the path, how many file rows were soft deleted
+            and the new tree version
+        """
+        path = path.strip('/')
+        node = self._existing_node(path)
+        deleted = self.files_repository.soft_delete_tree_path(path, node.is_directory)
+        self.file_tree.remove(path)
+        return {
+            "path": path,
+            "is_directory": node.is_directory,
+            "updated_count": deleted,
+            "version": self.file_tree.version,
+            "message": "Deleted successfully",
+        }
+
+    @transaction.atomic
+    def move_path(self, path: str, new_path: str) -> Dict[str, Any]:
+        """
+        Move a file or folder, updating every affected file row at once
+        
+        Args:
+            path: Current tree path of the file or folder
+            new_path: Tree path it should have afterwards
+            
+        Returns:
+            Dictionary with the new and previous paths, how many file rows
+            were updated and the new tree version
+        """
+        path, new_path = path.strip('/'), new_path.strip('/')
+        node = self._existing_node(path)
+        # Deepest folder above new_path that exists already; the move creates any below it
+        existing_parent = new_path.rpartition('/')[0]
+        while existing_parent and self.file_tree.get_node(existing_parent) is None:
+            existing_parent = existing_parent.rpartition('/')[0]
+        # The tree validates the move before anything is written
+        self.file_tree.move(path, new_path)
+        try:
+            updated = self.files_repository.move_tree_path(path, new_path, node.is_directory)
+        except Exception:
+            # Match the rolled back rows, without the folders the move created
+            self.file_tree.move(new_path, path)
+            self.file_tree.prune_empty_folders(new_path.rpartition('/')[0], stop=existing_parent)
+            raise
+        return {
+            "path": new_path,
+            "previous_path": path,
+            "is_directory": node.is_directory,
+            "updated_count": updated,
+            "version": self.file_tree.version,
+            "message": "Moved successfully",
+        }
+
+    def rename_path(self, path: str, name: str) -> Dict[str, Any]:
+        """
+        Rename a file or folder within its folder
+        
+        Args:
+            path: Current tree path of the file or folder
+            name: New name, without slashes
+            
+        Returns:
+            Same as move_path
+        """
+        if not name or '/' in name:
+            raise BadRequestException(f"Invalid name: {name}")
+        parent_path = path.strip('/').rpartition('/')[0]
+        return self.move_path(path, f"{parent_path}/{name}" if parent_path else name)
+
+    def _existing_node(self, path: str) -> FileTreeNode:
+        """Return the node at path, raising if there is none"""
+        node = self.file_tree.get_node(path) if path else None
+        if node is None:
+            raise NotFoundException(
+                detail=f"File or folder not found: {path}",
+                code=FileErrorCode.FILE_NOT_FOUND.value,
+            )
+        return node
+
+    def _folder_summary(self, path: str) -> Dict[str, Any]:
+        """Return a folder's aggregates, raising if the path is missing or a file"""
+        summary = self.file_tree.get_summary(path)
+        if summary is None:
+            if self.file_tree.get_node(path) is None:
+                raise NotFoundException(
+                    detail=f"Folder not found: {path}",
+                    code=FileErrorCode.FILE_NOT_FOUND.value,
+                )
+            raise BadRequestException(f"Not a folder: {path}")
+        return summary
+
+    def _browse_level(
+        self,
+        path: str,
+        depth: int,
+        limit: int,
+        start_after: Optional[Tuple[bool, str]] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Return one page of a directory's children and the cursor after it"""
+        # Fetch one extra child to learn whether another page exists
+        page = self.file_tree.get_children(path, start_after=start_after, limit=limit + 1)
+        next_cursor = encode_tree_cursor(page[limit - 1]) if len(page) > limit else None
+        return [self._browse_entry(child, depth - 1, limit) for child in page[:limit]], next_cursor
+
+    def _browse_entry(self, node: FileTreeNode, depth: int, limit: int) -> Dict[str, Any]:
+        """Describe a node; directories within depth also list their first page"""
+        entry = {
+            "name": node.name,
+            "path": node.path,
+            "is_directory": node.is_directory,
+            "size": node.size,
+            "extension": node.extension,
+            "mime_type": node.mime_type,
+            "created_at": node.created_at.isoformat() if node.created_at else None,
+            "modified_at": node.modified_at.isoformat() if node.modified_at else None,
+        }
+        if node.is_directory:
+            entry.update({
+                "file_count": node.direct_files,
+                "folder_count": node.direct_folders,
+                "total_files": node.total_files,
+                "total_folders": node.total_folders,
+                "total_size": node.total_size,
+            })
+            if depth > 0:
+                entry["children"], entry["next_cursor"] = self._browse_level(node.path, depth, limit)
+        return entry
@@ -5,14 +5,30 @@ from apis.exceptions import (
 from apis.exceptions.error_codes import (
     ProductErrorCode,
 )
+from libs.cache import LRUCache
 import logging
 
 logger = logging.getLogger(__name__)
 
+
+def product_cache_key(product_id):
+    return f"product:{product_id}"
+
+
+def product_exists_cache_key(product_id):
+    return f"product_exists:{product_id}"
+
+
 class ProductsService:
 
-    def __init__(self, products_repository: ProductsRepository):
+    def __init__(self, products_repository: ProductsRepository, cache: LRUCache = None):
         self.products_repository = products_repository
+        self.cache = cache
+
+    def _invalidate_product_cache(self, product_id):
+        if self.cache is not None:
+            self.cache.invalidate(product_cache_key(product_id))
+            self.cache.invalidate(product_exists_cache_key(product_id))
 
 
     def create_product(self, product_data):
@@ -35,6 +51,7 @@ class ProductsService:
             filters={"id": product_id},
             data=update_data
         )
+        self._invalidate_product_cache(product_id)
 
         return {
             "id": update_code,
@@ -51,6 +68,7 @@ class ProductsService:
             )
 
         count, _ = self.products_repository.delete(id=product_id)
+        self._invalidate_product_cache(product_id)
 
         return {
             "deleted_count": count,
@@ -58,6 +76,11 @@ class ProductsService:
         }
     
     def get_product(self, product_id):
+        if self.cache is not None:
+            cached = self.cache.get(product_cache_key(product_id))
+            if cached is not None:
+                return dict(cached)
+
         product = self.products_repository.find_one(id=product_id)
 
         if not product:
@@ -66,12 +89,15 @@ class ProductsService:
                 code=ProductErrorCode.PRODUCT_NOT_FOUND,
             )
 
-        return {
+        product_detail = {
             "id": product.id,
             "name": product.name,
             "description": product.description,
             "price": product.price,
         }
+        if self.cache is not None:
+            self.cache.put(product_cache_key(product_id), product_detail)
+        return dict(product_detail)
     
 
     def list_products(self, **query_params):
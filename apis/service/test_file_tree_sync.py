@@ -0,0 +1,162 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from apis.models.files_model import FileModel
+from apis.repositories.files_repository import FilesRepository
+from apis.service.file_tree_sync import MOVE_LOG_RETENTION, FileTreeSync
+from libs.file_tree.file_tree import FileTreeStructure
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestFileTreeSync(TestCase):
+    def setUp(self):
+        """Set up two workers, each with its own tree and sync, sharing one database."""
+        self.clock = FakeClock()
+        self.repository = FilesRepository()
+        loaded_at = timezone.now()
+        self.workers = []
+        for _ in range(2):
+            tree = FileTreeStructure()
+            sync = FileTreeSync(
+                self.repository, tree, since=loaded_at, poll_interval=1.0, batch_size=2, clock=self.clock
+            )
+            self.workers.append((tree, sync))
+
+    def upload(self, worker, name, folder="docs"):
+        """Store a row and add it to one worker's tree, as an upload request does."""
+        tree, _ = self.workers[worker]
+        record = FileModel.objects.create(
+            file_name=name, file_path=f"{folder}/{name}.bin", file_size=len(name),
+            file_type="application/octet-stream", file_data=b"",
+        )
+        tree.add_file(f"{folder}/{name}", record.file_size, record.created_at, record.updated_at)
+        return record
+
+    def test_workers_converge_within_poll_interval(self):
+        """Test each tree picks up the other's uploads once the poll interval has passed."""
+        (tree_a, sync_a), (tree_b, sync_b) = self.workers
+        self.assertEqual(sync_a.sync_if_stale(), 0)
+        self.assertEqual(sync_b.sync_if_stale(), 0)
+        for name in ("a1.txt", "a2.txt", "a3.txt"):
+            self.upload(0, name)
+        self.upload(1, "b1.txt", folder="images")
+
+        # Throttled: no poll until the interval has elapsed
+        self.assertEqual(sync_b.sync_if_stale(), 0)
+        self.assertIsNone(tree_b.get_node("docs/a1.txt"))
+
+        self.clock.now += 1.0
+        self.assertEqual(sync_a.sync_if_stale(), 1)
+        self.assertEqual(sync_b.sync_if_stale(), 3)
+        self.assertEqual(tree_a.to_tree_dict(), tree_b.to_tree_dict())
+        self.assertEqual(tree_b.get_summary("docs")["total_files"], 3)
+
+        # Re-reading the overlap window adds nothing new
+        self.clock.now += 1.0
+        version = tree_b.version
+        self.assertEqual(sync_b.sync_if_stale(), 0)
+        self.assertEqual(tree_b.version, version)
+
+    def test_poll_catches_late_commits_within_overlap(self):
+        """Test a row stamped before the watermark is still applied if inside the overlap."""
+        tree, sync = self.workers[1]
+        self.upload(0, "first.txt")
+        sync.poll()
+        watermark = sync.watermark[0]
+
+        late = self.upload(0, "late.txt")
+        FileModel.objects.filter(id=late.id).update(updated_at=watermark - timedelta(seconds=1))
+        self.assertEqual(sync.poll(), 1)
+        self.assertIsNotNone(tree.get_node("docs/late.txt"))
+        self.assertEqual(sync.watermark[0], watermark)
+
+    def test_poll_skips_deleted_rows(self):
+        """Test soft-deleted rows are not added."""
+        tree, sync = self.workers[1]
+        record = self.upload(0, "gone.txt")
+        FileModel.objects.filter(id=record.id).update(deleted_at=timezone.now())
+        self.assertEqual(sync.poll(), 0)
+        self.assertIsNone(tree.get_node("docs/gone.txt"))
+
+    def test_poll_applies_deletes(self):
+        """Test rows soft deleted by another worker are removed from the tree."""
+        tree, sync = self.workers[1]
+        record = self.upload(0, "shared.txt")
+        self.assertEqual(sync.poll(), 1)
+        FileModel.objects.filter(id=record.id).update(deleted_at=timezone.now(), updated_at=timezone.now())
+        self.assertEqual(sync.poll(), 1)
+        self.assertIsNone(tree.get_node("docs/shared.txt"))
+
+    def test_poll_applies_moves(self):
+        """Test a folder moved by another worker leaves its old path, and empty folders go with it."""
+        (tree_a, _), (tree_b, sync_b) = self.workers
+        for name in ("a.txt", "b.txt"):
+            self.upload(0, name)
+        self.assertEqual(sync_b.poll(), 2)
+
+        self.repository.move_tree_path("docs", "archive/docs", is_directory=True)
+        tree_a.move("docs", "archive/docs")
+        self.assertEqual(sync_b.poll(), 4)
+        self.assertIsNone(tree_b.get_node("docs"))
+        self.assertEqual(
+            sorted(path for path, _ in tree_a.all_nodes.items()),
+            sorted(path for path, _ in tree_b.all_nodes.items()),
+        )
+
+    def test_poll_keeps_file_added_at_moved_from_path(self):
+        """Test re-reading a move does not remove a newer file at the old path."""
+        tree, sync = self.workers[1]
+        self.upload(0, "a.txt")
+        sync.poll()
+        self.repository.move_tree_path("docs/a.txt", "a.txt", is_directory=False)
+        self.upload(0, "a.txt")
+        # Removed from docs, added at the top, and the new file added in docs
+        self.assertEqual(sync.poll(), 3)
+
+        self.assertEqual(sync.poll(), 0)
+        self.assertIsNotNone(tree.get_node("docs/a.txt"))
+        self.assertIsNotNone(tree.get_node("a.txt"))
+
+    def test_poll_replays_chained_moves_it_missed(self):
+        """Test files moved twice between polls leave no entry at any path they passed through."""
+        tree, sync = self.workers[1]
+        for name in ("a.txt", "x.txt", "y.txt"):
+            self.upload(0, name)
+        sync.poll()
+
+        self.repository.move_tree_path("docs/a.txt", "docs/b.txt", is_directory=False)
+        self.repository.move_tree_path("docs/b.txt", "top/c.txt", is_directory=False)
+        self.repository.move_tree_path("docs", "tmp", is_directory=True)
+        self.repository.move_tree_path("tmp", "archive/docs", is_directory=True)
+        # a.txt, x.txt and y.txt each removed once and added once
+        self.assertEqual(sync.poll(), 6)
+        self.assertEqual(
+            sorted(path for path, _ in tree.all_nodes.items()),
+            ["archive", "archive/docs", "archive/docs/x.txt", "archive/docs/y.txt", "top", "top/c.txt"],
+        )
+
+    def test_idle_worker_reconciles_whole_tree(self):
+        """Test a poll after a long idle spell drops files no live row has and adds missing ones."""
+        tree, sync = self.workers[1]
+        old = timezone.now() - timedelta(hours=1)
+        tree.add_file("ghost/gone.txt", 1, old, old)
+        record = self.upload(0, "kept.txt")
+        FileModel.objects.filter(id=record.id).update(updated_at=old)
+
+        self.assertEqual(sync.poll(), 0)  # Not idle: the row is behind the watermark, the ghost stays
+        self.assertIsNotNone(tree.get_node("ghost/gone.txt"))
+
+        sync.synced_at -= MOVE_LOG_RETENTION
+        self.assertEqual(sync.poll(), 2)
+        self.assertIsNone(tree.get_node("ghost"))
+        self.assertIsNotNone(tree.get_node("docs/kept.txt"))
+        self.assertEqual(sync.reconcile(), 0)
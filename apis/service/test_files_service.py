@@ -0,0 +1,341 @@
+import hashlib
+import io
+import os
+import tempfile
+from datetime import timedelta
+from unittest.mock import Mock, patch
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apis.exceptions.exceptions import BadRequestException, NotFoundException
+from apis.models.file_moves_model import FileMoveModel
+from apis.models.files_model import FileModel
+from apis.models.upload_sessions_model import UploadSessionModel
+from apis.repositories.files_repository import FilesRepository, ProductFilesRepository
+from apis.repositories.products_repository import ProductsRepository
+from apis.repositories.upload_sessions_repository import UPLOADS_DIR, UploadSessionsRepository
+from apis.service.file_tree_sync import MOVE_LOG_RETENTION
+from apis.service.files_service import MAX_RESUMABLE_UPLOAD_SIZE, FilesService
+from libs.file_tree import FileTreeStructure
+
+
+class TestFilesServiceBrowseTree(TestCase):
+    def setUp(self):
+        """Set up a service over a small tree."""
+        self.file_tree = FileTreeStructure()
+        for path in ("docs/a.txt", "docs/b.txt", "docs/c.txt", "docs/sub/d.txt", "docs/sub/e.txt", "top.txt"):
+            self.file_tree.add_file(path, 10)
+        self.files_service = FilesService(
+            files_repository=Mock(spec=FilesRepository),
+            product_files_repository=Mock(spec=ProductFilesRepository),
+            products_repository=Mock(spec=ProductsRepository),
+            file_tree=self.file_tree,
+        )
+
+    def test_browse_root(self):
+        """Test the root lists one level with aggregates and no expansion."""
+        result = self.files_service.browse_tree()
+
+        self.assertEqual(result["path"], "")
+        self.assertEqual(result["version"], self.file_tree.version)
+        self.assertEqual((result["total_files"], result["total_folders"]), (6, 2))
+        self.assertEqual([c["name"] for c in result["children"]], ["docs", "top.txt"])
+        self.assertNotIn("children", result["children"][0])
+        self.assertEqual(result["children"][0]["total_size"], 50)
+        self.assertIsNone(result["next_cursor"])
+
+    def test_cursor_pagination(self):
+        """Test pages follow each other without gaps or repeats."""
+        names = []
+        cursor = None
+        while True:
+            page = self.files_service.browse_tree(path="/docs/", limit=2, cursor=cursor)
+            names.extend(child["name"] for child in page["children"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        self.assertEqual(names, ["sub", "a.txt", "b.txt", "c.txt"])
+
+    def test_cursor_survives_inserts(self):
+        """Test a cursor keeps its position when earlier children are added."""
+        page = self.files_service.browse_tree(path="docs", limit=2)
+        self.file_tree.add_file("docs/aa.txt")
+        next_page = self.files_service.browse_tree(path="docs", limit=2, cursor=page["next_cursor"])
+        self.assertEqual([c["name"] for c in next_page["children"]], ["aa.txt", "b.txt"])
+
+    def test_depth_expands_with_paged_children(self):
+        """Test nested levels carry their own first page and cursor."""
+        result = self.files_service.browse_tree(depth=3, limit=1)
+        docs = result["children"][0]
+        self.assertEqual(docs["name"], "docs")
+        self.assertEqual([c["name"] for c in docs["children"]], ["sub"])
+        self.assertIsNotNone(docs["next_cursor"])
+        self.assertEqual([c["name"] for c in docs["children"][0]["children"]], ["d.txt"])
+
+    def test_errors(self):
+        """Test unknown folders, files and malformed cursors are rejected."""
+        with self.assertRaises(NotFoundException):
+            self.files_service.browse_tree(path="missing")
+        with self.assertRaises(BadRequestException):
+            self.files_service.browse_tree(path="top.txt")
+        with self.assertRaises(BadRequestException):
+            self.files_service.browse_tree(cursor="not-a-cursor")
+
+
+
+class TestFilesServiceSearch(TestCase):
+    def setUp(self):
+        """Set up a service over a small indexed tree."""
+        self.file_tree = FileTreeStructure(indexed=True)
+        for path, size in (("docs/a.pdf", 10), ("docs/b.pdf", 20), ("docs/c.txt", 30), ("d.pdf", 40)):
+            self.file_tree.add_file(path, size)
+        self.files_service = FilesService(
+            files_repository=Mock(spec=FilesRepository),
+            product_files_repository=Mock(spec=ProductFilesRepository),
+            products_repository=Mock(spec=ProductsRepository),
+            file_tree=self.file_tree,
+        )
+
+    def test_search_by_extension_under_folder(self):
+        """Test extensions are normalized and results limited below the folder."""
+        result = self.files_service.search_files(path="/docs/", extension="PDF", limit=1)
+        self.assertEqual(len(result["results"]), 1)
+        self.assertTrue(result["has_more"])
+        self.assertEqual(result["results"][0]["extension"], ".pdf")
+
+        result = self.files_service.search_files(extension=".pdf", min_size=15)
+        self.assertEqual(sorted(entry["path"] for entry in result["results"]), ["d.pdf", "docs/b.pdf"])
+        self.assertFalse(result["has_more"])
+
+    def test_search_errors(self):
+        """Test searching below a missing folder or a file fails."""
+        with self.assertRaises(NotFoundException):
+            self.files_service.search_files(path="missing")
+        with self.assertRaises(BadRequestException):
+            self.files_service.search_files(path="d.pdf")
+
+
+class TestFilesServiceTreeChanges(TestCase):
+    def setUp(self):
+        """Set up stored files, their rows and a matching tree."""
+        self.media = tempfile.TemporaryDirectory()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media.name)
+        self.settings_override.enable()
+        self.file_tree = FileTreeStructure()
+        self.rows = {}
+        for tree_path, stored_path in (
+            ("docs/2024/a.pdf", "docs/2024/u1.pdf"),
+            ("docs/b.txt", "docs/u2.txt"),
+            ("docs/sub/b.txt", "docs/sub/u3.txt"),
+        ):
+            default_storage.save(stored_path, ContentFile(b"data"))
+            self.rows[tree_path] = FileModel.objects.create(
+                file_name=tree_path.rsplit('/', 1)[1], file_path=stored_path, file_size=4,
+                file_type="application/octet-stream", file_data=b"",
+            )
+            self.file_tree.add_file(tree_path, 4)
+        self.files_service = FilesService(
+            files_repository=FilesRepository(),
+            product_files_repository=Mock(spec=ProductFilesRepository),
+            products_repository=Mock(spec=ProductsRepository),
+            file_tree=self.file_tree,
+        )
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.media.cleanup()
+
+    def row(self, tree_path):
+        return FileModel.objects.get(id=self.rows[tree_path].id)
+
+    def test_move_folder_rewrites_rows_and_storage(self):
+        """Test a folder move re-points every row below it and moves the stored files."""
+        with self.captureOnCommitCallbacks(execute=True):
+            result = self.files_service.move_path("docs/2024", "archive/2024")
+        self.assertEqual((result["path"], result["updated_count"]), ("archive/2024", 1))
+        self.assertEqual(self.row("docs/2024/a.pdf").file_path, "archive/2024/u1.pdf")
+        self.assertEqual(
+            list(FileMoveModel.objects.values_list("file_id", "previous_tree_path")),
+            [(self.rows["docs/2024/a.pdf"].id, "docs/2024/a.pdf")],
+        )
+        self.assertTrue(default_storage.exists("archive/2024/u1.pdf"))
+        self.assertFalse(default_storage.exists("docs/2024/u1.pdf"))
+        self.assertIsNotNone(self.file_tree.get_node("archive/2024/a.pdf"))
+        self.assertIsNone(self.file_tree.get_node("docs/2024"))
+
+    def test_rename_and_move_file(self):
+        """Test a file rename touches only its own row, and a move swaps its folder."""
+        result = self.files_service.rename_path("docs/b.txt", "c.txt")
+        self.assertEqual(result["updated_count"], 1)
+        self.assertEqual(self.row("docs/b.txt").file_name, "c.txt")
+        self.assertEqual(self.row("docs/sub/b.txt").file_name, "b.txt")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.files_service.move_path("docs/c.txt", "top.txt")
+        self.assertEqual(self.row("docs/b.txt").file_path, "u2.txt")
+        self.assertEqual(
+            sorted(FileMoveModel.objects.values_list("previous_tree_path", flat=True)), ["docs/b.txt", "docs/c.txt"]
+        )
+        self.assertTrue(default_storage.exists("u2.txt"))
+
+        with self.assertRaises(BadRequestException):
+            self.files_service.move_path("top.txt", "docs/sub/b.txt")
+        self.assertEqual(self.row("docs/b.txt").file_path, "u2.txt")
+
+    def test_prune_move_log_keeps_recent_moves(self):
+        """Test only move log entries past the retention are pruned."""
+        self.files_service.move_path("docs/b.txt", "b.txt")
+        self.files_service.move_path("docs/sub", "sub")
+        FileMoveModel.objects.filter(previous_tree_path="docs/b.txt").update(
+            moved_at=timezone.now() - MOVE_LOG_RETENTION - timedelta(minutes=1)
+        )
+        self.assertEqual(self.files_service.prune_move_log(), 1)
+        self.assertEqual(list(FileMoveModel.objects.values_list("previous_tree_path", flat=True)), ["docs/sub/b.txt"])
+
+    def test_failed_move_restores_tree(self):
+        """Test a move whose row update fails puts the node back and drops the folders it created."""
+        self.file_tree.add_file("empty/x.txt")
+        self.file_tree.remove("empty/x.txt")
+        with patch.object(FilesRepository, "move_tree_path", side_effect=RuntimeError("database down")):
+            with self.assertRaises(RuntimeError):
+                self.files_service.move_path("docs/b.txt", "empty/new/b.txt")
+        self.assertIsNotNone(self.file_tree.get_node("docs/b.txt"))
+        self.assertIsNone(self.file_tree.get_node("empty/new"))
+        # Already there before the move, so kept although empty
+        self.assertIsNotNone(self.file_tree.get_node("empty"))
+
+    def test_rolled_back_move_leaves_stored_files(self):
+        """Test stored files only move once the surrounding transaction commits."""
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                self.files_service.move_path("docs/2024", "archive/2024")
+                raise RuntimeError("later step failed")
+        self.assertEqual(callbacks, [])
+        self.assertTrue(default_storage.exists("docs/2024/u1.pdf"))
+        self.assertFalse(default_storage.exists("archive/2024/u1.pdf"))
+
+    def test_delete_folder(self):
+        """Test deleting a folder soft deletes every row below it."""
+        result = self.files_service.delete_path("/docs/")
+        self.assertEqual(result["updated_count"], 3)
+        self.assertFalse(FileModel.objects.filter(deleted_at=None).exists())
+        self.assertIsNone(self.file_tree.get_node("docs"))
+
+        with self.assertRaises(NotFoundException):
+            self.files_service.delete_path("docs")
+
+
+class TestFilesServiceResumableUpload(TestCase):
+    def setUp(self):
+        """Set up a service with real repositories over a temporary media root."""
+        self.media = tempfile.TemporaryDirectory()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media.name)
+        self.settings_override.enable()
+        self.file_tree = FileTreeStructure()
+        self.upload_sessions_repository = UploadSessionsRepository()
+        self.files_service = FilesService(
+            files_repository=FilesRepository(),
+            product_files_repository=Mock(spec=ProductFilesRepository),
+            products_repository=Mock(spec=ProductsRepository),
+            file_tree=self.file_tree,
+            upload_sessions_repository=self.upload_sessions_repository,
+        )
+        self.chunk_size = 64 * 1024
+        self.data = os.urandom(self.chunk_size * 2 + 1000)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.media.cleanup()
+
+    def start(self, **body):
+        return self.files_service.create_upload_session({
+            "file_name": "video.mp4", "folder_path": "media", "total_size": len(self.data),
+            "chunk_size": self.chunk_size, **body,
+        })
+
+    def put(self, upload_id, index):
+        chunk = self.data[index * self.chunk_size:(index + 1) * self.chunk_size]
+        return self.files_service.upload_chunk(upload_id, index, io.BytesIO(chunk))
+
+    def test_chunks_in_any_order_then_complete(self):
+        """Test chunks sent out of order and repeated assemble into the original file."""
+        session = self.start()
+        upload_id = session["upload_id"]
+        self.assertEqual((session["total_chunks"], session["missing_chunks"]), (3, [0, 1, 2]))
+
+        self.assertEqual(self.put(upload_id, 2)["size"], 1000)
+        self.put(upload_id, 0)
+        self.put(upload_id, 0)
+        status = self.files_service.get_upload_session(upload_id)
+        self.assertEqual((status["received_chunks"], status["missing_chunks"]), ([0, 2], [1]))
+        with self.assertRaises(BadRequestException):
+            self.files_service.complete_upload_session(upload_id)
+        self.assertIsNone(self.file_tree.get_node("media/video.mp4"))
+
+        self.put(upload_id, 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            result = self.files_service.complete_upload_session(upload_id)
+        self.assertEqual(result["file_size"], len(self.data))
+        self.assertEqual(result["checksum"], hashlib.sha256(self.data).hexdigest())
+        with default_storage.open(result["file_path"]) as stored:
+            self.assertEqual(stored.read(), self.data)
+        record = FileModel.objects.get(id=result["file_id"])
+        self.assertEqual((record.file_name, record.file_type), ("video.mp4", "video/mp4"))
+        self.assertEqual(self.file_tree.get_node("media/video.mp4").size, len(self.data))
+        self.assertFalse(os.path.exists(os.path.join(self.media.name, UPLOADS_DIR, upload_id)))
+
+        with self.assertRaises(NotFoundException):
+            self.files_service.complete_upload_session(upload_id)
+
+    def test_failed_completion_leaves_no_file_or_node(self):
+        """Test a completion that fails after storing leaves the tree, storage and session as they were."""
+        upload_id = self.start()["upload_id"]
+        for index in range(3):
+            self.put(upload_id, index)
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with patch.object(UploadSessionsRepository, "complete_session", side_effect=RuntimeError("database down")):
+                with self.assertRaises(RuntimeError):
+                    self.files_service.complete_upload_session(upload_id)
+        self.assertEqual(callbacks, [])
+        self.assertIsNone(self.file_tree.get_node("media/video.mp4"))
+        self.assertFalse(FileModel.objects.exists())
+        self.assertFalse(os.path.exists(os.path.join(self.media.name, "media")))
+        # Only the chunks remain; the assembled file was deleted with the failure
+        session_dir = os.path.join(self.media.name, UPLOADS_DIR, upload_id)
+        self.assertEqual(sorted(os.listdir(session_dir)), ["0.part", "1.part", "2.part"])
+        self.assertEqual(self.files_service.get_upload_session(upload_id)["missing_chunks"], [])
+
+    def test_rejects_bad_chunks_and_sessions(self):
+        """Test wrong chunk sizes and indexes, oversized files and too deep paths are refused."""
+        upload_id = self.start()["upload_id"]
+        with self.assertRaises(BadRequestException):
+            self.files_service.upload_chunk(upload_id, 0, io.BytesIO(b"short"))
+        with self.assertRaises(BadRequestException):
+            self.files_service.upload_chunk(upload_id, 2, io.BytesIO(self.data[-1001:]))
+        with self.assertRaises(BadRequestException):
+            self.put(upload_id, 3)
+        self.assertEqual(self.upload_sessions_repository.received_chunks(upload_id), [])
+
+        with self.assertRaises(BadRequestException):
+            self.start(total_size=MAX_RESUMABLE_UPLOAD_SIZE + 1)
+        with self.assertRaises(BadRequestException):
+            self.start(folder_path="a/b/c")
+
+    def test_expired_sessions_are_swept(self):
+        """Test the sweeper removes expired sessions with their chunks and leaves open ones."""
+        expired_id = self.start()["upload_id"]
+        self.put(expired_id, 0)
+        open_id = self.start()["upload_id"]
+        self.put(open_id, 0)
+        UploadSessionModel.objects.filter(id=expired_id).update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        self.assertEqual(self.files_service.expire_upload_sessions(), 1)
+        with self.assertRaises(NotFoundException):
+            self.files_service.get_upload_session(expired_id)
+        self.assertEqual(self.upload_sessions_repository.received_chunks(expired_id), [])
+        self.assertEqual(self.upload_sessions_repository.received_chunks(open_id), [0])
@@ -9,6 +9,7 @@ from apis.repositories.products_repository import ProductsRepository
 from apis.exceptions.exceptions import NotFoundException
 from apis.exceptions.error_codes import ProductErrorCode
 from apis.models.products_model import ProductModel
+from libs.cache import LRUCache
 
 
 class TestProductsService(TestCase):
@@ -279,6 +280,39 @@ class TestProductsService(TestCase):
         self.assertEqual(len(result["products"]), 1)
         self.assertEqual(result["products"][0]["name"], "Test Product")
 
+    def test_get_product_served_from_cache(self):
+        """Test repeated product lookups hit the cache instead of the repository."""
+        # Arrange
+        service = ProductsService(self.mock_repository, cache=LRUCache(max_entries=10))
+        self.mock_repository.find_one.return_value = self.sample_product
+        
+        # Act
+        first = service.get_product(self.sample_product_id)
+        first["name"] = "Mutated by caller"
+        second = service.get_product(self.sample_product_id)
+        
+        # Assert
+        self.mock_repository.find_one.assert_called_once_with(id=self.sample_product_id)
+        self.assertEqual(second["name"], "Test Product")
+
+    def test_update_and_delete_invalidate_cache(self):
+        """Test product mutations drop the cached product."""
+        # Arrange
+        cache = LRUCache(max_entries=10)
+        service = ProductsService(self.mock_repository, cache=cache)
+        self.mock_repository.find_one.return_value = self.sample_product
+        self.mock_repository.update.return_value = 1
+        self.mock_repository.delete.return_value = (1, {})
+        
+        # Act & Assert
+        service.get_product(self.sample_product_id)
+        service.update_product(self.sample_product_id, {"name": "Updated"})
+        self.assertEqual(len(cache), 0)
+        
+        service.get_product(self.sample_product_id)
+        service.delete_product(self.sample_product_id)
+        self.assertEqual(len(cache), 0)
+
     @patch('apis.service.products_service.logger')
     def test_service_initialization(self, mock_logger):
         """Test that ProductsService initializes correctly with repository."""
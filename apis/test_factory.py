@@ -0,0 +1,51 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from apis.factory import Factory
+from apis.repositories.files_repository import FilesRepository
+from libs.file_tree import FileTreeStructure
+
+
+class TestFactoryFileTree(SimpleTestCase):
+    def test_concurrent_first_requests_load_tree_once(self):
+        """Test threads racing to create the tree and its sync share one load."""
+        loads = []
+
+        def slow_bulk_load(tree, entries):
+            loads.append(threading.get_ident())
+            time.sleep(0.05)  # Long enough for every thread to pass the first check
+            return {"files": 0, "folders": 0, "skipped": 0, "seconds": 0.05}
+
+        factory = Factory()
+        with patch.object(FilesRepository, "iter_tree_entries", return_value=iter(())), \
+                patch.object(FileTreeStructure, "bulk_load", slow_bulk_load):
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                trees = list(pool.map(lambda _: factory.create_file_tree(), range(8)))
+                syncs = list(pool.map(lambda _: factory.create_file_tree_sync(), range(8)))
+
+        self.assertEqual(len(loads), 1)
+        self.assertTrue(all(tree is trees[0] for tree in trees))
+        self.assertTrue(all(sync is syncs[0] for sync in syncs))
+        self.assertIs(syncs[0].file_tree, trees[0])
+
+    def test_warm_up_loads_tree_before_first_request(self):
+        """Test warm_up loads the tree and sync once, and the first request reuses them."""
+        factory = Factory()
+        with patch.object(FilesRepository, "iter_tree_entries", return_value=iter(())) as entries:
+            factory.warm_up()
+            tree = factory.create_file_tree()
+            self.assertIs(factory.create_file_tree_sync().file_tree, tree)
+        self.assertEqual(entries.call_count, 1)
+
+    def test_failed_warm_up_falls_back_to_lazy_load(self):
+        """Test a startup load failure is logged and the first request loads the tree instead."""
+        factory = Factory()
+        with patch.object(FilesRepository, "iter_tree_entries", side_effect=RuntimeError("database down")), \
+                self.assertLogs("apis.factory", level="ERROR"):
+            factory.warm_up()
+        with patch.object(FilesRepository, "iter_tree_entries", return_value=iter([("a.txt", 1, None, None)])):
+            self.assertIsNotNone(factory.create_file_tree().get_node("a.txt"))
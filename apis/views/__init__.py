@@ -4,10 +4,26 @@ from .products_view import (
 )
 from .files_view import (
     FileUploadView,
+    FileTreeView,
+    FileSearchView,
+    FileMoveView,
+    FileRenameView,
+    UploadSessionsView,
+    UploadSessionDetailView,
+    UploadChunkView,
+    UploadSessionCompleteView,
 )
 
 __all__ = [
     "ListCreateProductsView", 
     "ProductDetailView",
     "FileUploadView",
+    "FileTreeView",
+    "FileSearchView",
+    "FileMoveView",
+    "FileRenameView",
+    "UploadSessionsView",
+    "UploadSessionDetailView",
+    "UploadChunkView",
+    "UploadSessionCompleteView",
 ]
\ No newline at end of file
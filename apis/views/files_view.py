@@ -1,10 +1,23 @@
+from django.http import StreamingHttpResponse
 from rest_framework import generics
 from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.response import Response
 from libs import serializer
 from libs.response import make_response
 from apis.serializer.files_serializer import (
     UploadFileRequestSerializer,
     UploadFileResponseSerializer,
+    BrowseTreeRequestSerializer,
+    BrowseTreeResponseSerializer,
+    SearchFilesRequestSerializer,
+    SearchFilesResponseSerializer,
+    TreePathRequestSerializer,
+    MoveTreePathRequestSerializer,
+    RenameTreePathRequestSerializer,
+    TreeChangeResponseSerializer,
+    CreateUploadSessionRequestSerializer,
+    UploadSessionResponseSerializer,
+    UploadChunkResponseSerializer,
 )
 from http import HTTPStatus
 from apis.factory import factory
@@ -29,12 +42,211 @@ class FileUploadView(generics.CreateAPIView):
             files_service = factory.create_files_service()
 
             response = files_service.upload_file(body=body)
-            return make_response(
+            http_response = make_response(
                 serializer_class=UploadFileResponseSerializer,
                 data=response,
                 status_code=HTTPStatus.CREATED,
             )
+            # Lets clients revalidate the tree they just received
+            http_response["ETag"] = files_service.file_tree.etag
+            return http_response
         except Exception as e:
             logger.error(f"Error in file upload: {str(e)}")
             raise
 
+
+class FileTreeView(generics.GenericAPIView):
+    """
+    File Tree View
+    ---
+    get: Browse the file tree
+    List one page of a folder's children, optionally expanding a few levels.
+    Pass next_cursor back as cursor to fetch the following page. With
+    full=true the whole subtree at path is streamed as JSON instead. Responses
+    carry an ETag; a matching If-None-Match returns 304 Not Modified.
+
+    delete: Delete a file or folder
+    Soft delete the file rows at path (everything below it for a folder) and
+    drop them from the tree.
+    """
+
+    @serializer(query=BrowseTreeRequestSerializer)
+    def get(self, request, query):
+        files_service = factory.create_files_service()
+        files_service.sync_tree()  # Before the ETag, so it covers other workers' uploads
+        etag = files_service.file_tree.etag
+        if request.headers.get("If-None-Match") == etag:
+            return Response(status=HTTPStatus.NOT_MODIFIED, headers={"ETag": etag})
+
+        if query.pop("full"):
+            # Encoded chunk by chunk, so memory stays flat for any tree size
+            http_response = StreamingHttpResponse(
+                files_service.stream_tree(query["path"]),
+                content_type="application/json",
+            )
+            http_response["ETag"] = etag
+            return http_response
+
+        response = files_service.browse_tree(**query)
+        http_response = make_response(
+            serializer_class=BrowseTreeResponseSerializer,
+            data=response,
+            status_code=HTTPStatus.OK,
+        )
+        http_response["ETag"] = etag
+        return http_response
+
+    @serializer(query=TreePathRequestSerializer)
+    def delete(self, query):
+        files_service = factory.create_files_service()
+        response = files_service.delete_path(**query)
+        return make_response(
+            serializer_class=TreeChangeResponseSerializer,
+            data=response,
+            status_code=HTTPStatus.OK,
+        )
+
+
+class FileMoveView(generics.GenericAPIView):
+    """
+    File Move View
+    ---
+    post: Move a file or folder
+    Move a file or folder to a new path, creating missing folders. Every
+    affected file row is updated in one statement.
+    """
+
+    @serializer(body=MoveTreePathRequestSerializer)
+    def post(self, body):
+        files_service = factory.create_files_service()
+        response = files_service.move_path(**body)
+        return make_response(
+            serializer_class=TreeChangeResponseSerializer,
+            data=response,
+            status_code=HTTPStatus.OK,
+        )
+
+
+class FileRenameView(generics.GenericAPIView):
+    """
+    File Rename View
+    ---
+    post: Rename a file or folder
+    Rename a file or folder within its folder. Every affected file row is
+    updated in one statement.
+    """
+
+    @serializer(body=RenameTreePathRequestSerializer)
+    def post(self, body):
+        files_service = factory.create_files_service()
+        response = files_service.rename_path(**body)
+        return make_response(
+            serializer_class=TreeChangeResponseSerializer,
+            data=response,
+            status_code=HTTPStatus.OK,
+        )
+
+
+class FileSearchView(generics.GenericAPIView):
+    """
+    File Search View
+    ---
+    get: Search files in the tree
+    Find files below a folder by extension, MIME type and size range, served
+    from the tree's secondary indexes. Returns at most limit files and whether
+    more matched.
+    """
+
+    @serializer(query=SearchFilesRequestSerializer)
+    def get(self, request, query):
+        files_service = factory.create_files_service()
+        files_service.sync_tree()
+        response = files_service.search_files(**query)
+        return make_response(
+            serializer_class=SearchFilesResponseSerializer,
+            data=response,
+            status_code=HTTPStatus.OK,
+        )
+
+
+class UploadSessionsView(generics.GenericAPIView):
+    """
+    Upload Sessions View
+    ---
+    post: Start a resumable upload
+    Create an upload session for a file of total_size bytes. PUT its chunks,
+    then complete it; files may exceed the single upload's 50MB limit.
+    """
+
+    @serializer(body=CreateUploadSessionRequestSerializer)
+    def post(self, body):
+        files_service = factory.create_files_service()
+        response = files_service.create_upload_session(body=body)
+        return make_response(
+            serializer_class=UploadSessionResponseSerializer,
+            data=response,
+            status_code=HTTPStatus.CREATED,
+        )
+
+
+class UploadSessionDetailView(generics.GenericAPIView):
+    """
+    Upload Session Detail View
+    ---
+    get: Resumable upload status
+    List the chunks received so far and those still missing, so an
+    interrupted client re-sends only the missing ones.
+    """
+
+    @serializer()
+    def get(self, upload_id):
+        files_service = factory.create_files_service()
+        response = files_service.get_upload_session(upload_id=upload_id)
+        return make_response(
+            serializer_class=UploadSessionResponseSerializer,
+            data=response,
+            status_code=HTTPStatus.OK,
+        )
+
+
+class UploadChunkView(generics.GenericAPIView):
+    """
+    Upload Chunk View
+    ---
+    put: Upload one chunk
+    Store the raw request body as chunk index (from 0). Chunks may be sent
+    in any order, in parallel, and again after a failure.
+    """
+
+    @serializer()
+    def put(self, request, upload_id, index):
+        files_service = factory.create_files_service()
+        # Read straight from the request stream; request.data would buffer the chunk
+        response = files_service.upload_chunk(upload_id=upload_id, index=index, stream=request.stream)
+        return make_response(
+            serializer_class=UploadChunkResponseSerializer,
+            data=response,
+            status_code=HTTPStatus.OK,
+        )
+
+
+class UploadSessionCompleteView(generics.GenericAPIView):
+    """
+    Upload Session Complete View
+    ---
+    post: Complete a resumable upload
+    Assemble the received chunks into the file and register it, as a single
+    upload does. Fails while chunks are missing.
+    """
+
+    @serializer()
+    def post(self, upload_id):
+        files_service = factory.create_files_service()
+        response = files_service.complete_upload_session(upload_id=upload_id)
+        http_response = make_response(
+            serializer_class=UploadFileResponseSerializer,
+            data=response,
+            status_code=HTTPStatus.CREATED,
+        )
+        http_response["ETag"] = files_service.file_tree.etag
+        return http_response
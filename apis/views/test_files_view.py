@@ -0,0 +1,69 @@
+import json
+import tempfile
+
+from django.test import TestCase, override_settings
+
+
+class TestFileTreeView(TestCase):
+    def test_etag_and_not_modified(self):
+        """Test the tree endpoint sends an ETag and honours If-None-Match."""
+        response = self.client.get("/api/files/tree", {"depth": 1})
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+
+        response = self.client.get("/api/files/tree", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_bounds_validated(self):
+        """Test oversized expansions are rejected."""
+        response = self.client.get("/api/files/tree", {"depth": 3, "limit": 500})
+        self.assertEqual(response.status_code, 400)
+
+    def test_full_tree_streams_json(self):
+        """Test full=true streams the subtree as one JSON document."""
+        response = self.client.get("/api/files/tree", {"full": "true"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        document = json.loads(b"".join(response.streaming_content))
+        self.assertEqual(document["path"], "")
+        self.assertIn("children", document)
+
+        response = self.client.get("/api/files/tree", {"full": "true", "path": "no/such/folder"})
+        self.assertEqual(response.status_code, 404)
+
+
+class TestFileSearchView(TestCase):
+    def test_search(self):
+        """Test the search endpoint answers and validates its size range."""
+        response = self.client.get("/api/files/search", {"extension": "pdf", "min_size": 0})
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get("/api/files/search", {"min_size": 10, "max_size": 1})
+        self.assertEqual(response.status_code, 400)
+
+
+class TestResumableUploadViews(TestCase):
+    def test_upload_in_chunks(self):
+        """Test a file sent as raw chunk bodies is assembled on completion."""
+        data = b"x" * (64 * 1024) + b"tail"
+        with tempfile.TemporaryDirectory() as media, override_settings(MEDIA_ROOT=media):
+            response = self.client.post(
+                "/api/files/uploads",
+                {"file_name": "notes.txt", "folder_path": "resumable", "total_size": len(data), "chunk_size": 64 * 1024},
+                content_type="application/json",
+            )
+            self.assertEqual(response.status_code, 201)
+            upload_id = response.json()["upload_id"]
+
+            for index, chunk in ((1, data[64 * 1024:]), (0, data[:64 * 1024])):
+                response = self.client.put(
+                    f"/api/files/uploads/{upload_id}/chunks/{index}", chunk,
+                    content_type="application/octet-stream",
+                )
+                self.assertEqual(response.status_code, 200)
+            self.assertEqual(self.client.get(f"/api/files/uploads/{upload_id}").json()["missing_chunks"], [])
+
+            response = self.client.post(f"/api/files/uploads/{upload_id}/complete")
+            self.assertEqual(response.status_code, 201)
+            self.assertEqual(response.json()["file_size"], len(data))
+            self.assertEqual(self.client.get(f"/api/files/uploads/{upload_id}").status_code, 404)
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
 
 application = get_wsgi_application()
+
+# Imported once the apps are set up; loads the file tree before the first request
+from apis.factory import factory  # noqa: E402
+
+factory.warm_up()
@@ -0,0 +1,3 @@
+from .lru_cache import LRUCache
+
+__all__ = ["LRUCache"]
@@ -0,0 +1,184 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+from libs.hashmap import HashMap
+
+
+class _Entry:
+    """Cache entry that is also a node of the intrusive recency list"""
+    __slots__ = ("key", "value", "weight", "expires_at", "prev", "next")
+
+    def __init__(self, key=None, value=None, weight=0, expires_at=None):
+        self.key = key
+        self.value = value
+        self.weight = weight
+        self.expires_at = expires_at
+        self.prev = self
+        self.next = self
+
+
+class LRUCache:
+    """
+    Bounded in-process cache with least-recently-used eviction and optional TTL
+
+    A HashMap indexes the entries, and each entry is linked into a circular
+    doubly linked list ordered from most to least recently used, so get, put
+    and eviction are all O(1). The cache is bounded by entry count and, when
+    max_weight is set, by the total weight of its entries. Expired entries are
+    dropped when they are read or reach the tail. Safe to share across threads.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_weight: Optional[int] = None,
+        ttl: Optional[float] = None,
+        weigher: Optional[Callable[[Any], int]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize the cache
+
+        Args:
+            max_entries: Maximum number of entries kept
+            max_weight: Optional maximum total weight of all entries
+            ttl: Default time-to-live in seconds (None keeps entries until evicted)
+            weigher: Function giving a value's weight; every entry weighs 1 without it
+            clock: Monotonic time source, injectable for tests
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.max_weight = max_weight
+        self.ttl = ttl
+        self.weigher = weigher
+        self.clock = clock
+
+        self._map = HashMap()
+        self._head = _Entry()  # Sentinel: head.next is most, head.prev least recently used
+        self._weight = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _unlink(self, entry: _Entry):
+        entry.prev.next = entry.next
+        entry.next.prev = entry.prev
+
+    def _push_front(self, entry: _Entry):
+        head = self._head
+        entry.prev = head
+        entry.next = head.next
+        head.next.prev = entry
+        head.next = entry
+
+    def _drop(self, entry: _Entry):
+        """Remove an entry from both the list and the index"""
+        self._unlink(entry)
+        self._map.remove(entry.key)
+        self._weight -= entry.weight
+
+    def _is_expired(self, entry: _Entry, now: float) -> bool:
+        return entry.expires_at is not None and entry.expires_at <= now
+
+    def _evict(self, now: float):
+        """Evict from the tail until both bounds hold"""
+        head = self._head
+        while head.prev is not head and (
+            len(self._map) > self.max_entries
+            or (self.max_weight is not None and self._weight > self.max_weight)
+        ):
+            victim = head.prev
+            self._drop(victim)
+            if self._is_expired(victim, now):
+                self.expirations += 1
+            else:
+                self.evictions += 1
+
+    def get(self, key, default=None):
+        """Return the cached value for key and mark it most recently used"""
+        with self._lock:
+            entry = self._map.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            if self._is_expired(entry, self.clock()):
+                self._drop(entry)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._unlink(entry)
+            self._push_front(entry)
+            self.hits += 1
+            return entry.value
+
+    def put(self, key, value, ttl: Optional[float] = None, weight: Optional[int] = None):
+        """
+        Insert or replace key, evicting least recently used entries if needed
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: Per-entry time-to-live in seconds, overriding the default
+            weight: Per-entry weight, overriding the weigher
+        """
+        if weight is None:
+            weight = self.weigher(value) if self.weigher else 1
+        if self.max_weight is not None and weight > self.max_weight:
+            # Could never fit; make sure no stale copy survives either
+            self.invalidate(key)
+            return
+        ttl = self.ttl if ttl is None else ttl
+
+        with self._lock:
+            now = self.clock()
+            entry = self._map.get(key)
+            if entry is not None:
+                self._drop(entry)
+            entry = _Entry(key, value, weight, now + ttl if ttl is not None else None)
+            self._map.put(key, entry)
+            self._push_front(entry)
+            self._weight += weight
+            self._evict(now)
+
+    def invalidate(self, key) -> bool:
+        """Remove key from the cache; returns whether it was present"""
+        with self._lock:
+            entry = self._map.get(key)
+            if entry is None:
+                return False
+            self._drop(entry)
+            return True
+
+    def clear(self):
+        """Remove every entry (counters are kept)"""
+        with self._lock:
+            self._map = HashMap()
+            self._head.prev = self._head.next = self._head
+            self._weight = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss/eviction counters and current usage"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._map),
+                "weight": self._weight,
+                "max_entries": self.max_entries,
+                "max_weight": self.max_weight,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def __len__(self):
+        return len(self._map)
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._map.get(key)
+            return entry is not None and not self._is_expired(entry, self.clock())
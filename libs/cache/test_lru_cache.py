@@ -0,0 +1,101 @@
+from django.test import TestCase
+from .lru_cache import LRUCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLRUCache(TestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.clock = FakeClock()
+        self.cache = LRUCache(max_entries=3, clock=self.clock)
+
+    def test_get_and_put(self):
+        """Test basic get/put with hit and miss counting."""
+        self.assertIsNone(self.cache.get("key1"))
+        self.cache.put("key1", "value1")
+        self.assertEqual(self.cache.get("key1"), "value1")
+        self.assertEqual(self.cache.get("missing", "default"), "default")
+
+        stats = self.cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 2)
+        self.assertEqual(stats["size"], 1)
+
+    def test_evicts_least_recently_used(self):
+        """Test the least recently used entry is evicted once max_entries is exceeded."""
+        for key in ("a", "b", "c"):
+            self.cache.put(key, key)
+        self.cache.get("a")  # "b" is now the least recently used
+        self.cache.put("d", "d")
+
+        self.assertNotIn("b", self.cache)
+        for key in ("a", "c", "d"):
+            self.assertIn(key, self.cache)
+        self.assertEqual(len(self.cache), 3)
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+    def test_replace_refreshes_recency(self):
+        """Test replacing a key updates its value without growing the cache."""
+        for key in ("a", "b", "c"):
+            self.cache.put(key, key)
+        self.cache.put("a", "updated")
+        self.cache.put("d", "d")
+        self.assertEqual(self.cache.get("a"), "updated")
+        self.assertNotIn("b", self.cache)
+        self.assertEqual(len(self.cache), 3)
+
+    def test_max_weight(self):
+        """Test total weight bound and oversized values."""
+        cache = LRUCache(max_entries=100, max_weight=10, weigher=len, clock=self.clock)
+        cache.put("a", "x" * 4)
+        cache.put("b", "x" * 4)
+        cache.put("c", "x" * 4)  # 12 > 10 evicts "a"
+        self.assertNotIn("a", cache)
+        self.assertEqual(cache.stats()["weight"], 8)
+
+        cache.put("b", "x" * 11)  # Can never fit, and the old "b" must not linger
+        self.assertNotIn("b", cache)
+        self.assertEqual(cache.stats()["weight"], 4)
+
+    def test_ttl_expiry(self):
+        """Test default and per-entry TTLs."""
+        cache = LRUCache(max_entries=10, ttl=5, clock=self.clock)
+        cache.put("default", 1)
+        cache.put("short", 2, ttl=1)
+        cache.put("forever", 3, ttl=float("inf"))
+
+        self.clock.now = 2
+        self.assertIsNone(cache.get("short"))
+        self.assertEqual(cache.get("default"), 1)
+
+        self.clock.now = 10
+        self.assertNotIn("default", cache)
+        self.assertIsNone(cache.get("default"))
+        self.assertEqual(cache.get("forever"), 3)
+        self.assertEqual(cache.stats()["expirations"], 2)
+
+    def test_invalidate_and_clear(self):
+        """Test explicit invalidation and clearing."""
+        self.cache.put("a", 1)
+        self.cache.put("b", 2)
+        self.assertTrue(self.cache.invalidate("a"))
+        self.assertFalse(self.cache.invalidate("a"))
+        self.cache.clear()
+        self.assertEqual(len(self.cache), 0)
+        self.cache.put("c", 3)
+        self.assertEqual(self.cache.get("c"), 3)
+
+    def test_memory_stays_bounded(self):
+        """Test sustained inserts never exceed the bound."""
+        for i in range(1000):
+            self.cache.put(i, i)
+        self.assertEqual(len(self.cache), 3)
+        self.assertEqual(self.cache.stats()["evictions"], 997)
@@ -1,3 +1,13 @@
 from .file_tree import FileTreeStructure
+from .json_stream import iter_tree_json
+from .scanner import DirectoryScanner
+from .snapshot import MappedFileTree, load_tree_snapshot, save_tree_snapshot
 
-__all__ = ["FileTreeStructure"]
\ No newline at end of file
+__all__ = [
+    "DirectoryScanner",
+    "FileTreeStructure",
+    "MappedFileTree",
+    "iter_tree_json",
+    "load_tree_snapshot",
+    "save_tree_snapshot",
+]
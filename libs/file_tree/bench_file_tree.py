@@ -0,0 +1,345 @@
+"""
+Benchmarks for FileTreeStructure
+
+Usage:
+    python -m libs.file_tree.bench_file_tree [--files N] [--index-files N] [--node-files N] [--scan-files N]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+from libs.hashmap import HashMap
+
+from .file_tree import FileTreeStructure
+from .json_stream import iter_tree_json
+from .scanner import DirectoryScanner
+from .snapshot import load_tree_snapshot, save_tree_snapshot
+
+
+def make_paths(count):
+    """Build upload-like file paths spread over nested folders"""
+    return [f"folder_{i % 997}/sub_{i % 31}/file_{i}.pdf" for i in range(count)]
+
+
+def make_deep_paths(count):
+    """Build document-store-like paths: deep folders with long shared prefixes"""
+    return [
+        f"customers/customer_{i % 400:04d}/projects/project_{i % 23:02d}/documents/"
+        f"{2019 + i % 6}/month_{i % 12 + 1:02d}/invoice_{i:07d}.pdf"
+        for i in range(count)
+    ]
+
+
+def timed(func):
+    """Run func once and return (seconds, result)"""
+    started_at = time.perf_counter()
+    result = func()
+    return time.perf_counter() - started_at, result
+
+
+def build_tree(paths):
+    """Replay one add_file per path, as a fresh worker does today"""
+    tree = FileTreeStructure()
+    for path in paths:
+        tree.add_file(path, 1024)
+    return tree
+
+
+def scan_children(tree, directory_path):
+    """The former get_children: scan every path for direct children of a directory"""
+    prefix = directory_path + '/'
+    children = [
+        node for path, node in tree.all_nodes.items()
+        if path.startswith(prefix) and '/' not in path[len(prefix):]
+    ]
+    return sorted(children, key=lambda x: (not x.is_directory, x.name))
+
+
+def bench_children(tree, directories):
+    """Average get_children latency via the child index and via a full scan, plus a full render"""
+    index_seconds, _ = timed(lambda: [tree.get_children(path) for path in directories])
+    scan_seconds, _ = timed(lambda: [scan_children(tree, path) for path in directories])
+    render_seconds, _ = timed(tree.to_tree_dict)
+    return index_seconds / len(directories), scan_seconds / len(directories), render_seconds
+
+
+def bench_upload_render(tree, paths, uploads=20):
+    """Average to_tree_dict time right after one upload, memoized versus from scratch"""
+    tree.to_tree_dict()
+    memoized = cold = 0.0
+    for i in range(uploads):
+        tree.add_file(f"{paths[i * 7919 % len(paths)].rsplit('/', 1)[0]}/upload_{i}.pdf", 1024)
+        memoized += timed(tree.to_tree_dict)[0]
+        clear_render_memo(tree)
+        cold += timed(tree.to_tree_dict)[0]
+    return memoized / uploads, cold / uploads
+
+
+def clear_render_memo(tree):
+    """Drop every memoized to_tree_dict rendering"""
+    tree.root._tree_dict = None
+    for node in tree.all_nodes.values():
+        node._tree_dict = None
+
+
+def traced_peak(func):
+    """Run func under tracemalloc and return (seconds, peak MB)"""
+    tracemalloc.start()
+    started_at = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - started_at
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak / 2**20
+
+
+def bench_serialization(tree):
+    """Encode the full tree to JSON bytes: nested dicts then json.dumps, versus streaming"""
+    def via_dicts():
+        clear_render_memo(tree)
+        json.dumps(tree.to_tree_dict(), separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        clear_render_memo(tree)  # Keep the cache out of later measurements
+
+    def streamed():
+        for _ in iter_tree_json(tree):
+            pass  # A response would write each chunk to the socket here
+
+    return {"to_tree_dict + dumps": traced_peak(via_dicts), "iter_tree_json": traced_peak(streamed)}
+
+
+def bench_bulk_load(paths):
+    """Rebuild a tree like the factory does, per-file versus bulk"""
+    entries = [(path, 1024, None, None) for path in paths]
+
+    def replay():
+        tree = FileTreeStructure()
+        for entry in entries:
+            tree.add_file(*entry)
+
+    replay_seconds, _ = timed(replay)
+    bulk_seconds, _ = timed(lambda: FileTreeStructure().bulk_load(entries))
+    return replay_seconds, bulk_seconds
+
+
+def traced_size(func):
+    """Run func under tracemalloc and return (result, MB it still holds)"""
+    tracemalloc.start()
+    result = func()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size / 2**20
+
+
+def upload_rows(paths):
+    """Yield rows like FilesRepository.iter_tree_entries, with a fresh datetime per column"""
+    uploaded = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    for i, path in enumerate(paths):
+        when = uploaded + timedelta(seconds=i)
+        yield path, 1024, when, when + timedelta(microseconds=1)
+
+
+def bench_node_layout(paths):
+    """Per-node memory of a loaded tree, and insert throughput by bulk_load and add_file"""
+    def load():
+        tree = FileTreeStructure()
+        tree.bulk_load(upload_rows(paths))
+        return tree
+
+    tree, tree_mb = traced_size(load)
+    del tree
+    bulk_seconds, report = timed(lambda: FileTreeStructure().bulk_load(upload_rows(paths)))
+    nodes = report["files"] + report["folders"]
+
+    def replay():
+        tree = FileTreeStructure()
+        for row in upload_rows(paths):
+            tree.add_file(*row)
+
+    replay_seconds, _ = timed(replay)
+    return {
+        "nodes": nodes,
+        "bytes_per_node": tree_mb * 2**20 / nodes,
+        "bulk_rate": nodes / bulk_seconds,
+        "replay_rate": nodes / replay_seconds,
+    }
+
+
+def bench_query(paths, repeat=20):
+    """Average query() time for a rare extension and a large-file range, indexed versus walked"""
+    entries = [
+        (path.replace(".pdf", ".png") if i % 100 == 0 else path, (i * 7919) % 50_000_000, None, None)
+        for i, path in enumerate(paths)
+    ]
+    results = {}
+    for label, indexed in (("subtree walk", False), ("indexes", True)):
+        tree = FileTreeStructure(indexed=indexed)
+        tree.bulk_load(entries)
+        results[label] = (
+            timed(lambda: [list(tree.query(extension=".png")) for _ in range(repeat)])[0] / repeat,
+            timed(lambda: [list(tree.query(min_size=49_000_000)) for _ in range(repeat)])[0] / repeat,
+        )
+    return results
+
+
+def bench_path_index(paths):
+    """Memory of the segment trie versus full-path keys, and lookup latency of each"""
+    entries = [(path, 1024, None, None) for path in paths]
+    max_depth = max(path.count('/') for path in paths) + 1
+    del paths  # Only the tree's own strings should be traced
+
+    def load():
+        tree = FileTreeStructure(max_depth=max_depth)
+        tree.bulk_load(entries)
+        return tree
+
+    tree, tree_mb = traced_size(load)
+    nodes = list(tree.all_nodes.values())
+    trie_mb = sum(sys.getsizeof(node._by_name) for node in nodes if node.is_directory) / 2**20
+    # What the former layout kept on top of the nodes: a path string per node
+    # and a HashMap from each path to its node
+    flat_index, flat_mb = traced_size(lambda: HashMap.from_items([(node.path, node) for node in nodes]))
+
+    probes = [entry[0] for entry in entries[::max(len(entries) // 20_000, 1)]]
+    trie_seconds, _ = timed(lambda: [tree.get_node(path) for path in probes])
+    flat_seconds, _ = timed(lambda: [flat_index.get(path) for path in probes])
+    return {
+        "nodes": len(nodes),
+        "max_depth": max_depth,
+        "names": len({id(node.name) for node in nodes}),
+        "tree_mb": tree_mb,
+        "trie_mb": trie_mb,
+        "flat_mb": flat_mb,
+        "trie_lookup": trie_seconds / len(probes),
+        "flat_lookup": flat_seconds / len(probes),
+    }
+
+
+def bench_scan(paths, root):
+    """Files per second scanning a directory tree into an empty tree, by worker count"""
+    for path in paths:
+        full_path = os.path.join(root, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, "wb"):
+            pass
+    results = {}
+    for workers in (1, 4, 16):
+        report = DirectoryScanner(root, workers=workers).scan_into(FileTreeStructure())
+        results[f"{workers} workers"] = report["files_per_second"]
+    scanner = DirectoryScanner(root)
+    list(scanner.iter_batches())
+    rescan = DirectoryScanner(root, state=scanner.state)
+    results["incremental, no change"] = timed(lambda: list(rescan.iter_batches()))[0]
+    return results
+
+
+def bench_startup(paths, snapshot_path):
+    """Time from nothing to answering a first lookup, by replay and by snapshot"""
+    probe = paths[len(paths) // 2]
+    directory = probe.rsplit('/', 1)[0]
+
+    def first_lookup(tree):
+        tree.get_node(probe)
+        tree.get_children(directory)
+
+    replay, tree = timed(lambda: build_tree(paths))
+    results = {"replay inserts": replay + timed(lambda: first_lookup(tree))[0]}
+
+    save_seconds, _ = timed(lambda: save_tree_snapshot(tree, snapshot_path))
+    for label, verify in (("mmap + checksum", True), ("mmap, no checksum", False)):
+        load, mapped = timed(lambda: load_tree_snapshot(snapshot_path, verify=verify))
+        results[label] = load + timed(lambda: first_lookup(mapped))[0]
+        mapped.close()
+
+    with load_tree_snapshot(snapshot_path, verify=False) as mapped:
+        results["mmap + to_structure"] = timed(mapped.to_structure)[0]
+    return results, save_seconds, os.path.getsize(snapshot_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=100_000)
+    parser.add_argument("--index-files", type=int, default=500_000)
+    parser.add_argument("--node-files", type=int, default=1_000_000)
+    parser.add_argument("--scan-files", type=int, default=100_000)
+    args = parser.parse_args()
+
+    paths = make_paths(args.files)
+    with tempfile.TemporaryDirectory() as tmp:
+        results, save_seconds, snapshot_bytes = bench_startup(paths, os.path.join(tmp, "tree.snap"))
+
+    tree = build_tree(paths)
+    directories = [node.path for node in tree.all_nodes.values() if node.is_directory]
+    index, scan, render = bench_children(tree, directories[:: max(len(directories) // 20, 1)])
+    print(f"get_children with {args.files} files in {len(directories)} folders")
+    print(f"{'strategy':<22}{'per call':>12}{'full render':>14}")
+    print(f"{'child index':<22}{index * 1e6:>10.1f}us{render:>13.3f}s")
+    print(f"{'prefix scan':<22}{scan * 1e6:>10.1f}us{scan * len(directories):>12.1f}s*")
+    print("* estimated as one scan per folder\n")
+
+    memoized, cold = bench_upload_render(tree, paths)
+    print(f"to_tree_dict after one upload, {args.files} files")
+    print(f"{'memoized':<22}{memoized * 1e3:>10.2f}ms")
+    print(f"{'from scratch':<22}{cold * 1e3:>10.2f}ms{cold / memoized:>9.1f}x\n")
+
+    print(f"Full tree JSON encoding under tracemalloc, {args.files} files")
+    print(f"{'encoder':<22}{'seconds':>10}{'peak':>12}")
+    for label, (seconds, peak) in bench_serialization(tree).items():
+        print(f"{label:<22}{seconds:>10.3f}{peak:>10.1f}MB")
+    print()
+
+    replay, bulk = bench_bulk_load(paths)
+    print(f"Rebuilding the shared tree from {args.files} rows")
+    print(f"{'add_file per row':<22}{replay:>10.3f}s")
+    print(f"{'bulk_load':<22}{bulk:>10.3f}s{replay / bulk:>9.1f}x\n")
+
+    print(f"Startup to first lookup, {args.files} files")
+    print(f"(snapshot: {snapshot_bytes / 2**20:.1f} MB, written in {save_seconds:.3f}s)")
+    print(f"{'strategy':<22}{'seconds':>10}{'speedup':>10}")
+    replay = results["replay inserts"]
+    for label, seconds in results.items():
+        print(f"{label:<22}{seconds:>10.4f}{replay / seconds:>9.1f}x")
+    print()
+
+    print(f"query() over {args.files} files")
+    print(f"{'source':<22}{'1% .png':>12}{'>49MB (2%)':>14}")
+    for label, (by_extension, by_size) in bench_query(paths).items():
+        print(f"{label:<22}{by_extension * 1e3:>10.2f}ms{by_size * 1e3:>12.2f}ms")
+    print()
+
+    index = bench_path_index(make_deep_paths(args.index_files))
+    nodes = index["nodes"]
+    print(f"Path index, {args.index_files} files at depth {index['max_depth']}: "
+          f"{nodes} nodes, {index['names']} distinct name strings")
+    print(f"(whole tree: {index['tree_mb']:.1f} MB, {index['tree_mb'] * 2**20 / nodes:.0f} B/node)")
+    print(f"{'index':<22}{'MB':>10}{'B/node':>10}{'get_node':>12}")
+    for label, mb, lookup in (
+        ("full-path HashMap", index["flat_mb"], index["flat_lookup"]),
+        ("segment trie", index["trie_mb"], index["trie_lookup"]),
+    ):
+        print(f"{label:<22}{mb:>10.1f}{mb * 2**20 / nodes:>10.0f}{lookup * 1e6:>10.2f}us")
+    print()
+
+    layout = bench_node_layout(make_paths(args.node_files))
+    print(f"Node layout, {args.node_files} files ({layout['nodes']} nodes)")
+    print(f"{'memory per node':<22}{layout['bytes_per_node']:>10.0f} B")
+    print(f"{'bulk_load':<22}{layout['bulk_rate'] / 1e3:>10.0f} k nodes/s")
+    print(f"{'add_file per row':<22}{layout['replay_rate'] / 1e3:>10.0f} k nodes/s")
+    print()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        scan = bench_scan(make_paths(args.scan_files), tmp)
+    print(f"Scanning {args.scan_files} files on disk into a tree")
+    for label, rate in scan.items():
+        if label.startswith("incremental"):
+            print(f"{label:<22}{rate:>10.3f}s")
+        else:
+            print(f"{label:<22}{rate / 1e3:>10.0f} k files/s")
+
+
+if __name__ == "__main__":
+    main()
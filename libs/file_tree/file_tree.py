@@ -1,45 +1,229 @@
+import gc
 import os
-from libs.hashmap import HashMap
-from typing import Dict, List, Any, Optional
+import secrets
+import sys
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Any, Optional, Tuple
 import mimetypes
 from apis.exceptions import BadRequestException
+from .indexes import FileIndexes
+
+
+# (extension, MIME type) by file name suffix; bounded so odd names cannot grow it forever
+_FILE_TYPES: Dict[str, Tuple[str, str]] = {}
+_FILE_TYPES_LIMIT = 4096
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _file_type(name: str) -> Tuple[str, str]:
+    """Return the lowercased extension and MIME type of a file name, memoized per suffix"""
+    stem, suffix = os.path.splitext(name)
+    if suffix.lower() in mimetypes.encodings_map:
+        # Compressed files are typed by the suffix before the encoding, e.g. .tar.gz
+        suffix = os.path.splitext(stem)[1] + suffix
+    file_type = _FILE_TYPES.get(suffix)
+    if file_type is None:
+        name = "file" + suffix
+        file_type = (
+            os.path.splitext(name)[1].lower(),
+            mimetypes.guess_type(name)[0] or "application/octet-stream",
+        )
+        if len(_FILE_TYPES) < _FILE_TYPES_LIMIT:
+            _FILE_TYPES[suffix] = file_type
+    return file_type
+
+
+def to_timestamp(value: Optional[datetime]) -> Optional[int]:
+    """Microseconds since the Unix epoch; naive datetimes are taken as UTC"""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def from_timestamp(value: Optional[int]) -> Optional[datetime]:
+    """Inverse of to_timestamp; returns an aware UTC datetime"""
+    return None if value is None else _EPOCH + timedelta(microseconds=value)
 
 
 class FileTreeNode:
-    """Node representing a file or directory in the tree structure"""
+    """
+    Node representing a file or directory in the tree structure
+    
+    Nodes store only their own name (interned, so a segment repeated across
+    folders is held once) and a parent link; the full path is rebuilt from
+    the parent chain when asked for. Slots keep every node free of a
+    per-instance dict: timestamps are held as integer microseconds and the
+    extension and MIME type are derived from the name on access.
+    """
+    __slots__ = (
+        'name', 'is_directory', 'parent', 'size', '_created', '_modified',
+        'children', '_by_name', 'direct_files', 'direct_folders',
+        'total_files', 'total_folders', 'total_size', '_latest', '_tree_dict',
+    )
     
-    def __init__(self, name: str, path: str, is_directory: bool = False, parent=None):
-        self.name = name
-        self.path = path
+    def __init__(self, name: str, is_directory: bool = False, parent=None):
+        self.name = sys.intern(name)
         self.is_directory = is_directory
         self.parent = parent
         self.size = 0
-        self.extension = ""
-        self.mime_type = ""
-        self.created_at = None
-        self.modified_at = None
-        
-        if not is_directory:
-            # Extract file extension and mime type
-            self.extension = os.path.splitext(name)[1].lower()
-            self.mime_type, _ = mimetypes.guess_type(name)
-            if self.mime_type is None:
-                self.mime_type = "application/octet-stream"
+        self._created = None
+        self._modified = None
+        # Direct children kept in get_children order; None for files
+        self.children = [] if is_directory else None
+        # Direct children by name: the segment trie edges; None for files
+        self._by_name = {} if is_directory else None
+        # Subtree aggregates, kept current by FileTreeStructure on every insert
+        self.direct_files = 0
+        self.direct_folders = 0
+        self.total_files = 0
+        self.total_folders = 0
+        self.total_size = 0
+        self._latest = None
+        # Memoized to_tree_dict rendering of this subtree; cleared when it changes
+        self._tree_dict = None
+    
+    @property
+    def extension(self) -> str:
+        """Lowercased file extension; empty for directories"""
+        return "" if self.is_directory else _file_type(self.name)[0]
+    
+    @property
+    def mime_type(self) -> str:
+        """MIME type guessed from the name; empty for directories"""
+        return "" if self.is_directory else _file_type(self.name)[1]
+    
+    @property
+    def created_at(self) -> Optional[datetime]:
+        return from_timestamp(self._created)
+    
+    @created_at.setter
+    def created_at(self, value: Optional[datetime]):
+        self._created = to_timestamp(value)
+    
+    @property
+    def modified_at(self) -> Optional[datetime]:
+        return from_timestamp(self._modified)
+    
+    @modified_at.setter
+    def modified_at(self, value: Optional[datetime]):
+        self._modified = to_timestamp(value)
+    
+    @property
+    def latest_modified_at(self) -> Optional[datetime]:
+        """Newest modification time in the subtree (directories only)"""
+        return from_timestamp(self._latest)
+    
+    @property
+    def path(self) -> str:
+        """Full path from the root, joined from the names along the parent chain"""
+        if self.parent is None:
+            return self.name
+        names = [self.name]
+        node = self.parent
+        while node is not None:
+            names.append(node.name)
+            node = node.parent
+        return '/'.join(reversed(names))
+
+
+def _child_sort_key(node: FileTreeNode):
+    """Directories first, then by name"""
+    return (not node.is_directory, node.name)
+
+
+def _is_below(node: FileTreeNode, folder: FileTreeNode) -> bool:
+    """Whether folder is one of node's ancestors"""
+    ancestor = node.parent
+    while ancestor is not None:
+        if ancestor is folder:
+            return True
+        ancestor = ancestor.parent
+    return False
+
+
+class _TrieNodeMap:
+    """Read-only path -> FileTreeNode mapping over a tree's segment trie"""
+    
+    def __init__(self, tree: "FileTreeStructure"):
+        self._tree = tree
+    
+    def get(self, path, default=None):
+        """Walk one child index per path segment; O(depth), no path strings stored"""
+        if not path:
+            return default  # The root is not a node
+        node = self._tree.root
+        for name in path.split('/'):
+            by_name = node._by_name
+            if by_name is None:
+                return default
+            node = by_name.get(name)
+            if node is None:
+                return default
+        return node
+    
+    def contains(self, path):
+        return self.get(path) is not None
+    
+    def values(self):
+        """Yield every node, parents before their children"""
+        stack = list(reversed(self._tree.root.children))
+        while stack:
+            node = stack.pop()
+            yield node
+            if node.is_directory:
+                stack.extend(reversed(node.children))
+    
+    def items(self):
+        for node in self.values():
+            yield node.path, node
+    
+    def __len__(self):
+        root = self._tree.root
+        return root.total_files + root.total_folders
 
 
 class FileTreeStructure:
-    """File tree structure using custom HashMap implementation"""
+    """
+    File tree structure indexed as a segment trie
+    
+    Every directory maps its children's names to their nodes, so a path is
+    resolved one segment at a time and each shared prefix is stored once, in
+    the directories along it. Writers hold a lock; readers walk the child
+    dicts without one, which is safe since single dict reads and writes are
+    atomic in CPython.
+    """
     
-    def __init__(self, max_depth: int = 3):
+    def __init__(self, max_depth: int = 3, indexed: bool = False):
         """
         Initialize file tree structure
         
         Args:
             max_depth: Maximum allowed nesting depth for folders
+            indexed: Maintain extension, MIME type and size indexes for query()
         """
-        self.root_nodes = HashMap()  # Root level files and directories
-        self.all_nodes = HashMap()   # All nodes indexed by path for quick lookup
+        # Holds the root level child index and whole-tree aggregates; not in all_nodes
+        self.root = FileTreeNode(name="", is_directory=True)
+        # All nodes by path, resolved through the trie
+        self.all_nodes = _TrieNodeMap(self)
         self.max_depth = max_depth
+        # Bumped on every structural change; readers use it to detect staleness
+        self.version = 0
+        self._instance_id = secrets.token_hex(4)
+        # Serializes writers; child indexes and aggregates span several nodes
+        self._write_lock = threading.Lock()
+        self.indexes = FileIndexes() if indexed else None
+    
+    @property
+    def etag(self) -> str:
+        """HTTP entity tag for the current version (unique per tree instance)"""
+        return f'W/"{self._instance_id}-{self.version}"'
     
     def _get_depth(self, path: str) -> int:
         """Calculate the depth of a path (number of folder levels)"""
@@ -62,36 +246,23 @@ class FileTreeStructure:
         Returns:
             The created or existing directory node
         """
-        if self.all_nodes.contains(path):
-            return self.all_nodes.get(path)
-        
-        # Check depth limit
-        if self._get_depth(path) > self.max_depth:
-            raise BadRequestException(f"Maximum directory depth ({self.max_depth}) exceeded")
-        
-        parent_path = self._get_parent_path(path)
-        parent_node = None
-        
-        if parent_path:
-            parent_node = self._create_directory_chain(parent_path)
-        
-        # Create directory node
-        dir_name = os.path.basename(path)
-        dir_node = FileTreeNode(
-            name=dir_name,
-            path=path,
-            is_directory=True,
-            parent=parent_node
-        )
-        
-        # Store in all_nodes
-        self.all_nodes.put(path, dir_node)
-        
-        # If it's a root level directory, add to root_nodes
-        if parent_path is None:
-            self.root_nodes.put(dir_name, dir_node)
-        
-        return dir_node
+        node = self.root
+        for depth, dir_name in enumerate(path.split('/'), 1):
+            child = node._by_name.get(dir_name)
+            if child is None:
+                # Check depth limit
+                if depth > self.max_depth:
+                    raise BadRequestException(f"Maximum directory depth ({self.max_depth}) exceeded")
+                child = FileTreeNode(
+                    name=dir_name,
+                    is_directory=True,
+                    parent=None if node is self.root else node
+                )
+                self._link_child(child.parent, child)
+            elif not child.is_directory:
+                raise BadRequestException(f"File already exists at path: {child.path}")
+            node = child
+        return node
     
     def add_file(self, file_path: str, file_size: int = 0, created_at=None, modified_at=None) -> FileTreeNode:
         """
@@ -106,12 +277,42 @@ class FileTreeStructure:
         Returns:
             The created file node
         """
+        with self._write_lock:
+            return self._add_file(file_path, file_size, created_at, modified_at)
+    
+    def add_files(self, entries: Iterable[Tuple[str, int, Any, Any]]) -> List[FileTreeNode]:
+        """
+        Add a batch of files, taking the write lock once
+
+        Unlike bulk_load this works on a tree that already has files. Paths
+        already in the tree and entries add_file would reject are skipped.
+
+        Args:
+            entries: Iterable of (file_path, file_size, created_at, modified_at)
+
+        Returns:
+            The newly added file nodes
+        """
+        added = []
+        with self._write_lock:
+            for file_path, file_size, created_at, modified_at in entries:
+                total_files = self.root.total_files
+                try:
+                    node = self._add_file(file_path, file_size, created_at, modified_at)
+                except BadRequestException:
+                    continue
+                if self.root.total_files != total_files:
+                    added.append(node)
+        return added
+
+    def _add_file(self, file_path: str, file_size: int, created_at, modified_at) -> FileTreeNode:
+        """Add a file; caller must hold the write lock"""
         # Normalize path
         file_path = file_path.strip('/')
         
         # Check if file already exists
-        if self.all_nodes.contains(file_path):
-            existing_node = self.all_nodes.get(file_path)
+        existing_node = self.all_nodes.get(file_path)
+        if existing_node is not None:
             if not existing_node.is_directory:
                 return existing_node
             else:
@@ -133,7 +334,6 @@ class FileTreeStructure:
         # Create file node
         file_node = FileTreeNode(
             name=file_name,
-            path=file_path,
             is_directory=False,
             parent=parent_node
         )
@@ -141,66 +341,550 @@ class FileTreeStructure:
         file_node.created_at = created_at
         file_node.modified_at = modified_at
         
-        # Store in all_nodes
-        self.all_nodes.put(file_path, file_node)
-        
-        # If it's a root level file, add to root_nodes
-        if parent_path is None:
-            self.root_nodes.put(file_name, file_node)
+        self._link_child(parent_node, file_node)
         
         return file_node
     
+    def _link_child(self, parent_node: Optional[FileTreeNode], node: FileTreeNode):
+        """
+        Insert a node (with any subtree below it) into its parent's (or the
+        root's) ordered child list and name index, count it in the aggregates
+        of every ancestor up to the root and drop the memoized renderings
+        along that path
+        """
+        parent_node = parent_node or self.root
+        insort(parent_node.children, node, key=_child_sort_key)
+        parent_node._by_name[node.name] = node
+        
+        if node.is_directory:
+            parent_node.direct_folders += 1
+            files, folders, size, latest = node.total_files, node.total_folders + 1, node.total_size, node._latest
+        else:
+            parent_node.direct_files += 1
+            files, folders, size, latest = 1, 0, node.size, node._modified
+            if self.indexes is not None:
+                self.indexes.add(node)
+        
+        ancestor = parent_node
+        while True:
+            ancestor.total_files += files
+            ancestor.total_folders += folders
+            ancestor.total_size += size
+            if latest is not None and (ancestor._latest is None or latest > ancestor._latest):
+                ancestor._latest = latest
+            if ancestor is self.root:
+                break
+            ancestor = ancestor.parent or self.root
+        
+        self._invalidate(parent_node)
+    
+    def _unlink_child(self, node: FileTreeNode):
+        """
+        Detach a node (with its subtree) from its parent, the reverse of
+        _link_child. Costs O(depth) plus, where the detached subtree held an
+        ancestor's newest modification time, one pass over that ancestor's
+        children to find the next newest.
+        """
+        parent_node = node.parent or self.root
+        children = parent_node.children
+        index = bisect_left(children, _child_sort_key(node), key=_child_sort_key)
+        del children[index]
+        del parent_node._by_name[node.name]
+        
+        if node.is_directory:
+            parent_node.direct_folders -= 1
+            files, folders, size, latest = node.total_files, node.total_folders + 1, node.total_size, node._latest
+        else:
+            parent_node.direct_files -= 1
+            files, folders, size, latest = 1, 0, node.size, node._modified
+        
+        ancestor = parent_node
+        while True:
+            ancestor.total_files -= files
+            ancestor.total_folders -= folders
+            ancestor.total_size -= size
+            if latest is not None and ancestor._latest == latest:
+                newest = (child._latest if child.is_directory else child._modified for child in ancestor.children)
+                ancestor._latest = max((value for value in newest if value is not None), default=None)
+            if ancestor is self.root:
+                break
+            ancestor = ancestor.parent or self.root
+        
+        self._invalidate(parent_node)
+    
+    def _invalidate(self, directory: FileTreeNode):
+        """Bump the version and drop memoized renderings from directory up to the root"""
+        # Bump before invalidating: a render that read the old state either
+        # stores before the invalidation below or sees the version change
+        self.version += 1
+        ancestor = directory
+        while True:
+            ancestor._tree_dict = None
+            if ancestor is self.root:
+                break
+            ancestor = ancestor.parent or self.root
+    
+    def _iter_subtree(self, node: FileTreeNode) -> Iterator[FileTreeNode]:
+        """Yield a node and everything below it; caller must hold the write lock"""
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            yield node
+            if node.is_directory:
+                stack.extend(node.children)
+    
+    def remove(self, path: str) -> Optional[FileTreeNode]:
+        """
+        Remove a file, or a folder with everything in it
+        
+        Costs O(depth) for the counters plus O(subtree) to drop its files
+        from the secondary indexes.
+        
+        Args:
+            path: Path of the file or folder
+            
+        Returns:
+            The removed node, or None if nothing exists at path
+        """
+        with self._write_lock:
+            node = self.all_nodes.get(path.strip('/'))
+            if node is None:
+                return None
+            self._unlink_child(node)
+            if self.indexes is not None:
+                self.indexes.discard_many(
+                    [child for child in self._iter_subtree(node) if not child.is_directory]
+                )
+            return node
+
+    def prune_empty_folders(self, path: str, stop: str = "") -> int:
+        """
+        Remove the folder at path, then each parent, for as long as they are empty
+
+        Args:
+            path: Folder to start from
+            stop: Folder to keep with everything above it, even if empty
+
+        Returns:
+            Number of folders removed
+        """
+        path, stop = path.strip('/'), stop.strip('/')
+        removed = 0
+        with self._write_lock:
+            node = self.all_nodes.get(path) if path else None
+            while node is not None and node.is_directory and not node.children:
+                if node.path == stop:
+                    break
+                parent = node.parent
+                self._unlink_child(node)
+                removed += 1
+                node = parent
+        return removed
+
+    def move(self, path: str, new_path: str) -> FileTreeNode:
+        """
+        Move a file or folder to a new path, creating missing parent folders
+        
+        Nodes store only their names, so descendants follow without being
+        rewritten: the cost is O(depth) for the counters plus one pass over
+        the moved subtree to check its depth and drop its memoized renderings.
+        
+        Args:
+            path: Current path of the file or folder
+            new_path: Path it should have afterwards
+            
+        Returns:
+            The moved node
+        """
+        with self._write_lock:
+            return self._move(path.strip('/'), new_path.strip('/'))
+    
+    def _move(self, path: str, new_path: str) -> FileTreeNode:
+        """Move a node; caller must hold the write lock"""
+        node = self.all_nodes.get(path)
+        if node is None:
+            raise BadRequestException(f"No file or folder at path: {path}")
+        if new_path == path:
+            return node
+        new_parent_path, _, new_name = new_path.rpartition('/')
+        if not new_name:
+            raise BadRequestException(f"Invalid path: {new_path}")
+        if self.all_nodes.get(new_path) is not None:
+            raise BadRequestException(f"Path already exists: {new_path}")
+        if node.is_directory and new_path.startswith(path + '/'):
+            raise BadRequestException("Cannot move a folder into itself")
+        
+        # Collect the subtree and how many levels it spans below the node
+        subtree, height = [], 0
+        stack = [(node, 0)]
+        while stack:
+            child, level = stack.pop()
+            subtree.append(child)
+            height = max(height, level)
+            if child.is_directory:
+                stack.extend((grandchild, level + 1) for grandchild in child.children)
+        if new_path.count('/') + 1 + height > self.max_depth:
+            raise BadRequestException(f"Maximum directory depth ({self.max_depth}) exceeded")
+        new_parent = self._create_directory_chain(new_parent_path) if new_parent_path else None
+        
+        if self.indexes is not None and not node.is_directory:
+            self.indexes.discard(node)  # Its extension and MIME type may change with the name
+        self._unlink_child(node)
+        node.name = sys.intern(new_name)
+        node.parent = new_parent
+        self._link_child(new_parent, node)
+        # Every rendering below carries the old paths
+        for child in subtree:
+            child._tree_dict = None
+        return node
+    
+    def rename(self, path: str, new_name: str) -> FileTreeNode:
+        """
+        Rename a file or folder within its parent folder
+        
+        Args:
+            path: Current path of the file or folder
+            new_name: New name, without slashes
+            
+        Returns:
+            The renamed node
+        """
+        if not new_name or '/' in new_name:
+            raise BadRequestException(f"Invalid name: {new_name}")
+        parent_path = path.strip('/').rpartition('/')[0]
+        return self.move(path, f"{parent_path}/{new_name}" if parent_path else new_name)
+    
+    def bulk_load(self, entries: Iterable[Tuple[str, int, Any, Any]]) -> Dict[str, Any]:
+        """
+        Load many files into an empty tree in one pass
+        
+        Faster than calling add_file per file: directories are resolved through
+        a local path index, so each is created once without existence probes
+        or depth checks of its own, and files skip the trie walk. Children are
+        sorted and the name indexes filled once at the end. The cyclic garbage collector is
+        paused meanwhile, since it would otherwise rescan the growing tree
+        many times over. Entries that add_file would reject (too deep, or
+        clashing with an existing file or folder) and duplicate paths are
+        skipped and counted, without creating their folders.
+        
+        Args:
+            entries: Iterable of (file_path, file_size, created_at, modified_at)
+            
+        Returns:
+            Dictionary with files, folders and skipped counts and load seconds
+        """
+        started_at = time.perf_counter()
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return self._bulk_load(entries, started_at)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+    
+    def _bulk_load(self, entries: Iterable[Tuple[str, int, Any, Any]], started_at: float) -> Dict[str, Any]:
+        """Body of bulk_load, run with the garbage collector paused"""
+        with self._write_lock:
+            if self.root.children:
+                raise ValueError("bulk_load requires an empty tree")
+            
+            root = self.root
+            directories: Dict[str, FileTreeNode] = {"": root}
+            files: Dict[str, FileTreeNode] = {}
+            max_depth = self.max_depth
+            skipped = 0
+            
+            def directory_for(path: str) -> Optional[FileTreeNode]:
+                """Return the directory node for path, creating missing ancestors"""
+                node = directories.get(path)
+                if node is not None:
+                    return node
+                if path in files:
+                    return None
+                parent_path, _, name = path.rpartition('/')
+                parent = directory_for(parent_path)
+                if parent is None:
+                    return None
+                node = FileTreeNode(
+                    name=name,
+                    is_directory=True,
+                    parent=None if parent is root else parent
+                )
+                parent.children.append(node)
+                parent.direct_folders += 1
+                ancestor = parent
+                while ancestor is not None:
+                    ancestor.total_folders += 1
+                    ancestor = ancestor.parent or (root if ancestor is not root else None)
+                directories[path] = node
+                return node
+            
+            for file_path, file_size, created_at, modified_at in entries:
+                file_path = file_path.strip('/')
+                parent_path, _, file_name = file_path.rpartition('/')
+                # One depth check per file covers every folder on its path
+                if (
+                    not file_name
+                    or file_path.count('/') >= max_depth
+                    or file_path in files
+                    or file_path in directories
+                ):
+                    skipped += 1
+                    continue
+                parent = directory_for(parent_path)
+                if parent is None:
+                    skipped += 1
+                    continue
+                
+                file_node = FileTreeNode(
+                    name=file_name,
+                    is_directory=False,
+                    parent=None if parent is root else parent
+                )
+                modified = to_timestamp(modified_at)
+                file_node.size = file_size
+                file_node._created = to_timestamp(created_at)
+                file_node._modified = modified
+                files[file_path] = file_node
+                
+                parent.children.append(file_node)
+                parent.direct_files += 1
+                ancestor = parent
+                while ancestor is not None:
+                    ancestor.total_files += 1
+                    ancestor.total_size += file_size
+                    if modified is not None and (ancestor._latest is None or modified > ancestor._latest):
+                        ancestor._latest = modified
+                    ancestor = ancestor.parent or (root if ancestor is not root else None)
+            
+            # The path-keyed dicts are temporary; the trie keeps names only
+            for node in directories.values():
+                node.children.sort(key=_child_sort_key)
+                node._by_name = {child.name: child for child in node.children}
+            del directories[""]
+            if self.indexes is not None:
+                self.indexes.add_many(files.values())
+            self.version += len(directories) + len(files)
+            root._tree_dict = None
+        
+        return {
+            "files": len(files),
+            "folders": len(directories),
+            "skipped": skipped,
+            "seconds": time.perf_counter() - started_at,
+        }
+    
+    def query(
+        self,
+        directory_path: str = "",
+        extension: Optional[str] = None,
+        mime_type: Optional[str] = None,
+        min_size: Optional[int] = None,
+        max_size: Optional[int] = None,
+    ) -> Iterator[FileTreeNode]:
+        """
+        Find the files under a directory that match every given filter
+        
+        With indexes, the narrowest source is scanned: the extension set, the
+        MIME type set, the size range or the directory's own subtree, chosen
+        by their sizes. Without indexes the subtree is walked.
+        
+        Args:
+            directory_path: Directory to search below (empty string for root)
+            extension: Lowercased extension with its dot, e.g. ".pdf"
+            mime_type: Exact MIME type
+            min_size: Smallest size in bytes, inclusive
+            max_size: Largest size in bytes, inclusive
+            
+        Returns:
+            Iterator of matching file nodes; ascending by size when the size
+            index is scanned, otherwise in no particular order
+        """
+        directory_path = directory_path.strip('/')
+        folder = self.root if directory_path == "" else self.all_nodes.get(directory_path)
+        if folder is None or not folder.is_directory:
+            return iter(())
+        
+        # (candidate count, candidate source); the walk wins ties
+        indexes = self.indexes
+        scans = [(folder.total_files, lambda: self._iter_files(folder))]
+        if indexes is not None:
+            if extension is not None:
+                scans.append((
+                    len(indexes.by_extension.get(extension, ())),
+                    lambda: indexes.with_extension(extension),
+                ))
+            if mime_type is not None:
+                scans.append((
+                    len(indexes.by_mime_type.get(mime_type, ())),
+                    lambda: indexes.with_mime_type(mime_type),
+                ))
+            if min_size is not None or max_size is not None:
+                scans.append((
+                    indexes.count_size_range(min_size, max_size),
+                    lambda: indexes.size_range(min_size, max_size),
+                ))
+        _, scan = min(scans, key=lambda option: option[0])
+        
+        def matches(node: FileTreeNode) -> bool:
+            return (
+                not node.is_directory
+                and (extension is None or node.extension == extension)
+                and (mime_type is None or node.mime_type == mime_type)
+                and (min_size is None or node.size >= min_size)
+                and (max_size is None or node.size <= max_size)
+                and (folder is self.root or _is_below(node, folder))
+            )
+        
+        return filter(matches, scan())
+    
+    def _iter_files(self, folder: FileTreeNode) -> Iterator[FileTreeNode]:
+        """Yield every file below a directory, each directory's children copied on entry"""
+        stack = [folder]
+        while stack:
+            directory = stack.pop()
+            for child in self.get_children(directory.path):
+                if child.is_directory:
+                    stack.append(child)
+                else:
+                    yield child
+    
     def set_max_depth(self, max_depth: int):
         """Set maximum allowed directory depth"""
         if max_depth < 1:
             raise ValueError("max_depth must be at least 1")
         self.max_depth = max_depth
     
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return a snapshot of the trie's shape
+        
+        Walks every node under the write lock, so it costs O(nodes).
+        
+        Returns:
+            Dictionary with node, directory and file counts, the deepest
+            level in use, a histogram of children per directory (the root
+            included) and estimated memory of the nodes and their child
+            indexes, names excluded
+        """
+        histogram: Dict[int, int] = {}
+        memory_bytes = height = 0
+        with self._write_lock:
+            stack = [(self.root, 0)]
+            while stack:
+                node, level = stack.pop()
+                height = max(height, level)
+                memory_bytes += sys.getsizeof(node)
+                if node.is_directory:
+                    fan_out = len(node.children)
+                    histogram[fan_out] = histogram.get(fan_out, 0) + 1
+                    memory_bytes += sys.getsizeof(node.children) + sys.getsizeof(node._by_name)
+                    stack.extend((child, level + 1) for child in node.children)
+            files, directories = self.root.total_files, self.root.total_folders
+        return {
+            "engine": "segment_trie",
+            "max_depth": self.max_depth,
+            "height": height,
+            "nodes": files + directories,
+            "directories": directories,
+            "files": files,
+            "fan_out_histogram": dict(sorted(histogram.items())),
+            "max_fan_out": max(histogram, default=0),
+            "memory_bytes": memory_bytes,
+        }
+    
     def get_node(self, path: str) -> Optional[FileTreeNode]:
         """Get a node by its path"""
         path = path.strip('/')
         return self.all_nodes.get(path)
     
-    def get_children(self, directory_path: str = "") -> List[FileTreeNode]:
+    def get_summary(self, directory_path: str = "") -> Optional[Dict[str, Any]]:
         """
-        Get direct children of a directory
+        Get the aggregates of a directory in O(1)
         
         Args:
             directory_path: Path to the directory (empty string for root)
             
         Returns:
-            List of child nodes
+            Direct and recursive file/folder counts, total size and newest
+            modification time, or None if the path is not a directory
         """
         directory_path = directory_path.strip('/')
-        children = []
+        node = self.root if directory_path == "" else self.all_nodes.get(directory_path)
+        if node is None or not node.is_directory:
+            return None
+        return {
+            "file_count": node.direct_files,
+            "folder_count": node.direct_folders,
+            "total_files": node.total_files,
+            "total_folders": node.total_folders,
+            "total_size": node.total_size,
+            "latest_modified_at": node.latest_modified_at,
+        }
+    
+    def get_children(
+        self,
+        directory_path: str = "",
+        start_after: Optional[Tuple[bool, str]] = None,
+        limit: Optional[int] = None,
+    ) -> List[FileTreeNode]:
+        """
+        Get direct children of a directory
         
-        if directory_path == "":
-            # Return root level items
-            for node in self.root_nodes.values():
-                children.append(node)
-        else:
-            # Find children of the specified directory
-            prefix = directory_path + '/'
-            for path in self.all_nodes.keys():
-                if path.startswith(prefix):
-                    # Check if it's a direct child (no additional slashes)
-                    relative_path = path[len(prefix):]
-                    if '/' not in relative_path:
-                        children.append(self.all_nodes.get(path))
+        Args:
+            directory_path: Path to the directory (empty string for root)
+            start_after: (is_directory, name) of the last child already seen;
+                only children ordered after it are returned
+            limit: Maximum number of children to return
+            
+        Returns:
+            List of child nodes, directories first, then by name
+        """
+        directory_path = directory_path.strip('/')
+        node = self.root if directory_path == "" else self.all_nodes.get(directory_path)
+        if node is None or not node.is_directory:
+            return []
         
-        return sorted(children, key=lambda x: (not x.is_directory, x.name))
+        children = node.children
+        start = 0
+        if start_after is not None:
+            is_directory, name = start_after
+            start = bisect_right(children, (not is_directory, name), key=_child_sort_key)
+        end = len(children) if limit is None else start + limit
+        return children[start:end]
+    
+    def _child_nodes(self, node: FileTreeNode) -> List[FileTreeNode]:
+        """Direct children of a directory node in get_children order, without resolving its path"""
+        return node.children[:]  # One C-level copy, so a concurrent insert cannot shift it mid-walk
     
     def to_tree_dict(self, directory_path: str = "") -> Dict[str, Any]:
         """
         Convert the file tree to a nested dictionary structure
         
+        Subtree renderings are memoized on their nodes and reused until an
+        insert below them invalidates the path, so a re-render after one
+        upload only rebuilds the dicts from that file's parent up to the root.
+        The returned dicts are shared with the cache and must not be modified.
+        
         Args:
             directory_path: Root directory path (empty for full tree)
             
         Returns:
             Tree structure as nested dictionary
         """
+        # Only cache renderings if no insert ran meanwhile (see _link_child)
+        version = self.version
+        
+        def memoize(node: FileTreeNode, rendered: Dict[str, Any]):
+            # Under the write lock, so no writer can bump the version and clear
+            # the node between the check and the store
+            with self._write_lock:
+                if self.version == version:
+                    node._tree_dict = rendered
+        
         def node_to_dict(node: FileTreeNode) -> Dict[str, Any]:
+            if node._tree_dict is not None:
+                return node._tree_dict
             node_dict = {
                 "name": node.name,
                 "path": node.path,
@@ -213,28 +897,37 @@ class FileTreeStructure:
             }
             
             if node.is_directory:
-                children = self.get_children(node.path)
-                node_dict["children"] = [node_to_dict(child) for child in children]
-                node_dict["file_count"] = len([c for c in children if not c.is_directory])
-                node_dict["folder_count"] = len([c for c in children if c.is_directory])
+                node_dict["children"] = [node_to_dict(child) for child in self._child_nodes(node)]
+                node_dict.update(aggregates_to_dict(node))
             
+            memoize(node, node_dict)
             return node_dict
         
+        def aggregates_to_dict(node: FileTreeNode) -> Dict[str, Any]:
+            return {
+                "file_count": node.direct_files,
+                "folder_count": node.direct_folders,
+                "total_files": node.total_files,
+                "total_folders": node.total_folders,
+                "total_size": node.total_size,
+                "latest_modified_at": (
+                    node.latest_modified_at.isoformat() if node.latest_modified_at else None
+                ),
+            }
+        
         if directory_path == "":
             # Return full tree structure
-            root_children = self.get_children("")
-            return {
+            if self.root._tree_dict is not None:
+                return self.root._tree_dict
+            root_dict = {
                 "name": "root",
                 "path": "",
                 "is_directory": True,
-                "children": [node_to_dict(child) for child in root_children],
-                "file_count": len([c for c in root_children if not c.is_directory]),
-                "folder_count": len([c for c in root_children if c.is_directory]),
-                "total_files": len([path for path in self.all_nodes.keys() 
-                                 if not self.all_nodes.get(path).is_directory]),
-                "total_folders": len([path for path in self.all_nodes.keys() 
-                                    if self.all_nodes.get(path).is_directory]),
+                "children": [node_to_dict(child) for child in self._child_nodes(self.root)],
+                **aggregates_to_dict(self.root),
             }
+            memoize(self.root, root_dict)
+            return root_dict
         else:
             # Return subtree
             node = self.get_node(directory_path)
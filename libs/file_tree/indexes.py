@@ -0,0 +1,99 @@
+"""
+Secondary indexes over the files of a FileTreeStructure
+
+FileIndexes maps each extension and each MIME type to the set of file nodes
+carrying it, and keeps every file in one list sorted by size, so queries like
+"all PDFs" or "files over 10 MB" touch only the matching nodes. Writers are
+serialized by the tree's lock; readers copy what they need in single atomic
+operations and recheck every predicate, so a concurrent insert can make a
+result slightly stale but never wrong or an error.
+"""
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+def _size_key(node) -> int:
+    return node.size
+
+
+class FileIndexes:
+    """Extension, MIME type and size indexes of file nodes"""
+
+    def __init__(self):
+        self.by_extension: Dict[str, Set] = {}
+        self.by_mime_type: Dict[str, Set] = {}
+        # Every indexed file, ascending by size
+        self.by_size: List = []
+
+    def __len__(self):
+        return len(self.by_size)
+
+    def add(self, node):
+        """Index one file node"""
+        self.by_extension.setdefault(node.extension, set()).add(node)
+        self.by_mime_type.setdefault(node.mime_type, set()).add(node)
+        insort(self.by_size, node, key=_size_key)
+
+    def add_many(self, nodes: Iterable):
+        """Index many file nodes, sorting the size index once"""
+        nodes = list(nodes)
+        for node in nodes:
+            self.by_extension.setdefault(node.extension, set()).add(node)
+            self.by_mime_type.setdefault(node.mime_type, set()).add(node)
+        by_size = self.by_size + nodes
+        by_size.sort(key=_size_key)
+        self.by_size = by_size
+
+    def discard(self, node):
+        """Drop one file node from every index"""
+        self._discard_from_sets(node)
+        by_size = self.by_size
+        index = bisect_left(by_size, node.size, key=_size_key)
+        while index < len(by_size) and by_size[index].size == node.size:
+            if by_size[index] is node:
+                del by_size[index]
+                return
+            index += 1
+
+    def discard_many(self, nodes: List):
+        """Drop many file nodes; large batches rebuild the size index in one pass"""
+        if len(nodes) < 256:
+            for node in nodes:
+                self.discard(node)
+            return
+        for node in nodes:
+            self._discard_from_sets(node)
+        dropped = set(map(id, nodes))
+        self.by_size = [node for node in self.by_size if id(node) not in dropped]
+
+    def _discard_from_sets(self, node):
+        for index, key in ((self.by_extension, node.extension), (self.by_mime_type, node.mime_type)):
+            nodes = index.get(key)
+            if nodes is not None:
+                nodes.discard(node)
+                if not nodes:
+                    del index[key]
+
+    def with_extension(self, extension: str) -> Tuple:
+        """Snapshot of the files with an extension"""
+        return tuple(self.by_extension.get(extension, ()))
+
+    def with_mime_type(self, mime_type: str) -> Tuple:
+        """Snapshot of the files with a MIME type"""
+        return tuple(self.by_mime_type.get(mime_type, ()))
+
+    def _size_bounds(self, min_size: Optional[int], max_size: Optional[int]) -> Tuple[int, int]:
+        by_size = self.by_size
+        start = 0 if min_size is None else bisect_left(by_size, min_size, key=_size_key)
+        end = len(by_size) if max_size is None else bisect_right(by_size, max_size, key=_size_key)
+        return start, max(start, end)
+
+    def size_range(self, min_size: Optional[int] = None, max_size: Optional[int] = None) -> List:
+        """Snapshot of the files with min_size <= size <= max_size, ascending by size"""
+        start, end = self._size_bounds(min_size, max_size)
+        return self.by_size[start:end]
+
+    def count_size_range(self, min_size: Optional[int] = None, max_size: Optional[int] = None) -> int:
+        """Number of files size_range would return, in O(log n)"""
+        start, end = self._size_bounds(min_size, max_size)
+        return end - start
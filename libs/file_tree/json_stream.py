@@ -0,0 +1,107 @@
+"""
+Streaming JSON encoding of a FileTreeStructure
+
+iter_tree_json produces the same document as json.dumps(tree.to_tree_dict(path))
+(with compact separators, and non-ASCII characters escaped as by default) but
+walks the tree with an explicit stack and yields UTF-8 chunks as it goes. No nested dicts are built, so peak memory is one
+chunk plus one child list per open directory, whatever the size of the tree.
+"""
+from json.encoder import encode_basestring_ascii
+from typing import Iterator
+
+from .file_tree import FileTreeNode, FileTreeStructure
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+def _string(value) -> str:
+    return "null" if value is None else encode_basestring_ascii(value)
+
+
+def _timestamp(value) -> str:
+    return "null" if value is None else encode_basestring_ascii(value.isoformat())
+
+
+def _node_head(node: FileTreeNode) -> str:
+    """Opening of a node object: every field up to (not including) its children"""
+    return (
+        f'{{"name":{_string(node.name)},"path":{_string(node.path)},'
+        f'"is_directory":{"true" if node.is_directory else "false"},"size":{node.size},'
+        f'"extension":{_string(node.extension)},"mime_type":{_string(node.mime_type)},'
+        f'"created_at":{_timestamp(node.created_at)},"modified_at":{_timestamp(node.modified_at)}'
+    )
+
+
+def _aggregates_tail(node: FileTreeNode) -> str:
+    """Close a directory's children array and append its aggregates"""
+    return (
+        f'],"file_count":{node.direct_files},"folder_count":{node.direct_folders},'
+        f'"total_files":{node.total_files},"total_folders":{node.total_folders},'
+        f'"total_size":{node.total_size},"latest_modified_at":{_timestamp(node.latest_modified_at)}}}'
+    )
+
+
+def iter_tree_json(
+    tree: FileTreeStructure,
+    directory_path: str = "",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """
+    Encode a tree (or one subtree) as JSON, yielding byte chunks
+
+    Each directory's children are copied when the walk enters it, so
+    concurrent inserts never corrupt the output; like any streamed read the
+    document is weakly consistent with inserts that happen meanwhile.
+
+    Args:
+        tree: Tree to encode
+        directory_path: Root directory path (empty for full tree)
+        chunk_size: Approximate size of each yielded chunk in bytes
+
+    Returns:
+        Iterator of UTF-8 encoded JSON chunks
+    """
+    directory_path = directory_path.strip('/')
+    if directory_path == "":
+        node = tree.root
+        head = '{"name":"root","path":"","is_directory":true'
+    else:
+        node = tree.get_node(directory_path)
+        if node is None:
+            yield b"null"
+            return
+        head = _node_head(node)
+        if not node.is_directory:
+            yield (head + "}").encode("utf-8")
+            return
+
+    parts = [head, ',"children":[']
+    buffered = 0
+    # Open directories as [node, iterator over a copy of its children, emitted any yet]
+    stack = [[node, iter(tree._child_nodes(node)), False]]
+    while stack:
+        frame = stack[-1]
+        child = next(frame[1], None)
+        if child is None:
+            stack.pop()
+            part = _aggregates_tail(frame[0])
+        else:
+            part = _node_head(child)
+            if frame[2]:
+                part = "," + part
+            frame[2] = True
+            if child.is_directory:
+                part += ',"children":['
+                stack.append([child, iter(tree._child_nodes(child)), False])
+            else:
+                part += "}"
+
+        parts.append(part)
+        buffered += len(part)
+        if buffered >= chunk_size:
+            yield "".join(parts).encode("utf-8")
+            parts = []
+            buffered = 0
+
+    if parts:
+        yield "".join(parts).encode("utf-8")
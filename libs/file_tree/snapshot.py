@@ -0,0 +1,306 @@
+"""
+Binary snapshots of a FileTreeStructure
+
+Uses the hashmap snapshot layout with node paths as keys. The record with the
+empty key holds the root's children. Each node record stores its attributes,
+its parent's record offset and its children's record offsets (already sorted
+for get_children), so a worker that maps the file serves get_node and
+get_children by decoding only the records it touches. Records are written
+breadth-first, which keeps siblings next to each other on disk.
+"""
+import secrets
+import struct
+import sys
+import threading
+from bisect import bisect_right
+from typing import Dict, List, Optional, Tuple
+
+from libs.hashmap.snapshot import (
+    KIND_FILE_TREE,
+    SnapshotTable,
+    record_size,
+    table_layout,
+    write_table,
+)
+
+from .file_tree import FileTreeNode, FileTreeStructure, _child_sort_key
+
+# flags, size, created_at, modified_at, latest_modified_at (microseconds),
+# parent offset, child count, then the aggregates: direct files, direct
+# folders, total files, total folders, total size
+_NODE = struct.Struct("<BqqqqQIIIIIq")
+_OFFSET = struct.Struct("<Q")
+
+_IS_DIRECTORY = 1
+_HAS_CREATED = 2
+_HAS_MODIFIED = 4
+_HAS_LATEST = 8
+
+
+def _encode_time(value, has_flag):
+    """Return (microseconds, flags) for a node's optional integer timestamp"""
+    if value is None:
+        return 0, 0
+    return value, has_flag
+
+
+def _decode_time(micros, flags, has_flag):
+    """Inverse of _encode_time"""
+    return micros if flags & has_flag else None
+
+
+def save_tree_snapshot(tree: FileTreeStructure, path: str):
+    """
+    Write a file tree to a snapshot file
+
+    Args:
+        tree: Tree to save
+        path: Destination file path
+    """
+    # Breadth-first from the root, whose record has the empty path
+    order: List[FileTreeNode] = [tree.root]
+    for node in order:
+        if node.is_directory:
+            order.extend(node.children)
+
+    keys = [node.path.encode("utf-8", "surrogatepass") for node in order]
+
+    _, offset = table_layout(len(order))
+    offsets = {}
+    for node, key in zip(order, keys):
+        offsets[id(node)] = offset
+        value_size = _NODE.size + len(node.children or ()) * _OFFSET.size
+        offset += record_size(key, b"") + value_size
+
+    records = []
+    for node, key in zip(order, keys):
+        created, created_flags = _encode_time(node._created, _HAS_CREATED)
+        modified, modified_flags = _encode_time(node._modified, _HAS_MODIFIED)
+        latest, latest_flags = _encode_time(node._latest, _HAS_LATEST)
+        flags = created_flags | modified_flags | latest_flags
+        if node.is_directory:
+            flags |= _IS_DIRECTORY
+        if node is tree.root:
+            parent_offset = 0
+        else:
+            parent_offset = offsets[id(node.parent or tree.root)]
+        children = node.children or ()
+        value = bytearray(_NODE.pack(
+            flags, node.size or 0, created, modified, latest, parent_offset, len(children),
+            node.direct_files, node.direct_folders, node.total_files, node.total_folders,
+            node.total_size,
+        ))
+        for child in children:
+            value += _OFFSET.pack(offsets[id(child)])
+        records.append((key, bytes(value)))
+
+    write_table(path, KIND_FILE_TREE, records, meta=tree.max_depth)
+
+
+class _MappedNodeMap:
+    """Read-only path -> FileTreeNode mapping over a tree snapshot"""
+
+    def __init__(self, tree: "MappedFileTree"):
+        self._tree = tree
+
+    def get(self, path, default=None):
+        if not path:
+            return default  # The root record is not a node
+        offset = self._tree._table.find(path.encode("utf-8", "surrogatepass"))
+        return default if offset is None else self._tree._node_at(offset)
+
+    def contains(self, path):
+        return self.get(path) is not None
+
+    def values(self):
+        table = self._tree._table
+        for offset in table.iter_offsets():
+            if offset != self._tree._root_offset:
+                yield self._tree._node_at(offset)
+
+    def __len__(self):
+        return self._tree._table.count - 1
+
+
+_READ_ONLY = "MappedFileTree is read-only; use to_structure() for a mutable copy"
+
+
+class MappedFileTree(FileTreeStructure):
+    """
+    Read-only FileTreeStructure served from a memory-mapped snapshot
+
+    Node records are decoded on first access and memoized, so repeated
+    lookups return the same FileTreeNode objects with working parent links.
+    """
+
+    def __init__(self, path: str, verify: bool = True):
+        """
+        Open a snapshot written by save_tree_snapshot
+
+        Args:
+            path: Snapshot file path
+            verify: Check the file checksum before serving
+        """
+        self._table = SnapshotTable(path, KIND_FILE_TREE, verify)
+        self._root_offset = self._table.find(b"")
+        self._nodes: Dict[int, FileTreeNode] = {}
+        self.max_depth = self._table.meta
+        # Never changes, so every rendering can be memoized
+        self.version = 0
+        self._instance_id = secrets.token_hex(4)
+        self.all_nodes = _MappedNodeMap(self)
+        self.indexes = None  # query() walks the mapped subtree instead
+        # Nothing writes; to_tree_dict still memoizes renderings under it
+        self._write_lock = threading.Lock()
+        # Aggregates only; get_children reads child offsets from the records
+        self.root = self._node_at(self._root_offset)
+
+    def _read_node(self, offset: int):
+        """Decode the record at offset into (path, header fields, child offsets)"""
+        key, value = self._table.read_record(offset)
+        fields = _NODE.unpack_from(value, 0)
+        child_offsets = [
+            _OFFSET.unpack_from(value, _NODE.size + i * _OFFSET.size)[0] for i in range(fields[6])
+        ]
+        return key.decode("utf-8", "surrogatepass"), fields, child_offsets
+
+    def _node_at(self, offset: int, memo: Optional[Dict[int, FileTreeNode]] = None) -> FileTreeNode:
+        """Decode (once per memo) the node stored at a record offset"""
+        if memo is None:
+            memo = self._nodes
+        node = memo.get(offset)
+        if node is not None:
+            return node
+
+        path, fields, _ = self._read_node(offset)
+        (flags, size, created, modified, latest, parent_offset, _,
+         direct_files, direct_folders, total_files, total_folders, total_size) = fields
+        # Bypass __init__ and fill every slot straight from the record
+        node = FileTreeNode.__new__(FileTreeNode)
+        node.name = sys.intern(path.rsplit('/', 1)[-1])
+        node.is_directory = bool(flags & _IS_DIRECTORY)
+        if parent_offset in (0, self._root_offset):
+            node.parent = None  # Root level nodes have no parent node
+        else:
+            node.parent = self._node_at(parent_offset, memo)
+        node.size = size
+        node._created = _decode_time(created, flags, _HAS_CREATED)
+        node._modified = _decode_time(modified, flags, _HAS_MODIFIED)
+        node.children = [] if node.is_directory else None
+        node._by_name = {} if node.is_directory else None
+        node.direct_files = direct_files
+        node.direct_folders = direct_folders
+        node.total_files = total_files
+        node.total_folders = total_folders
+        node.total_size = total_size
+        node._latest = _decode_time(latest, flags, _HAS_LATEST)
+        node._tree_dict = None
+        memo[offset] = node
+        return node
+
+    # Every FileTreeStructure mutator refuses; __init__ was never run, so the
+    # inherited ones would fail obscurely or, worse, half-apply
+    def add_file(self, file_path: str, file_size: int = 0, created_at=None, modified_at=None):
+        raise TypeError(_READ_ONLY)
+
+    def add_files(self, entries):
+        raise TypeError(_READ_ONLY)
+
+    def bulk_load(self, entries):
+        raise TypeError(_READ_ONLY)
+
+    def remove(self, path: str):
+        raise TypeError(_READ_ONLY)
+
+    def prune_empty_folders(self, path: str, stop: str = ""):
+        raise TypeError(_READ_ONLY)
+
+    def move(self, path: str, new_path: str):
+        raise TypeError(_READ_ONLY)
+
+    def rename(self, path: str, new_name: str):
+        raise TypeError(_READ_ONLY)
+
+    def set_max_depth(self, max_depth: int):
+        raise TypeError(_READ_ONLY)
+
+    def stats(self):
+        """Return the snapshot's size and how many nodes have been decoded so far"""
+        return {
+            "max_depth": self.max_depth,
+            "nodes": len(self.all_nodes),
+            "decoded_nodes": len(self._nodes) - 1,  # The root record is always decoded
+        }
+
+    def get_children(
+        self,
+        directory_path: str = "",
+        start_after: Optional[Tuple[bool, str]] = None,
+        limit: Optional[int] = None,
+    ) -> List[FileTreeNode]:
+        """
+        Get direct children of a directory, decoding only the records returned
+        (plus O(log children) records to find start_after)
+
+        Args:
+            directory_path: Path to the directory (empty string for root)
+            start_after: (is_directory, name) of the last child already seen
+            limit: Maximum number of children to return
+
+        Returns:
+            List of child nodes, directories first, then by name
+        """
+        directory_path = directory_path.strip('/')
+        offset = self._table.find(directory_path.encode("utf-8", "surrogatepass"))
+        if offset is None:
+            return []
+        child_offsets = self._read_node(offset)[2]
+        start = 0
+        if start_after is not None:
+            is_directory, name = start_after
+            start = bisect_right(
+                child_offsets,
+                (not is_directory, name),
+                key=lambda child_offset: _child_sort_key(self._node_at(child_offset)),
+            )
+        end = len(child_offsets) if limit is None else start + limit
+        return [self._node_at(child_offset) for child_offset in child_offsets[start:end]]
+
+    def _child_nodes(self, node: FileTreeNode) -> List[FileTreeNode]:
+        """Mapped nodes keep no child lists; read the child offsets from the node's record"""
+        return self.get_children(node.path)
+
+    def to_structure(self, indexed: bool = False) -> FileTreeStructure:
+        """Decode every node into a new mutable FileTreeStructure, optionally with query indexes"""
+        tree = FileTreeStructure(max_depth=self.max_depth, indexed=indexed)
+        # Decode fresh nodes so the copy never shares mutable state with this tree
+        memo: Dict[int, FileTreeNode] = {}
+        nodes = [
+            self._node_at(offset, memo)
+            for offset in self._table.iter_offsets()
+            if offset != self._root_offset
+        ]
+        tree.root = self._node_at(self._root_offset, memo)
+        # Records are breadth-first with sorted siblings, so appending keeps each list ordered
+        for node in nodes:
+            parent = node.parent or tree.root
+            parent.children.append(node)
+            parent._by_name[node.name] = node
+        if tree.indexes is not None:
+            tree.indexes.add_many(node for node in nodes if not node.is_directory)
+        return tree
+
+    def close(self):
+        """Unmap the snapshot file"""
+        self._table.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def load_tree_snapshot(path: str, verify: bool = True) -> MappedFileTree:
+    """Memory-map a snapshot written by save_tree_snapshot"""
+    return MappedFileTree(path, verify)
@@ -0,0 +1,327 @@
+import json
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from apis.exceptions import BadRequestException
+
+from .file_tree import FileTreeStructure
+from .json_stream import iter_tree_json
+
+
+class TestFileTreeStructure(TestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.tree = FileTreeStructure(max_depth=4)
+
+    def test_children_index_ordering(self):
+        """Test children come back directories first, then by name, whatever the insert order."""
+        for path in ("docs/b.txt", "docs/z/one.txt", "docs/a.txt", "docs/c/two.txt", "top.txt", "docs/c/x/y.txt"):
+            self.tree.add_file(path)
+
+        self.assertEqual([c.name for c in self.tree.get_children("docs")], ["c", "z", "a.txt", "b.txt"])
+        self.assertEqual([c.name for c in self.tree.get_children("/docs/c/")], ["x", "two.txt"])
+        self.assertEqual([c.name for c in self.tree.get_children()], ["docs", "top.txt"])
+        self.assertEqual(self.tree.get_children("docs/a.txt"), [])
+        self.assertEqual(self.tree.get_children("missing"), [])
+
+    def test_children_is_a_copy(self):
+        """Test callers cannot corrupt the index through the returned list."""
+        self.tree.add_file("docs/a.txt")
+        self.tree.get_children("docs").clear()
+        self.assertEqual(len(self.tree.get_children("docs")), 1)
+
+    def test_duplicate_file_not_indexed_twice(self):
+        """Test re-adding an existing file keeps a single child entry."""
+        self.tree.add_file("docs/a.txt")
+        self.tree.add_file("docs/a.txt")
+        self.assertEqual(len(self.tree.get_children("docs")), 1)
+
+    def test_tree_dict_counts(self):
+        """Test the rendered tree reflects the child index."""
+        tree = FileTreeStructure()
+        tree.add_file("a/b/c.txt", 3)
+        tree.add_file("a/d.txt", 4)
+
+        rendered = tree.to_tree_dict()
+        self.assertEqual(rendered["total_files"], 2)
+        self.assertEqual(rendered["total_folders"], 2)
+        folder = rendered["children"][0]
+        self.assertEqual((folder["file_count"], folder["folder_count"]), (1, 1))
+        self.assertEqual([c["name"] for c in folder["children"]], ["b", "d.txt"])
+
+    def test_subtree_aggregates(self):
+        """Test counts, sizes and newest modification time roll up every ancestor."""
+        older = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        newer = datetime(2024, 6, 1, tzinfo=timezone.utc)
+        self.tree.add_file("a/b/c/one.txt", 10, modified_at=older)
+        self.tree.add_file("a/b/two.txt", 20, modified_at=newer)
+        self.tree.add_file("a/three.txt", 30)
+        self.tree.add_file("four.txt", 40)
+        self.tree.add_file("a/three.txt", 999)  # Existing file, not counted again
+
+        self.assertEqual(self.tree.get_summary("a"), {
+            "file_count": 1,
+            "folder_count": 1,
+            "total_files": 3,
+            "total_folders": 2,
+            "total_size": 60,
+            "latest_modified_at": newer,
+        })
+        self.assertEqual(self.tree.get_summary("/a/b/c")["latest_modified_at"], older)
+        root = self.tree.get_summary()
+        self.assertEqual((root["file_count"], root["folder_count"]), (1, 1))
+        self.assertEqual((root["total_files"], root["total_folders"], root["total_size"]), (4, 3, 100))
+        self.assertIsNone(self.tree.get_summary("four.txt"))
+        self.assertIsNone(self.tree.get_summary("missing"))
+
+        rendered = self.tree.to_tree_dict("a/b")
+        self.assertEqual((rendered["total_files"], rendered["total_size"]), (2, 30))
+        self.assertEqual(rendered["latest_modified_at"], newer.isoformat())
+
+    def test_memoized_render_invalidates_changed_path_only(self):
+        """Test an insert re-renders its path and reuses every untouched subtree."""
+        self.tree.add_file("a/one.txt")
+        self.tree.add_file("b/c/two.txt")
+        first = self.tree.to_tree_dict()
+        self.assertIs(self.tree.to_tree_dict(), first)
+        untouched = first["children"][1]
+        self.assertEqual(untouched["path"], "b")
+
+        version = self.tree.version
+        self.tree.add_file("a/three.txt")
+        self.assertGreater(self.tree.version, version)
+
+        second = self.tree.to_tree_dict()
+        self.assertIsNot(second, first)
+        self.assertIs(second["children"][1], untouched)
+        self.assertEqual([c["name"] for c in second["children"][0]["children"]], ["one.txt", "three.txt"])
+        self.assertEqual(second["total_files"], 3)
+        self.assertIs(self.tree.to_tree_dict("b"), untouched)
+
+    def test_render_overlapping_an_insert_is_not_memoized(self):
+        """Test a rendering an insert overlapped is returned but never cached, and never walks from the root."""
+        self.tree.add_file("a/one.txt")
+        child_nodes = self.tree._child_nodes
+
+        def insert_meanwhile(node):
+            children = child_nodes(node)
+            if node is self.tree.root:
+                self.tree.add_file("b/two.txt")  # As another thread would
+            return children
+
+        with patch.object(self.tree, "_child_nodes", side_effect=insert_meanwhile), \
+                patch.object(self.tree, "get_children", side_effect=AssertionError("resolved a path")):
+            rendered = self.tree.to_tree_dict()
+        self.assertEqual([child["name"] for child in rendered["children"]], ["a"])
+        self.assertIsNone(self.tree.root._tree_dict)
+        self.assertIsNone(self.tree.get_node("a")._tree_dict)
+        self.assertEqual([child["name"] for child in self.tree.to_tree_dict()["children"]], ["a", "b"])
+
+    def test_etag_tracks_version(self):
+        """Test the ETag changes with the tree and differs between trees."""
+        etag = self.tree.etag
+        self.tree.add_file("a.txt")
+        self.assertNotEqual(self.tree.etag, etag)
+        etag = self.tree.etag
+        self.tree.add_file("a.txt")  # Existing file, nothing changes
+        self.assertEqual(self.tree.etag, etag)
+        self.assertNotEqual(FileTreeStructure().etag, FileTreeStructure().etag)
+
+    def test_streamed_json_matches_tree_dict(self):
+        """Test the streaming encoder emits exactly the to_tree_dict document."""
+        when = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        self.tree.add_file("a/b/c.txt", 3, when, when)
+        self.tree.add_file('a/\u00e9 "quoted".pdf', 4)
+        self.tree.add_file("\u6587\u4ef6/\U0001f4c4 r\u00e9sum\u00e9.txt", 5)
+        self.tree.add_file("x.bin", 1)
+
+        for path in ("", "a", "/a/b/", "a/b/c.txt", "\u6587\u4ef6", "missing"):
+            chunks = list(iter_tree_json(self.tree, path, chunk_size=16))
+            expected = json.dumps(self.tree.to_tree_dict(path), separators=(",", ":"))
+            self.assertEqual(b"".join(chunks).decode("ascii"), expected)
+        self.assertGreater(len(list(iter_tree_json(self.tree, chunk_size=16))), 1)
+
+    def test_bulk_load_matches_add_file(self):
+        """Test bulk loading builds the same tree add_file would, skipping rejected rows."""
+        when = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        entries = [
+            ("docs/b.txt", 2, when, when),
+            ("docs/2024/q1/plan.md", 3, None, None),
+            ("/docs/a.txt/", 1, None, when),
+            ("top.txt", 4, None, None),
+            ("docs/b.txt", 9, None, None),              # Duplicate
+            ("a/b/c/d/too_deep.txt", 5, None, None),    # Exceeds max_depth
+            ("top.txt/nested.txt", 6, None, None),      # Parent is a file
+        ]
+        expected = FileTreeStructure(max_depth=4)
+        for entry in entries[:4]:
+            expected.add_file(*entry)
+
+        report = self.tree.bulk_load(iter(entries))
+        self.assertEqual((report["files"], report["folders"], report["skipped"]), (4, 3, 3))
+        self.assertEqual(self.tree.to_tree_dict(), expected.to_tree_dict())
+        self.assertEqual(self.tree.get_node("docs/2024/q1").parent.path, "docs/2024")
+
+        with self.assertRaises(ValueError):
+            self.tree.bulk_load([("more.txt", 1, None, None)])
+
+    def test_trie_lookup_and_shared_names(self):
+        """Test paths resolve segment by segment and repeated names share one string."""
+        self.tree.add_file("2023/reports/q1.pdf")
+        self.tree.add_file("2024/reports/q1.pdf")
+
+        node = self.tree.get_node("/2024/reports/q1.pdf")
+        self.assertEqual(node.path, "2024/reports/q1.pdf")
+        self.assertIs(node.name, self.tree.get_node("2023/reports/q1.pdf").name)
+        self.assertIs(node.parent.name, self.tree.get_node("2023/reports").name)
+        self.assertIsNone(self.tree.get_node("2024/q1.pdf"))
+        self.assertIsNone(self.tree.get_node("2024/reports/q1.pdf/more"))
+        self.assertIsNone(self.tree.get_node(""))
+        self.assertEqual(len(self.tree.all_nodes), 6)
+
+        with self.assertRaises(BadRequestException):
+            self.tree.add_file("2024/reports/q1.pdf/nested.txt")
+
+    def test_compact_nodes(self):
+        """Test nodes use slots, integer timestamps and types derived from the name."""
+        naive = datetime(2024, 3, 1, 8, 0, 0, 250)
+        node = self.tree.add_file("backups/site.TAR.gz", 10, modified_at=naive)
+
+        self.assertFalse(hasattr(node, "__dict__"))
+        self.assertEqual((node.extension, node.mime_type), (".gz", "application/x-tar"))
+        self.assertEqual((node.parent.extension, node.parent.mime_type), ("", ""))
+        self.assertIsInstance(node._modified, int)
+        self.assertIsNone(node.created_at)
+        self.assertEqual(node.modified_at, naive.replace(tzinfo=timezone.utc))
+        self.assertEqual(self.tree.get_summary("backups")["latest_modified_at"], node.modified_at)
+
+    def test_query_with_and_without_indexes(self):
+        """Test indexed queries match a plain subtree walk for every filter combination."""
+        indexed = FileTreeStructure(max_depth=4, indexed=True)
+        files = [
+            ("docs/a.pdf", 5), ("docs/2024/b.PDF", 50), ("docs/2024/c.txt", 500),
+            ("images/d.png", 5_000), ("images/e.pdf", 50_000), ("f.pdf", 7),
+        ]
+        indexed.bulk_load([(path, size, None, None) for path, size in files[:3]])
+        for path, size in files:
+            indexed.add_file(path, size)
+            self.tree.add_file(path, size)
+
+        def paths(tree, *args, **kwargs):
+            return sorted(node.path for node in tree.query(*args, **kwargs))
+
+        for args, kwargs, expected in (
+            (("docs",), {"extension": ".pdf"}, ["docs/2024/b.PDF", "docs/a.pdf"]),
+            ((), {"mime_type": "application/pdf", "min_size": 10}, ["docs/2024/b.PDF", "images/e.pdf"]),
+            ((), {"min_size": 50, "max_size": 5_000}, ["docs/2024/b.PDF", "docs/2024/c.txt", "images/d.png"]),
+            (("/docs/2024/",), {"max_size": 100}, ["docs/2024/b.PDF"]),
+            (("docs",), {"extension": ".png"}, []),
+            (("docs/a.pdf",), {}, []),
+            (("missing",), {}, []),
+        ):
+            self.assertEqual(paths(indexed, *args, **kwargs), expected)
+            self.assertEqual(paths(self.tree, *args, **kwargs), expected)
+
+        self.assertEqual(len(indexed.indexes), len(files))
+        sizes = [node.size for node in indexed.query(min_size=6)]
+        self.assertEqual(sizes, [7, 50, 500, 5_000, 50_000])
+
+    def test_remove_move_rename_keep_counters_and_indexes(self):
+        """Test edits leave the tree exactly as if it had been built in its final shape."""
+        older = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        newer = datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+        def build(files):
+            tree = FileTreeStructure(max_depth=5, indexed=True)
+            for path, size, modified in files:
+                tree.add_file(path, size, modified_at=modified)
+            return tree
+
+        tree = build([
+            ("docs/2024/a.txt", 1, older), ("docs/2024/q1/b.pdf", 2, newer),
+            ("docs/c.txt", 4, None), ("img/d.png", 8, older),
+        ])
+        tree.to_tree_dict()  # Memoize every subtree first
+
+        self.assertEqual(tree.remove("docs/2024/q1/b.pdf").name, "b.pdf")
+        self.assertIsNone(tree.remove("docs/2024/q1/b.pdf"))
+        self.assertEqual(tree.get_summary()["latest_modified_at"], older)
+        tree.move("docs/2024", "archive/old/2024")
+        tree.rename("docs/c.txt", "c.md")
+        tree.move("img/d.png", "d.png")
+
+        expected = build([
+            ("archive/old/2024/a.txt", 1, older), ("docs/c.md", 4, None), ("d.png", 8, older),
+        ])
+        expected.add_file("archive/old/2024/q1/keep.txt")
+        expected.remove("archive/old/2024/q1/keep.txt")
+        expected.add_file("img/keep.txt")
+        expected.remove("img/keep.txt")
+        self.assertEqual(tree.to_tree_dict(), expected.to_tree_dict())
+        self.assertEqual(tree.get_node("archive/old/2024/a.txt").path, "archive/old/2024/a.txt")
+        self.assertEqual([node.path for node in tree.query(extension=".md")], ["docs/c.md"])
+        self.assertEqual([node.path for node in tree.query(extension=".txt")], ["archive/old/2024/a.txt"])
+        self.assertEqual([node.size for node in tree.indexes.size_range(min_size=0)], [1, 4, 8])
+
+        tree.remove("archive")
+        self.assertEqual(sorted(path for path, _ in tree.all_nodes.items()), ["d.png", "docs", "docs/c.md", "img"])
+        self.assertEqual((tree.root.total_files, tree.root.total_folders, tree.root.total_size), (2, 2, 12))
+        self.assertEqual(len(tree.indexes), 2)
+
+    def test_move_rejects_invalid_targets(self):
+        """Test moves onto existing paths, into themselves or too deep are refused."""
+        self.tree.add_file("a/b/c.txt")
+        self.tree.add_file("d.txt")
+        for path, new_path in (
+            ("a", "d.txt"), ("a", "a/b/x"), ("a", "x/y/z"), ("missing", "x"), ("a/b", "d.txt/b"),
+        ):
+            with self.assertRaises(BadRequestException):
+                self.tree.move(path, new_path)
+        with self.assertRaises(BadRequestException):
+            self.tree.rename("a", "x/y")
+        self.assertEqual(self.tree.get_node("a/b/c.txt").path, "a/b/c.txt")
+
+    def test_stats_describe_trie_shape(self):
+        """Test stats count nodes and report children per directory."""
+        for path in ("docs/a.txt", "docs/b.txt", "docs/sub/c.txt", "top.txt"):
+            self.tree.add_file(path, 1)
+        stats = self.tree.stats()
+        self.assertEqual((stats["nodes"], stats["directories"], stats["files"]), (6, 2, 4))
+        self.assertEqual(stats["height"], 3)
+        # Root: docs, top.txt; docs: sub, a.txt, b.txt; sub: c.txt
+        self.assertEqual(stats["fan_out_histogram"], {1: 1, 2: 1, 3: 1})
+        self.assertEqual(stats["max_fan_out"], 3)
+        self.assertGreater(stats["memory_bytes"], 0)
+        self.assertEqual(FileTreeStructure().stats()["fan_out_histogram"], {0: 1})
+
+    def test_prune_empty_folders(self):
+        """Test empty folders are removed upwards until a non-empty or stop folder."""
+        self.tree.add_file("a/keep.txt", 1)
+        self.tree.add_file("a/b/c/d.txt", 2)
+        self.tree.remove("a/b/c/d.txt")
+
+        self.assertEqual(self.tree.prune_empty_folders("a/b/c", stop="a/b"), 1)
+        self.assertIsNotNone(self.tree.get_node("a/b"))
+        self.assertEqual(self.tree.prune_empty_folders("a/b"), 1)
+        self.assertIsNone(self.tree.get_node("a/b"))
+        self.assertEqual(self.tree.prune_empty_folders("a"), 0)
+        self.assertEqual(self.tree.prune_empty_folders("missing"), 0)
+        self.assertEqual((self.tree.root.total_files, self.tree.root.total_folders), (1, 1))
+
+    def test_add_files_returns_new_nodes(self):
+        """Test a batch insert into a populated tree reports only the files it added."""
+        tree = FileTreeStructure(max_depth=2, indexed=True)
+        tree.add_file("docs/a.txt", 1)
+        added = tree.add_files([
+            ("docs/a.txt", 1, None, None),
+            ("docs/b.txt", 2, None, None),
+            ("docs/b.txt/c.txt", 3, None, None),
+            ("x/y/z.txt", 4, None, None),
+            ("top.md", 5, None, None),
+        ])
+        self.assertEqual([node.path for node in added], ["docs/b.txt", "top.md"])
+        self.assertEqual(tree.root.total_files, 3)
+        self.assertEqual(len(tree.indexes), 3)
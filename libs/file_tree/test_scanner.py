@@ -0,0 +1,83 @@
+import os
+import tempfile
+
+from django.test import TestCase
+
+from .file_tree import FileTreeStructure
+from .scanner import DirectoryScanner
+
+
+class TestDirectoryScanner(TestCase):
+
+    def setUp(self):
+        """Set up a small directory tree on disk."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = self.temp_dir.name
+        for path, size in (
+            ("top.txt", 1),
+            ("docs/a.pdf", 10),
+            ("docs/2024/b.pdf", 20),
+            ("docs/2024/deep/c.pdf", 30),
+            ("docs/.hidden", 40),
+        ):
+            self.write(path, size)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, path, size):
+        full_path = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, "wb") as f:
+            f.write(b"x" * size)
+        return full_path
+
+    def touch_directory(self, path, mtime_ns):
+        """Give a directory a distinct mtime, whatever the filesystem's resolution."""
+        os.utime(os.path.join(self.root, path), ns=(mtime_ns, mtime_ns))
+
+    def test_scan_into_tree(self):
+        """Test files land in the tree with their sizes and mtimes, hidden ones and too-deep ones skipped."""
+        tree = FileTreeStructure(max_depth=3)
+        report = DirectoryScanner(self.root, workers=4, batch_size=2).scan_into(tree)
+
+        self.assertEqual((report["files"], report["added"], report["skipped"]), (4, 3, 1))
+        self.assertEqual(report["directories"], 4)
+        self.assertEqual(tree.get_summary("docs")["total_size"], 30)
+        node = tree.get_node("docs/2024/b.pdf")
+        mtime_ns = os.stat(os.path.join(self.root, "docs/2024/b.pdf")).st_mtime_ns
+        self.assertEqual(node.modified_at.timestamp(), mtime_ns // 1000 / 1e6)
+        self.assertIsNone(tree.get_node("docs/.hidden"))
+
+    def test_scan_into_skips_known_paths(self):
+        """Test skipped and already present paths are not reported as added."""
+        tree = FileTreeStructure(max_depth=4)
+        tree.add_file("top.txt", 1)
+        added = []
+        report = DirectoryScanner(self.root).scan_into(tree, skip={"docs/a.pdf"}, on_added=added.extend)
+        self.assertEqual(sorted(node.path for node in added), ["docs/2024/b.pdf", "docs/2024/deep/c.pdf"])
+        self.assertEqual(report["skipped"], 2)
+        self.assertIsNone(tree.get_node("docs/a.pdf"))
+
+    def test_incremental_scan_lists_only_changed_directories(self):
+        """Test an incremental scan revisits unchanged directories without listing them."""
+        for path in ("", "docs", "docs/2024", "docs/2024/deep"):
+            self.touch_directory(path, 1_000_000_000)
+        first = DirectoryScanner(self.root)
+        self.assertEqual(sum(len(batch) for batch in first.iter_batches()), 4)
+
+        self.write("docs/2024/deep/new.pdf", 5)
+        self.touch_directory("docs/2024/deep", 2_000_000_000)
+        second = DirectoryScanner(self.root, state=first.state)
+        batches = list(second.iter_batches())
+        self.assertEqual(
+            sorted(path for batch in batches for path, _, _, _ in batch),
+            ["docs/2024/deep/c.pdf", "docs/2024/deep/new.pdf"],
+        )
+        self.assertEqual((second.stats["directories"], second.stats["unchanged_directories"]), (4, 3))
+        self.assertEqual(second.state["docs/2024/deep"][0], 2_000_000_000)
+
+    def test_missing_root(self):
+        """Test scanning a missing root raises."""
+        with self.assertRaises(FileNotFoundError):
+            list(DirectoryScanner(os.path.join(self.root, "missing")).iter_batches())
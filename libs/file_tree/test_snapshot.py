@@ -0,0 +1,97 @@
+import os
+import tempfile
+from datetime import datetime, timezone
+
+from django.test import TestCase
+
+from libs.hashmap.snapshot import SnapshotError, load_snapshot
+
+from .file_tree import FileTreeStructure
+from .snapshot import load_tree_snapshot, save_tree_snapshot
+
+
+class TestFileTreeSnapshot(TestCase):
+
+    def setUp(self):
+        """Build a small tree and save it."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "tree.snap")
+        self.modified = datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+
+        self.tree = FileTreeStructure(max_depth=4)
+        self.tree.add_file("docs/report.pdf", 1024, self.modified, self.modified)
+        self.tree.add_file("docs/2024/summary.txt", 10)
+        self.tree.add_file("docs/2024/q1/plan.md", 20)
+        self.tree.add_file("readme.txt", 5)
+        save_tree_snapshot(self.tree, self.path)
+        self.mapped = load_tree_snapshot(self.path)
+
+    def tearDown(self):
+        self.mapped.close()
+        self.tmp.cleanup()
+
+    def test_round_trip_tree_dict(self):
+        """Test the mapped tree renders exactly like the original."""
+        self.assertEqual(self.mapped.max_depth, 4)
+        self.assertEqual(self.mapped.to_tree_dict(), self.tree.to_tree_dict())
+        self.assertEqual(self.mapped.to_tree_dict("docs/2024"), self.tree.to_tree_dict("docs/2024"))
+        self.assertEqual(self.mapped.get_summary("docs"), self.tree.get_summary("docs"))
+        self.assertEqual(self.mapped.get_summary(), self.tree.get_summary())
+
+    def test_get_node_decodes_lazily(self):
+        """Test lookups decode only the records they need."""
+        self.assertEqual(self.mapped.stats()["decoded_nodes"], 0)
+
+        node = self.mapped.get_node("/docs/report.pdf")
+        self.assertEqual(node.size, 1024)
+        self.assertEqual(node.extension, ".pdf")
+        self.assertEqual(node.mime_type, "application/pdf")
+        self.assertEqual(node.modified_at, self.modified)
+        self.assertEqual(node.parent.path, "docs")
+        self.assertIs(self.mapped.get_node("docs"), node.parent)
+        self.assertEqual(self.mapped.stats()["decoded_nodes"], 2)
+
+        self.assertIsNone(self.mapped.get_node("docs/missing.pdf"))
+        self.assertIsNone(self.mapped.get_node(""))
+
+    def test_get_children(self):
+        """Test children come back directories first, then by name."""
+        names = [child.name for child in self.mapped.get_children("docs")]
+        self.assertEqual(names, ["2024", "report.pdf"])
+        self.assertEqual([c.name for c in self.mapped.get_children()], ["docs", "readme.txt"])
+        self.assertEqual(self.mapped.get_children("nowhere"), [])
+
+    def test_to_structure_is_mutable(self):
+        """Test a decoded copy accepts new files."""
+        with self.assertRaises(TypeError):
+            self.mapped.add_file("docs/new.pdf")
+
+        tree = self.mapped.to_structure()
+        tree.add_file("docs/new.pdf", 1)
+        self.assertEqual(tree.get_summary()["total_files"], 5)
+        self.assertEqual(
+            [child.name for child in tree.get_children("docs")], ["2024", "new.pdf", "report.pdf"]
+        )
+
+    def test_every_mutator_is_refused(self):
+        """Test each FileTreeStructure mutator raises TypeError and leaves the snapshot as it was."""
+        before = self.mapped.to_tree_dict()
+        calls = {
+            "add_file": ("docs/new.pdf",),
+            "add_files": ([("docs/new.pdf", 1, None, None)],),
+            "bulk_load": ([("docs/new.pdf", 1, None, None)],),
+            "remove": ("readme.txt",),
+            "prune_empty_folders": ("docs",),
+            "move": ("readme.txt", "docs/readme.txt"),
+            "rename": ("readme.txt", "README.txt"),
+            "set_max_depth": (3,),
+        }
+        for name, args in calls.items():
+            with self.assertRaisesRegex(TypeError, "read-only", msg=name):
+                getattr(self.mapped, name)(*args)
+        self.assertEqual(self.mapped.to_tree_dict(), before)
+
+    def test_kind_checked(self):
+        """Test a tree snapshot cannot be opened as a hashmap snapshot."""
+        with self.assertRaisesRegex(SnapshotError, "kind"):
+            load_snapshot(self.path)
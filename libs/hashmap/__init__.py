@@ -1,2 +1,14 @@
 from .hashmap import HashMap
-__all__ = ["HashMap"]
\ No newline at end of file
+from .open_hashmap import OpenHashMap
+from .concurrent_hashmap import ConcurrentHashMap
+from .snapshot import MappedHashMap, SnapshotError, load_snapshot, save_snapshot
+
+__all__ = [
+    "HashMap",
+    "OpenHashMap",
+    "ConcurrentHashMap",
+    "MappedHashMap",
+    "SnapshotError",
+    "load_snapshot",
+    "save_snapshot",
+]
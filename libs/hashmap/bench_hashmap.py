@@ -0,0 +1,262 @@
+"""
+Benchmarks for the HashMap storage engines
+
+Usage:
+    python -m libs.hashmap.bench_hashmap [--size N]
+"""
+import argparse
+import gc
+from itertools import product
+import threading
+import time
+import tracemalloc
+
+from .concurrent_hashmap import ConcurrentHashMap
+from .hashmap import HashMap
+from .open_hashmap import OpenHashMap
+
+
+def make_keys(count):
+    """Build file-tree-like path keys"""
+    return [f"folder_{i % 997}/sub_{i % 31}/file_{i}.pdf" for i in range(count)]
+
+
+def make_colliding_keys(blocks):
+    """Build 2**blocks keys that collide for every capacity under the polynomial hash"""
+    # "Aa" and "BB" have equal polynomial hashes, so any sequence of them does too
+    return ["uploads/" + "".join(parts) for parts in product(("Aa", "BB"), repeat=blocks)]
+
+
+def max_chain_length(hashmap):
+    """Longest bucket chain of a chained HashMap"""
+    longest = 0
+    for bucket in hashmap.buckets:
+        length = 0
+        while bucket:
+            length += 1
+            bucket = bucket.next
+        longest = max(longest, length)
+    return longest
+
+
+def timed(func):
+    """Run func once and return elapsed seconds"""
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def measure_memory(map_class, keys):
+    """Return MB allocated by a map holding keys (the key strings are shared)"""
+    tracemalloc.start()
+    hashmap = map_class()
+    for i, key in enumerate(keys):
+        hashmap.put(key, i)
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del hashmap
+    return current / (1024 * 1024)
+
+
+def bench_engine(map_class, keys):
+    """Time the core operations of one engine and measure its footprint"""
+    missing = [key + ".missing" for key in keys]
+    results = {}
+
+    hashmap = map_class()
+
+    def put_all():
+        for i, key in enumerate(keys):
+            hashmap.put(key, i)
+
+    results["put"] = timed(put_all)
+    results["get"] = timed(lambda: [hashmap.get(key) for key in keys])
+    results["contains_miss"] = timed(lambda: [hashmap.contains(key) for key in missing])
+    results["remove_half"] = timed(lambda: [hashmap.remove(key) for key in keys[::2]])
+    results["get_after_remove"] = timed(lambda: [hashmap.get(key) for key in keys])
+    results["memory_mb"] = measure_memory(map_class, keys)
+    return results
+
+
+def bench_growth_latency(keys, **map_kwargs):
+    """Record per-put latency while a map grows from empty to len(keys)"""
+    hashmap = HashMap(**map_kwargs)
+    latencies = []
+    clock = time.perf_counter
+    # Keep collector pauses out of the per-operation numbers
+    gc.disable()
+    try:
+        for i, key in enumerate(keys):
+            start = clock()
+            hashmap.put(key, i)
+            latencies.append(clock() - start)
+    finally:
+        gc.enable()
+
+    latencies.sort()
+    return {
+        "total_s": sum(latencies),
+        "p50_us": latencies[len(latencies) // 2] * 1e6,
+        "p99_us": latencies[int(len(latencies) * 0.99)] * 1e6,
+        "max_ms": latencies[-1] * 1e3,
+    }
+
+
+def bench_batch(map_class, keys):
+    """Compare batch operations with a Python loop of single calls"""
+    pairs = [(key, i) for i, key in enumerate(keys)]
+    results = {}
+
+    def loop_put():
+        hashmap = map_class()
+        for key, value in pairs:
+            hashmap.put(key, value)
+        return hashmap
+
+    def extend(use_batch):
+        # Grow a half-full map by the other half of the keys
+        half = len(pairs) // 2
+        hashmap = map_class.from_items(pairs[:half])
+        start = time.perf_counter()
+        if use_batch:
+            hashmap.put_many(pairs[half:])
+        else:
+            for key, value in pairs[half:]:
+                hashmap.put(key, value)
+        return time.perf_counter() - start
+
+    results["build"] = (timed(loop_put), timed(lambda: map_class.from_items(pairs)))
+    results["extend"] = (extend(False), extend(True))
+    hashmap = map_class.from_items(pairs)
+    results["get"] = (
+        timed(lambda: [hashmap.get(key) for key in keys]),
+        timed(lambda: hashmap.get_many(keys)),
+    )
+    return results
+
+
+class GlobalLockHashMap:
+    """Baseline: a HashMap with one lock around every operation"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._map = HashMap()
+
+    def put(self, key, value):
+        with self._lock:
+            self._map.put(key, value)
+
+    def get(self, key):
+        with self._lock:
+            return self._map.get(key)
+
+
+def bench_thread_scaling(map_class, keys, thread_count):
+    """Return total ops/s for threads doing 80% get / 20% put on their own keys"""
+    hashmap = map_class()
+    for i, key in enumerate(keys):
+        hashmap.put(key, i)
+    shares = [keys[i::thread_count] for i in range(thread_count)]
+    barrier = threading.Barrier(thread_count + 1)
+
+    def worker(share):
+        barrier.wait()
+        for i, key in enumerate(share):
+            if i % 5 == 0:
+                hashmap.put(key, i)
+            else:
+                hashmap.get(key)
+
+    threads = [threading.Thread(target=worker, args=(share,)) for share in shares]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return len(keys) / (time.perf_counter() - start)
+
+
+def bench_adversarial(keys):
+    """Insert crafted colliding keys under each hash mode"""
+    results = {}
+    for mode in ("polynomial", "seeded", "keyed"):
+        hashmap = HashMap(hash_mode=mode)
+
+        def put_all():
+            for key in keys:
+                hashmap.put(key, key)
+
+        results[mode] = (timed(put_all), max_chain_length(hashmap))
+    return results
+
+
+def bench_after_purge(map_class, keys, **map_kwargs):
+    """Iteration time and footprint once 99% of the keys have been removed"""
+    hashmap = map_class.from_items(((key, i) for i, key in enumerate(keys)), len(keys), **map_kwargs)
+    for key in keys[: len(keys) * 99 // 100]:
+        hashmap.remove(key)
+    iterate = timed(lambda: sum(1 for _ in hashmap.items()))
+    return hashmap.capacity, iterate, hashmap.stats()["memory_bytes"] / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=200_000)
+    args = parser.parse_args()
+
+    keys = make_keys(args.size)
+    chained = bench_engine(HashMap, keys)
+    open_addr = bench_engine(OpenHashMap, keys)
+
+    print(f"HashMap engines, {args.size} keys")
+    print(f"{'operation':<18}{'chained':>12}{'open':>12}{'speedup':>10}")
+    for name in chained:
+        unit = "MB" if name == "memory_mb" else "s"
+        print(
+            f"{name:<18}{chained[name]:>10.3f}{unit:<2}{open_addr[name]:>10.3f}{unit:<2}"
+            f"{chained[name] / open_addr[name]:>9.1f}x"
+        )
+
+    for map_class in (HashMap, OpenHashMap, ConcurrentHashMap):
+        batch = bench_batch(map_class, keys)
+        print(f"\n{map_class.__name__} batch operations, {args.size} keys")
+        print(f"{'operation':<18}{'loop':>12}{'batch':>12}{'speedup':>10}")
+        for name, (loop_s, batch_s) in batch.items():
+            print(f"{name:<18}{loop_s:>11.3f}s{batch_s:>11.3f}s{loop_s / batch_s:>9.1f}x")
+
+    print(f"\nThroughput (ops/s) with threads sharing one map, {args.size} ops")
+    print(f"{'threads':<10}{'global lock':>14}{'striped':>14}{'ratio':>8}")
+    for thread_count in (1, 2, 4, 8):
+        global_lock = bench_thread_scaling(GlobalLockHashMap, keys, thread_count)
+        striped = bench_thread_scaling(ConcurrentHashMap, keys, thread_count)
+        print(f"{thread_count:<10}{global_lock:>14,.0f}{striped:>14,.0f}{striped / global_lock:>7.1f}x")
+
+    adversarial_keys = make_colliding_keys(min(12, max(args.size.bit_length() - 5, 1)))
+    print(f"\nHashMap with {len(adversarial_keys)} crafted colliding keys")
+    print(f"{'hash_mode':<14}{'insert':>10}{'max chain':>12}")
+    for mode, (seconds, longest) in bench_adversarial(adversarial_keys).items():
+        print(f"{mode:<14}{seconds:>9.3f}s{longest:>12}")
+
+    print(f"\nAfter removing 99% of {args.size} keys")
+    print(f"{'variant':<22}{'capacity':>10}{'iterate':>10}{'memory':>10}")
+    for label, map_class, kwargs in (
+        ("HashMap no shrink", HashMap, {"shrink_load_factor": None}),
+        ("HashMap shrinking", HashMap, {}),
+        ("OpenHashMap no shrink", OpenHashMap, {"shrink_load_factor": None}),
+        ("OpenHashMap shrinking", OpenHashMap, {}),
+    ):
+        capacity, iterate, memory = bench_after_purge(map_class, keys, **kwargs)
+        print(f"{label:<22}{capacity:>10}{iterate * 1e3:>8.2f}ms{memory:>8.2f}MB")
+
+    stop_the_world = bench_growth_latency(keys)
+    incremental = bench_growth_latency(keys, incremental_resize=True)
+
+    print(f"\nHashMap put latency while growing to {args.size} keys")
+    print(f"{'metric':<18}{'rehash':>12}{'incremental':>14}")
+    for name in stop_the_world:
+        print(f"{name:<18}{stop_the_world[name]:>12.3f}{incremental[name]:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
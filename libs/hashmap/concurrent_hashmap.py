@@ -0,0 +1,325 @@
+import sys
+import threading
+import time
+
+from .stats import StatsMixin
+from .views import MappingMixin
+
+
+class _Segment:
+    """One lock stripe: a bucket table guarded by its own lock"""
+    __slots__ = ('lock', 'table', 'count', 'resize_count', 'rehash_seconds')
+
+    def __init__(self, capacity):
+        self.lock = threading.Lock()
+        self.table = [None] * capacity
+        self.count = 0
+        self.resize_count = 0
+        self.rehash_seconds = 0.0
+
+
+class ConcurrentHashMap(MappingMixin, StatsMixin):
+    """
+    Thread-safe HashMap split into independently locked segments.
+
+    Each key maps to one segment by hash; writers only take that segment's
+    lock, so writers to different segments never block each other. Buckets
+    are immutable tuples of (key, value, hash) entries that writers replace
+    whole, and a segment swaps in its resized table with a single assignment,
+    so readers never lock: they always see either the old or the new bucket.
+    Iteration is weakly consistent and never raises on concurrent changes.
+    Keys must be hashable.
+    """
+
+    def __init__(self, capacity=16, concurrency_level=16, shrink_load_factor=0.125):
+        """
+        Initialize ConcurrentHashMap
+
+        Args:
+            capacity: Initial total number of buckets across all segments
+            concurrency_level: Number of lock stripes (rounded up to a power of two)
+            shrink_load_factor: Shrink a segment once a removal leaves its load
+                below this (None disables); shrinking targets half the max load factor
+        """
+        segment_count = 1
+        while segment_count < concurrency_level:
+            segment_count <<= 1
+        segment_capacity = 2
+        while segment_capacity * segment_count < capacity:
+            segment_capacity <<= 1
+
+        self.load_factor = 0.75
+        self.shrink_load_factor = shrink_load_factor
+        self._segment_min_capacity = segment_capacity
+        self._segment_mask = segment_count - 1
+        self._segment_shift = segment_count.bit_length() - 1
+        self._segments = [_Segment(segment_capacity) for _ in range(segment_count)]
+
+    @property
+    def capacity(self):
+        """Total number of buckets across all segments"""
+        return sum(len(segment.table) for segment in self._segments)
+
+    @property
+    def size(self):
+        """Number of key-value pairs (a moment-in-time estimate under concurrency)"""
+        return sum(segment.count for segment in self._segments)
+
+    @property
+    def resize_count(self):
+        """Number of segment resizes so far"""
+        return sum(segment.resize_count for segment in self._segments)
+
+    @property
+    def rehash_seconds(self):
+        """Total time spent rebuilding segment tables"""
+        return sum(segment.rehash_seconds for segment in self._segments)
+
+    def _hash(self, key):
+        """Generate hash for a given key, mixing high bits into the low ones"""
+        hash_val = hash(key)
+        return hash_val ^ (hash_val >> 16)
+
+    def _segment_for(self, hash_val):
+        """Return the segment owning a hash"""
+        return self._segments[hash_val & self._segment_mask]
+
+    def _index(self, hash_val, table):
+        """Bucket index within a segment table (uses bits not spent on the segment)"""
+        return (hash_val >> self._segment_shift) & (len(table) - 1)
+
+    def _grow(self, segment):
+        """Double a segment's table; caller must hold the segment lock"""
+        return self._rebuild(segment, len(segment.table) * 2)
+
+    def _compact_capacity(self, segment):
+        """Smallest segment capacity, not below the initial one, that keeps it at most half full"""
+        capacity = len(segment.table)
+        target = self.load_factor / 2
+        while capacity // 2 >= self._segment_min_capacity and segment.count / (capacity // 2) <= target:
+            capacity //= 2
+        return capacity
+
+    def compact(self):
+        """Shrink every segment's table to fit its live entries"""
+        for segment in self._segments:
+            with segment.lock:
+                capacity = self._compact_capacity(segment)
+                if capacity != len(segment.table):
+                    self._rebuild(segment, capacity)
+
+    def _rebuild(self, segment, capacity):
+        """Rehash a segment into a new table; caller must hold the segment lock"""
+        started_at = time.perf_counter()
+        old_table = segment.table
+        new_table = [None] * capacity
+        mask = len(new_table) - 1
+        shift = self._segment_shift
+        for bucket in old_table:
+            if bucket:
+                for entry in bucket:
+                    index = (entry[2] >> shift) & mask
+                    new_table[index] = (new_table[index] or ()) + (entry,)
+        # Publish the fully built table in one assignment for lock-free readers
+        segment.table = new_table
+        segment.resize_count += 1
+        segment.rehash_seconds += time.perf_counter() - started_at
+        return new_table
+
+    def put(self, key, value):
+        """Insert or update key-value pair"""
+        self._put(key, value, only_if_absent=False)
+
+    def put_if_absent(self, key, value):
+        """
+        Atomically insert key unless it is already present
+
+        Returns:
+            The existing value, or None if value was inserted
+        """
+        return self._put(key, value, only_if_absent=True)
+
+    def _put(self, key, value, only_if_absent):
+        hash_val = self._hash(key)
+        segment = self._segment_for(hash_val)
+        with segment.lock:
+            return self._put_locked(segment, key, value, hash_val, only_if_absent)
+
+    def _put_locked(self, segment, key, value, hash_val, only_if_absent):
+        """Insert into a segment; caller must hold the segment lock"""
+        table = segment.table
+        index = self._index(hash_val, table)
+        bucket = table[index]
+        if bucket:
+            for i, (entry_key, entry_value, entry_hash) in enumerate(bucket):
+                if entry_hash == hash_val and (entry_key is key or entry_key == key):
+                    if only_if_absent:
+                        return entry_value
+                    # Replace the bucket rather than mutating it under readers
+                    table[index] = bucket[:i] + ((key, value, hash_val),) + bucket[i + 1:]
+                    return None
+
+        if (segment.count + 1) / len(table) > self.load_factor:
+            table = self._grow(segment)
+            index = self._index(hash_val, table)
+            bucket = table[index]
+        table[index] = (bucket or ()) + ((key, value, hash_val),)
+        segment.count += 1
+        return None
+
+    def _find(self, key):
+        """Return the (key, value, hash) entry for key without locking, or None"""
+        hash_val = self._hash(key)
+        table = self._segment_for(hash_val).table
+        bucket = table[self._index(hash_val, table)]
+        if bucket:
+            for entry in bucket:
+                if entry[2] == hash_val and (entry[0] is key or entry[0] == key):
+                    return entry
+        return None
+
+    def get(self, key, default=None):
+        """Retrieve value for a given key, or default when it is missing"""
+        entry = self._find(key)
+        return default if entry is None else entry[1]
+
+    def contains(self, key):
+        """Check if key exists in hashmap"""
+        return self._find(key) is not None
+
+    def remove(self, key):
+        """Remove key-value pair from hashmap"""
+        hash_val = self._hash(key)
+        segment = self._segment_for(hash_val)
+        with segment.lock:
+            table = segment.table
+            index = self._index(hash_val, table)
+            bucket = table[index]
+            if bucket:
+                for i, (entry_key, _, entry_hash) in enumerate(bucket):
+                    if entry_hash == hash_val and (entry_key is key or entry_key == key):
+                        table[index] = (bucket[:i] + bucket[i + 1:]) or None
+                        segment.count -= 1
+                        if (
+                            self.shrink_load_factor is not None
+                            and len(table) > self._segment_min_capacity
+                            and segment.count / len(table) < self.shrink_load_factor
+                        ):
+                            self._rebuild(segment, self._compact_capacity(segment))
+                        return True
+        return False  # Key not found
+
+    @classmethod
+    def from_items(cls, items, expected_size=None, **kwargs):
+        """
+        Build a ConcurrentHashMap from (key, value) pairs
+
+        Args:
+            items: Iterable of (key, value) tuples
+            expected_size: Number of pairs; defaults to len(items) when available
+            **kwargs: Extra constructor arguments; an explicit capacity is kept
+                when it is larger than the one expected_size calls for
+        """
+        if expected_size is None:
+            if not hasattr(items, '__len__'):
+                items = list(items)
+            expected_size = len(items)
+        capacity = 16
+        while expected_size / capacity > 0.75:
+            capacity <<= 1
+        hashmap = cls(max(capacity, kwargs.pop('capacity', 0)), **kwargs)
+        hashmap.put_many(items)
+        return hashmap
+
+    def put_many(self, items):
+        """
+        Insert or update many key-value pairs, locking and presizing each segment once
+
+        Items are grouped by segment before any lock is taken, so each segment
+        grows straight to the size its share of the batch needs.
+        """
+        by_segment = {}
+        hash_key = self._hash
+        segment_mask = self._segment_mask
+        for key, value in items:
+            hash_val = hash_key(key)
+            by_segment.setdefault(hash_val & segment_mask, []).append((key, value, hash_val))
+        for segment_index, entries in by_segment.items():
+            segment = self._segments[segment_index]
+            with segment.lock:
+                # Grow once up front rather than doubling repeatedly mid-batch
+                capacity = len(segment.table)
+                while (segment.count + len(entries)) / capacity > self.load_factor:
+                    capacity *= 2
+                if capacity != len(segment.table):
+                    self._rebuild(segment, capacity)
+                for key, value, hash_val in entries:
+                    self._put_locked(segment, key, value, hash_val, False)
+
+    def get_many(self, keys, default=None):
+        """
+        Return a list with the value of each key, or default when missing
+
+        Every segment's table is read once up front, so all keys that share a
+        segment are answered from the same table snapshot, and the lookup is
+        inlined rather than going through get() per key.
+        """
+        tables = [segment.table for segment in self._segments]
+        segment_mask = self._segment_mask
+        shift = self._segment_shift
+        result = []
+        append = result.append
+        for key in keys:
+            hash_val = hash(key)
+            hash_val ^= hash_val >> 16  # Same mixing as _hash
+            table = tables[hash_val & segment_mask]
+            bucket = table[(hash_val >> shift) & (len(table) - 1)]
+            if bucket:
+                for entry in bucket:
+                    if entry[2] == hash_val and (entry[0] is key or entry[0] == key):
+                        append(entry[1])
+                        break
+                else:
+                    append(default)
+            else:
+                append(default)
+        return result
+
+    def _iter_entries(self):
+        """Yield (key, value) pairs from a per-segment snapshot; never raises"""
+        for segment in self._segments:
+            for bucket in segment.table:
+                if bucket:
+                    for entry_key, entry_value, _ in bucket:
+                        yield entry_key, entry_value
+
+    def _chain_lengths(self):
+        """Yield the chain length of every bucket in every segment"""
+        for segment in self._segments:
+            for bucket in segment.table:
+                yield len(bucket) if bucket else 0
+
+    def _probe_length(self, key):
+        """Number of bucket entries a lookup of key visits"""
+        hash_val = self._hash(key)
+        table = self._segment_for(hash_val).table
+        bucket = table[self._index(hash_val, table)] or ()
+        for probes, entry in enumerate(bucket, 1):
+            if entry[2] == hash_val and entry[0] == key:
+                return probes
+        return len(bucket)
+
+    def _estimate_memory(self):
+        """Approximate bytes held by segments, tables and entry tuples (keys and values excluded)"""
+        total = sys.getsizeof(self._segments)
+        for segment in self._segments:
+            total += sys.getsizeof(segment) + sys.getsizeof(segment.table)
+            for bucket in segment.table:
+                if bucket:
+                    total += sys.getsizeof(bucket)
+                    total += sum(sys.getsizeof(entry) + sys.getsizeof(entry[2]) for entry in bucket)
+        return total
+
+    def __len__(self):
+        """Return number of key-value pairs"""
+        return self.size
@@ -0,0 +1,38 @@
+"""
+Hash functions for HashMap
+
+The polynomial hash is deterministic, so anyone who controls the keys (folder
+paths and file names from upload requests) can craft collisions offline. The
+seeded and keyed hashes mix in a secret drawn once per process, so bucket
+placement cannot be predicted from outside.
+"""
+import hashlib
+import secrets
+
+# Secrets drawn once per process; never persisted or exposed
+PROCESS_SEED = secrets.randbits(64)
+PROCESS_KEY = secrets.token_bytes(16)
+# BLAKE2b state with PROCESS_KEY already absorbed; copying it skips re-keying per call
+KEYED_STATE = hashlib.blake2b(key=PROCESS_KEY, digest_size=8)
+
+HASH_MODES = ("keyed", "seeded", "polynomial")
+
+
+def polynomial_hash(key, capacity):
+    """Legacy per-character polynomial hash reduced modulo capacity"""
+    hash_val = 0
+    for char in str(key):
+        hash_val = (hash_val * 31 + ord(char)) % capacity
+    return hash_val
+
+
+def seeded_hash(key):
+    """Python's native hash mixed with the per-process seed (key must be hashable)"""
+    return hash((PROCESS_SEED, key))
+
+
+def keyed_hash(key):
+    """Keyed BLAKE2b (a SipHash-style PRF) over str(key), independent of PYTHONHASHSEED"""
+    state = KEYED_STATE.copy()
+    state.update(str(key).encode("utf-8", "surrogatepass"))
+    return int.from_bytes(state.digest(), "little")
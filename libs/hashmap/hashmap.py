@@ -1,3 +1,11 @@
+import sys
+import time
+
+from .hashing import HASH_MODES, KEYED_STATE, keyed_hash, polynomial_hash, seeded_hash
+from .stats import StatsMixin
+from .views import MappingMixin
+
+
 class Node:
     """Node for chaining in case of collisions"""
     def __init__(self, key, value):
@@ -6,25 +14,62 @@ class Node:
         self.next = None
 
 
-class HashMap:
-    def __init__(self, capacity=16):
-        """Initialize HashMap with given capacity"""
+class HashMap(MappingMixin, StatsMixin):
+    def __init__(
+        self,
+        capacity=16,
+        incremental_resize=False,
+        migrate_batch=4,
+        hash_mode="keyed",
+        shrink_load_factor=0.125,
+    ):
+        """
+        Initialize HashMap with given capacity
+
+        Args:
+            capacity: Initial number of buckets
+            incremental_resize: Migrate buckets a few at a time on later operations
+                instead of rehashing everything inside the put that triggers a resize
+            migrate_batch: Old buckets migrated per operation in incremental mode
+            hash_mode: "keyed" (BLAKE2b with a per-process key, any key via str()),
+                "seeded" (native hash with a per-process seed, hashable keys only)
+                or "polynomial" (legacy deterministic hash, open to crafted collisions)
+            shrink_load_factor: Shrink once a removal leaves the load below this
+                (None disables). Shrinking targets half the max load factor, so
+                growth and shrinking cannot oscillate around one size.
+        """
+        if hash_mode not in HASH_MODES:
+            raise ValueError(f"hash_mode must be one of {', '.join(HASH_MODES)}")
+        self.hash_mode = hash_mode
+        self._full_hash = {"keyed": keyed_hash, "seeded": seeded_hash}.get(hash_mode)
         self.capacity = capacity
         self.size = 0
         self.buckets = [None] * self.capacity
         self.load_factor = 0.75
+        self.shrink_load_factor = shrink_load_factor
+        self._min_capacity = capacity  # Never shrink below the initial capacity
+        self.incremental_resize = incremental_resize
+        self.migrate_batch = migrate_batch
+        self._mod_count = 0  # Bumped on structural changes to invalidate iterators
+        # Table being drained during an incremental resize
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._migrate_pos = 0
     
-    def _hash(self, key):
-        """Generate hash for a given key"""
-        # Convert key to string and compute hash
-        hash_val = 0
-        key_str = str(key)
-        for char in key_str:
-            hash_val = (hash_val * 31 + ord(char)) % self.capacity
-        return hash_val
+    def _hash(self, key, capacity=None):
+        """Generate bucket index for a given key"""
+        capacity = capacity or self.capacity
+        if self._full_hash is None:
+            return polynomial_hash(key, capacity)
+        return self._full_hash(key) % capacity
     
     def _resize(self):
         """Resize the hashmap when load factor is exceeded"""
+        if self.incremental_resize:
+            self._start_incremental_resize()
+            return
+
+        started_at = time.perf_counter()
         old_buckets = self.buckets
         self.capacity *= 2
         self.buckets = [None] * self.capacity
@@ -36,9 +81,137 @@ class HashMap:
             while current:
                 self.put(current.key, current.value)
                 current = current.next
+        self.resize_count += 1
+        self._record_resize(started_at)
+
+    def _start_incremental_resize(self):
+        """Swap in a doubled bucket array and keep the old one for gradual migration"""
+        # A resize can only start once the previous migration has drained
+        self._finish_migration()
+
+        self.resize_count += 1
+        self._old_buckets = self.buckets
+        self._old_capacity = self.capacity
+        self._migrate_pos = 0
+        self.capacity *= 2
+        self.buckets = [None] * self.capacity
+
+    def _migrate_step(self):
+        """Move up to migrate_batch old buckets into the current bucket array"""
+        started_at = time.perf_counter()
+        old_buckets = self._old_buckets
+        end = min(self._migrate_pos + self.migrate_batch, self._old_capacity)
+
+        for index in range(self._migrate_pos, end):
+            current = old_buckets[index]
+            old_buckets[index] = None
+            # Relink existing nodes; keys are unique so no duplicate check is needed
+            while current:
+                next_node = current.next
+                new_index = self._hash(current.key)
+                current.next = self.buckets[new_index]
+                self.buckets[new_index] = current
+                current = next_node
+
+        self._migrate_pos = end
+        if end >= self._old_capacity:
+            self._old_buckets = None
+            self._old_capacity = 0
+            self._migrate_pos = 0
+        self._record_resize(started_at)
+
+    def _finish_migration(self):
+        """Drain any incremental resize that is still in progress"""
+        while self._old_buckets is not None:
+            self._migrate_step()
+
+    def _reserve(self, count):
+        """Grow the bucket array once so that count entries fit under the load factor"""
+        self._finish_migration()
+        capacity = self.capacity
+        while count / capacity > self.load_factor:
+            capacity *= 2
+        if capacity != self.capacity:
+            self._rebuild(capacity)
+
+    def _compact_capacity(self):
+        """Smallest capacity, not below the initial one, that keeps the map at most half full"""
+        capacity = self.capacity
+        target = self.load_factor / 2
+        while capacity // 2 >= self._min_capacity and self.size / (capacity // 2) <= target:
+            capacity //= 2
+        return capacity
+
+    def _maybe_shrink(self):
+        """Shrink after a removal once the load drops below the low-water mark"""
+        if (
+            self.shrink_load_factor is not None
+            and self.capacity > self._min_capacity
+            and self.size / self.capacity < self.shrink_load_factor
+        ):
+            self._rebuild(self._compact_capacity())
+
+    def compact(self):
+        """Shrink the bucket array to fit the live entries"""
+        self._finish_migration()
+        capacity = self._compact_capacity()
+        if capacity != self.capacity:
+            self._rebuild(capacity)
+
+    def _rebuild(self, capacity):
+        """Relink every node into a new bucket array of the given capacity"""
+        self._finish_migration()
+        started_at = time.perf_counter()
+        old_buckets = self.buckets
+        self.capacity = capacity
+        self.buckets = [None] * capacity
+        self._mod_count += 1
+        for bucket in old_buckets:
+            current = bucket
+            while current:
+                next_node = current.next
+                index = self._hash(current.key)
+                current.next = self.buckets[index]
+                self.buckets[index] = current
+                current = next_node
+        self.resize_count += 1
+        self._record_resize(started_at)
+
+    def _find_old_bucket(self, key):
+        """Return the not-yet-migrated old bucket index for key, or None"""
+        if self._old_buckets is None:
+            return None
+        index = self._hash(key, self._old_capacity)
+        if index < self._migrate_pos:
+            return None  # Bucket already moved to the current array
+        return index
+
+    def _iter_entries(self):
+        """Lazily yield (key, value) pairs, failing if the map is modified meanwhile"""
+        # Iteration is O(n) anyway, so draining a pending migration keeps it single-table
+        self._finish_migration()
+        mod_count = self._mod_count
+        for bucket in self.buckets:
+            current = bucket
+            while current:
+                yield current.key, current.value
+                if self._mod_count != mod_count:
+                    raise RuntimeError("HashMap changed size during iteration")
+                current = current.next
     
     def put(self, key, value):
         """Insert or update key-value pair"""
+        if self._old_buckets is not None:
+            self._migrate_step()
+            old_index = self._find_old_bucket(key)
+            if old_index is not None:
+                current = self._old_buckets[old_index]
+                while current:
+                    if current.key == key:
+                        current.value = value  # Update key still in old table
+                        return
+                    current = current.next
+
         # Check if resize is needed before adding
         if (self.size + 1) / self.capacity > self.load_factor:
             self._resize()
@@ -49,6 +222,7 @@ class HashMap:
         if self.buckets[index] is None:
             self.buckets[index] = Node(key, value)
             self.size += 1
+            self._mod_count += 1
             return
         
         # Check if key exists and update, otherwise add to chain
@@ -64,9 +238,20 @@ class HashMap:
         # Add new node to end of chain
         current.next = Node(key, value)
         self.size += 1
+        self._mod_count += 1
     
-    def get(self, key):
-        """Retrieve value for a given key"""
+    def get(self, key, default=None):
+        """Retrieve value for a given key, or default when it is missing"""
+        if self._old_buckets is not None:
+            self._migrate_step()
+            old_index = self._find_old_bucket(key)
+            if old_index is not None:
+                current = self._old_buckets[old_index]
+                while current:
+                    if current.key == key:
+                        return current.value
+                    current = current.next
+
         index = self._hash(key)
         current = self.buckets[index]
         
@@ -75,31 +260,58 @@ class HashMap:
                 return current.value
             current = current.next
         
-        return None  # Key not found
+        return default  # Key not found
     
-    def remove(self, key):
-        """Remove key-value pair from hashmap"""
-        index = self._hash(key)
-        current = self.buckets[index]
+    def _unlink(self, buckets, index, key):
+        """Unlink key from the chain at buckets[index]; return whether it was there"""
+        current = buckets[index]
         prev = None
         
         while current:
             if current.key == key:
                 if prev is None:
                     # Remove first node in chain
-                    self.buckets[index] = current.next
+                    buckets[index] = current.next
                 else:
                     # Remove node from middle/end of chain
                     prev.next = current.next
-                self.size -= 1
                 return True
             prev = current
             current = current.next
         
-        return False  # Key not found
+        return False
+
+    def remove(self, key):
+        """Remove key-value pair from hashmap"""
+        removed = False
+        if self._old_buckets is not None:
+            self._migrate_step()
+            old_index = self._find_old_bucket(key)
+            if old_index is not None:
+                removed = self._unlink(self._old_buckets, old_index, key)
+        # Keys put mid-migration live in the new table even when their old bucket has not moved yet
+        if not removed:
+            removed = self._unlink(self.buckets, self._hash(key), key)
+        if not removed:
+            return False  # Key not found
+
+        self.size -= 1
+        self._mod_count += 1
+        self._maybe_shrink()
+        return True
     
     def contains(self, key):
         """Check if key exists in hashmap"""
+        if self._old_buckets is not None:
+            self._migrate_step()
+            old_index = self._find_old_bucket(key)
+            if old_index is not None:
+                current = self._old_buckets[old_index]
+                while current:
+                    if current.key == key:
+                        return True
+                    current = current.next
+
         index = self._hash(key)
         current = self.buckets[index]
         
@@ -110,41 +322,134 @@ class HashMap:
         
         return False
     
-    def keys(self):
-        """Return list of all keys"""
-        result = []
-        for bucket in self.buckets:
-            current = bucket
+    @classmethod
+    def from_items(cls, items, expected_size=None, **kwargs):
+        """
+        Build a HashMap from (key, value) pairs with a single presizing step
+
+        Args:
+            items: Iterable of (key, value) tuples
+            expected_size: Number of pairs; defaults to len(items) when available
+            **kwargs: Extra constructor arguments, e.g. incremental_resize
+        """
+        hashmap = cls(**kwargs)
+        hashmap.put_many(items, expected_size)
+        return hashmap
+
+    def put_many(self, items, expected_size=None):
+        """
+        Insert or update many key-value pairs
+
+        Capacity is reserved once up front, so each key is hashed exactly once
+        and no per-item load factor check or resize happens. Any incremental
+        migration in progress is completed first.
+
+        Args:
+            items: Iterable of (key, value) tuples
+            expected_size: Number of pairs; defaults to len(items) when available
+        """
+        if expected_size is None:
+            if not hasattr(items, '__len__'):
+                items = list(items)
+            expected_size = len(items)
+        self._reserve(self.size + expected_size)
+
+        buckets = self.buckets
+        hash_key = self._hash
+        added = 0
+        for key, value in items:
+            index = hash_key(key)
+            current = buckets[index]
             while current:
-                result.append(current.key)
+                if current.key == key:
+                    current.value = value  # Update existing key
+                    break
                 current = current.next
-        return result
-    
-    def values(self):
-        """Return list of all values"""
+            else:
+                node = Node(key, value)
+                node.next = buckets[index]
+                buckets[index] = node
+                added += 1
+        self.size += added
+        if added:
+            self._mod_count += 1
+
+    def get_many(self, keys, default=None):
+        """Return a list with the value of each key, or default when missing"""
+        if self._old_buckets is not None:
+            self._migrate_step()
+        if self._old_buckets is not None:
+            # Keys may still live in the old table; take the checked path
+            return [self.get(key, default) for key in keys]
+
+        buckets = self.buckets
         result = []
-        for bucket in self.buckets:
-            current = bucket
+        append = result.append
+        if self.hash_mode != "keyed":
+            hash_key = self._hash
+            for key in keys:
+                current = buckets[hash_key(key)]
+                while current:
+                    if current.key == key:
+                        append(current.value)
+                        break
+                    current = current.next
+                else:
+                    append(default)
+            return result
+
+        # Inlined keyed_hash: copy the pre-keyed state and reduce without any call into the map
+        capacity = self.capacity
+        copy_state = KEYED_STATE.copy
+        from_bytes = int.from_bytes
+        for key in keys:
+            state = copy_state()
+            state.update(str(key).encode("utf-8", "surrogatepass"))
+            current = buckets[from_bytes(state.digest(), "little") % capacity]
             while current:
-                result.append(current.value)
+                if current.key == key:
+                    append(current.value)
+                    break
                 current = current.next
+            else:
+                append(default)
         return result
-    
-    def items(self):
-        """Return list of all key-value pairs as tuples"""
-        result = []
-        for bucket in self.buckets:
-            current = bucket
+
+    def _chain_lengths(self):
+        """Yield the chain length of every bucket, including unmigrated old buckets"""
+        tables = [self.buckets] if self._old_buckets is None else [self._old_buckets, self.buckets]
+        for table in tables:
+            for bucket in table:
+                length = 0
+                while bucket:
+                    length += 1
+                    bucket = bucket.next
+                yield length
+
+    def _probe_length(self, key):
+        """Number of chain nodes a lookup of key visits"""
+        chains = [self.buckets[self._hash(key)]]
+        old_index = self._find_old_bucket(key)
+        if old_index is not None:
+            chains.insert(0, self._old_buckets[old_index])
+        probes = 0
+        for current in chains:
             while current:
-                result.append((current.key, current.value))
+                probes += 1
+                if current.key == key:
+                    return probes
                 current = current.next
-        return result
-    
+        return probes
+
+    def _estimate_memory(self):
+        """Approximate bytes held by bucket arrays and nodes (keys and values excluded)"""
+        sample = Node(None, None)
+        node_bytes = sys.getsizeof(sample) + sys.getsizeof(sample.__dict__)
+        total = sys.getsizeof(self.buckets) + self.size * node_bytes
+        if self._old_buckets is not None:
+            total += sys.getsizeof(self._old_buckets)
+        return total
+
     def __len__(self):
         """Return number of key-value pairs"""
         return self.size
-    
-    def __str__(self):
-        """String representation of hashmap"""
-        items = self.items()
-        return '{' + ', '.join(f'{k}: {v}' for k, v in items) + '}'
@@ -0,0 +1,341 @@
+import sys
+import time
+
+from .stats import StatsMixin
+from .views import MappingMixin
+
+_EMPTY = object()      # Slot that has never held a key
+_DELETED = object()    # Tombstone left behind by remove()
+
+_PERTURB_SHIFT = 5
+_MIN_CAPACITY = 8
+
+
+class OpenHashMap(MappingMixin, StatsMixin):
+    """
+    HashMap storage engine using open addressing over flat parallel arrays.
+
+    Exposes the same API as HashMap but keeps hashes, keys and values in three
+    lists instead of allocating a Node per entry. The full hash of every key is
+    cached, so probing compares integers first and resizing never re-hashes keys.
+    Removed entries leave a tombstone that keeps probe sequences intact until
+    the next resize. Keys must be hashable.
+    """
+
+    def __init__(self, capacity=16, shrink_load_factor=0.125):
+        """
+        Initialize OpenHashMap with given capacity (rounded up to a power of two)
+
+        Args:
+            capacity: Initial number of slots
+            shrink_load_factor: Shrink once a removal leaves the load below this
+                (None disables); shrinking targets half the max load factor
+        """
+        self.capacity = self._round_capacity(capacity)
+        self.size = 0
+        self.load_factor = 0.75
+        self.shrink_load_factor = shrink_load_factor
+        self._min_capacity = self.capacity  # Never shrink below the initial capacity
+        self._used = 0  # Live entries plus tombstones
+        self._mod_count = 0  # Bumped on structural changes to invalidate iterators
+        self._hashes = [0] * self.capacity
+        self._keys = [_EMPTY] * self.capacity
+        self._values = [None] * self.capacity
+
+    @staticmethod
+    def _round_capacity(capacity):
+        """Round capacity up to the next power of two"""
+        result = _MIN_CAPACITY
+        while result < capacity:
+            result <<= 1
+        return result
+
+    def _hash(self, key):
+        """Generate the full (unreduced) hash for a given key"""
+        return hash(key)
+
+    def _probe(self, key, hash_val):
+        """
+        Walk the probe sequence for a key
+
+        Returns:
+            Tuple of (slot holding the key or None, first free slot seen)
+        """
+        keys = self._keys
+        hashes = self._hashes
+        mask = self.capacity - 1
+        perturb = hash_val & 0xFFFFFFFFFFFFFFFF
+        index = hash_val & mask
+        free_slot = None
+
+        while True:
+            slot_key = keys[index]
+            if slot_key is _EMPTY:
+                return None, index if free_slot is None else free_slot
+            if slot_key is _DELETED:
+                if free_slot is None:
+                    free_slot = index
+            elif hashes[index] == hash_val and (slot_key is key or slot_key == key):
+                return index, free_slot
+            perturb >>= _PERTURB_SHIFT
+            index = (index * 5 + perturb + 1) & mask
+
+    def _find(self, key):
+        """Return the slot index holding key, or None"""
+        return self._probe(key, self._hash(key))[0]
+
+    def _resize(self, new_capacity=None):
+        """Rebuild the arrays, dropping tombstones and reusing cached hashes"""
+        if new_capacity is None:
+            new_capacity = self.capacity * 2
+        started_at = time.perf_counter()
+        old_hashes = self._hashes
+        old_keys = self._keys
+        old_values = self._values
+
+        self.capacity = self._round_capacity(new_capacity)
+        self._hashes = [0] * self.capacity
+        self._keys = [_EMPTY] * self.capacity
+        self._values = [None] * self.capacity
+        self._used = self.size
+        self._mod_count += 1
+
+        hashes = self._hashes
+        keys = self._keys
+        values = self._values
+        mask = self.capacity - 1
+        for i, key in enumerate(old_keys):
+            if key is _EMPTY or key is _DELETED:
+                continue
+            hash_val = old_hashes[i]
+            perturb = hash_val & 0xFFFFFFFFFFFFFFFF
+            index = hash_val & mask
+            # Fresh table has no tombstones and no duplicates: first empty slot wins
+            while keys[index] is not _EMPTY:
+                perturb >>= _PERTURB_SHIFT
+                index = (index * 5 + perturb + 1) & mask
+            hashes[index] = hash_val
+            keys[index] = key
+            values[index] = old_values[i]
+        self.resize_count += 1
+        self._record_resize(started_at)
+
+    def _reserve(self, count):
+        """Rebuild once so that count more claimed slots fit under the load factor"""
+        if (self._used + count) / self.capacity <= self.load_factor:
+            return
+        capacity = self.capacity
+        while (self.size + count) / capacity > self.load_factor:
+            capacity <<= 1
+        self._resize(capacity)
+
+    def _compact_capacity(self):
+        """Smallest capacity, not below the initial one, that keeps the map at most half full"""
+        capacity = self.capacity
+        target = self.load_factor / 2
+        while capacity // 2 >= self._min_capacity and self.size / (capacity // 2) <= target:
+            capacity //= 2
+        return capacity
+
+    def compact(self):
+        """Shrink the slot arrays to fit the live entries and drop all tombstones"""
+        capacity = self._compact_capacity()
+        if capacity != self.capacity or self._used != self.size:
+            self._resize(capacity)
+
+    def put(self, key, value):
+        """Insert or update key-value pair"""
+        hash_val = self._hash(key)
+        index, free_slot = self._probe(key, hash_val)
+
+        if index is not None:
+            self._values[index] = value  # Update existing key
+            return
+
+        if self._keys[free_slot] is _EMPTY:
+            # Claiming a never-used slot grows the fill; resize first if needed
+            if (self._used + 1) / self.capacity > self.load_factor:
+                # Mostly tombstones: rebuild in place instead of growing
+                grow = self.size + 1 > self.capacity * self.load_factor / 2
+                self._resize(self.capacity * 2 if grow else self.capacity)
+                free_slot = self._probe(key, hash_val)[1]
+            self._used += 1
+
+        self._hashes[free_slot] = hash_val
+        self._keys[free_slot] = key
+        self._values[free_slot] = value
+        self.size += 1
+        self._mod_count += 1
+
+    def get(self, key, default=None):
+        """Retrieve value for a given key, or default when it is missing"""
+        index = self._find(key)
+        if index is None:
+            return default  # Key not found
+        return self._values[index]
+
+    def remove(self, key):
+        """Remove key-value pair from hashmap"""
+        index = self._find(key)
+        if index is None:
+            return False  # Key not found
+
+        # Leave a tombstone so later keys in the probe sequence stay reachable
+        self._keys[index] = _DELETED
+        self._values[index] = None
+        self.size -= 1
+        self._mod_count += 1
+        if (
+            self.shrink_load_factor is not None
+            and self.capacity > self._min_capacity
+            and self.size / self.capacity < self.shrink_load_factor
+        ):
+            self._resize(self._compact_capacity())
+        return True
+
+    def contains(self, key):
+        """Check if key exists in hashmap"""
+        return self._find(key) is not None
+
+    @classmethod
+    def from_items(cls, items, expected_size=None, **kwargs):
+        """
+        Build an OpenHashMap from (key, value) pairs with a single presizing step
+
+        Args:
+            items: Iterable of (key, value) tuples
+            expected_size: Number of pairs; defaults to len(items) when available
+            **kwargs: Extra constructor arguments, e.g. shrink_load_factor
+        """
+        hashmap = cls(**kwargs)
+        hashmap.put_many(items, expected_size)
+        return hashmap
+
+    def put_many(self, items, expected_size=None):
+        """
+        Insert or update many key-value pairs
+
+        Capacity is reserved once up front, so each key is hashed exactly once
+        and the per-item load factor check is skipped. If expected_size turns
+        out to be too small the remaining items fall back to put().
+
+        Args:
+            items: Iterable of (key, value) tuples
+            expected_size: Number of pairs; defaults to len(items) when available
+        """
+        if expected_size is None:
+            if not hasattr(items, '__len__'):
+                items = list(items)
+            expected_size = len(items)
+        self._reserve(expected_size)
+
+        limit = self.capacity * self.load_factor
+        probe = self._probe
+        hash_key = self._hash
+        for key, value in items:
+            if self._used + 1 > limit:
+                self.put(key, value)
+                continue
+            hash_val = hash_key(key)
+            index, free_slot = probe(key, hash_val)
+            if index is not None:
+                self._values[index] = value  # Update existing key
+                continue
+            if self._keys[free_slot] is _EMPTY:
+                self._used += 1
+            self._hashes[free_slot] = hash_val
+            self._keys[free_slot] = key
+            self._values[free_slot] = value
+            self.size += 1
+            self._mod_count += 1
+
+    def get_many(self, keys, default=None):
+        """Return a list with the value of each key, or default when missing"""
+        slot_keys = self._keys
+        hashes = self._hashes
+        values = self._values
+        mask = self.capacity - 1
+        hash_key = self._hash
+        result = []
+        for key in keys:
+            # Inlined lookup-only version of _probe
+            hash_val = hash_key(key)
+            perturb = hash_val & 0xFFFFFFFFFFFFFFFF
+            index = hash_val & mask
+            value = default
+            while True:
+                slot_key = slot_keys[index]
+                if slot_key is _EMPTY:
+                    break
+                if slot_key is not _DELETED and hashes[index] == hash_val and (
+                    slot_key is key or slot_key == key
+                ):
+                    value = values[index]
+                    break
+                perturb >>= _PERTURB_SHIFT
+                index = (index * 5 + perturb + 1) & mask
+            result.append(value)
+        return result
+
+    def _iter_entries(self):
+        """Lazily yield (key, value) pairs, failing if the map is modified meanwhile"""
+        mod_count = self._mod_count
+        keys = self._keys
+        values = self._values
+        for i, key in enumerate(keys):
+            if key is _EMPTY or key is _DELETED:
+                continue
+            yield key, values[i]
+            if self._mod_count != mod_count:
+                raise RuntimeError("OpenHashMap changed size during iteration")
+
+    def _chain_lengths(self):
+        """Yield, for every live entry, the number of slots probed to reach it"""
+        mask = self.capacity - 1
+        for slot, key in enumerate(self._keys):
+            if key is _EMPTY or key is _DELETED:
+                continue
+            hash_val = self._hashes[slot]
+            perturb = hash_val & 0xFFFFFFFFFFFFFFFF
+            index = hash_val & mask
+            length = 1
+            while index != slot:
+                perturb >>= _PERTURB_SHIFT
+                index = (index * 5 + perturb + 1) & mask
+                length += 1
+            yield length
+
+    def _probe_length(self, key):
+        """Number of slots a lookup of key visits"""
+        hash_val = self._hash(key)
+        keys = self._keys
+        mask = self.capacity - 1
+        perturb = hash_val & 0xFFFFFFFFFFFFFFFF
+        index = hash_val & mask
+        probes = 1
+        while keys[index] is not _EMPTY:
+            slot_key = keys[index]
+            if slot_key is not _DELETED and self._hashes[index] == hash_val and slot_key == key:
+                break
+            perturb >>= _PERTURB_SHIFT
+            index = (index * 5 + perturb + 1) & mask
+            probes += 1
+        return probes
+
+    def _estimate_memory(self):
+        """Approximate bytes held by the slot arrays and cached hashes (keys and values excluded)"""
+        total = sum(sys.getsizeof(array) for array in (self._hashes, self._keys, self._values))
+        for slot, key in enumerate(self._keys):
+            if key is not _EMPTY and key is not _DELETED:
+                total += sys.getsizeof(self._hashes[slot])
+        return total
+
+    def stats(self):
+        """Return a snapshot of the map's shape and history, including tombstones"""
+        result = super().stats()
+        result["tombstones"] = self._used - self.size
+        return result
+
+    def __len__(self):
+        """Return number of key-value pairs"""
+        return self.size
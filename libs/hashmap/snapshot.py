@@ -0,0 +1,283 @@
+"""
+Binary snapshots of hashmap contents
+
+A snapshot is one file laid out as a header, an open-addressing slot table
+and a run of length-prefixed records:
+
+    header   magic, format version, kind, kind-specific meta, record count,
+             slot count, hash salt and a CRC32 of everything after the header
+    slots    slot_count x (hash, record offset); offset 0 marks an empty slot
+    records  (key length, value length, key bytes, value bytes) back to back
+
+Loading memory-maps the file and only parses the header, so a new process can
+answer lookups at once: a lookup probes the slot table and decodes the single
+record it lands on. Slot hashes are BLAKE2b keyed with a salt drawn when the
+snapshot is written, so bucket placement is as unpredictable as in HashMap.
+"""
+import hashlib
+import json
+import mmap
+import os
+import secrets
+import struct
+import zlib
+
+from .hashmap import HashMap
+from .views import MappingMixin
+
+SNAPSHOT_MAGIC = b"OVSNAP\x00\x00"
+SNAPSHOT_VERSION = 3
+
+KIND_HASHMAP = 1
+KIND_FILE_TREE = 2
+
+_HEADER = struct.Struct("<8sHHIQQ16sI")
+_SLOT = struct.Struct("<QQ")
+_RECORD = struct.Struct("<II")
+
+
+class SnapshotError(ValueError):
+    """Raised when a snapshot file is malformed, corrupt or of another version"""
+
+
+def table_layout(count):
+    """
+    Size the slot table for count records
+
+    Returns:
+        Tuple of (slot_count, offset of the first record)
+    """
+    slot_count = 8
+    while count / slot_count > 0.5:
+        slot_count <<= 1
+    return slot_count, _HEADER.size + slot_count * _SLOT.size
+
+
+def record_size(key, value):
+    """Bytes a record with the given encoded key and value occupies"""
+    return _RECORD.size + len(key) + len(value)
+
+
+def _slot_hash(salt, key):
+    return int.from_bytes(hashlib.blake2b(key, key=salt, digest_size=8).digest(), "little")
+
+
+def write_table(path, kind, records, meta=0):
+    """
+    Write encoded records as a snapshot file, atomically replacing path
+
+    Records are stored in the order given, starting at the offset reported by
+    table_layout(), so callers can compute record offsets up front.
+
+    Args:
+        path: Destination file path
+        kind: KIND_HASHMAP or KIND_FILE_TREE
+        records: List of (key bytes, value bytes); keys must be unique
+        meta: Kind-specific 32-bit value stored in the header
+    """
+    salt = secrets.token_bytes(16)
+    slot_count, offset = table_layout(len(records))
+    mask = slot_count - 1
+    slot_hashes = [0] * slot_count
+    slot_offsets = [0] * slot_count
+    body = bytearray()
+
+    for key, value in records:
+        hash_val = _slot_hash(salt, key)
+        index = hash_val & mask
+        while slot_offsets[index]:
+            index = (index + 1) & mask
+        slot_hashes[index] = hash_val
+        slot_offsets[index] = offset + len(body)
+        body += _RECORD.pack(len(key), len(value))
+        body += key
+        body += value
+
+    slots = b"".join(map(_SLOT.pack, slot_hashes, slot_offsets))
+
+    checksum = zlib.crc32(body, zlib.crc32(slots))
+    header = _HEADER.pack(
+        SNAPSHOT_MAGIC, SNAPSHOT_VERSION, kind, meta, len(records), slot_count, salt, checksum
+    )
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as snapshot_file:
+        snapshot_file.write(header)
+        snapshot_file.write(slots)
+        snapshot_file.write(body)
+    os.replace(temp_path, path)
+
+
+class SnapshotTable:
+    """Read-only, memory-mapped view of a snapshot file"""
+
+    def __init__(self, path, kind, verify=True):
+        """
+        Map a snapshot file and validate its header
+
+        Args:
+            path: Snapshot file path
+            kind: Expected snapshot kind
+            verify: Check the CRC32 of the whole file (one sequential pass)
+        """
+        with open(path, "rb") as snapshot_file:
+            try:
+                self._mmap = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise SnapshotError(f"Empty snapshot file: {path}")
+        try:
+            self._read_header(path, kind, verify)
+        except Exception:
+            self._mmap.close()
+            raise
+
+    def _read_header(self, path, kind, verify):
+        if len(self._mmap) < _HEADER.size:
+            raise SnapshotError(f"Truncated snapshot file: {path}")
+        magic, version, file_kind, meta, count, slot_count, salt, checksum = _HEADER.unpack_from(
+            self._mmap, 0
+        )
+        if magic != SNAPSHOT_MAGIC:
+            raise SnapshotError(f"Not a snapshot file: {path}")
+        if version != SNAPSHOT_VERSION:
+            raise SnapshotError(
+                f"Unsupported snapshot version {version} (expected {SNAPSHOT_VERSION}): {path}"
+            )
+        if file_kind != kind:
+            raise SnapshotError(f"Snapshot kind {file_kind} does not match expected kind {kind}: {path}")
+        if len(self._mmap) < _HEADER.size + slot_count * _SLOT.size:
+            raise SnapshotError(f"Truncated snapshot file: {path}")
+        if verify and zlib.crc32(self._mmap[_HEADER.size:]) != checksum:
+            raise SnapshotError(f"Snapshot checksum mismatch: {path}")
+
+        self.meta = meta
+        self.count = count
+        self._salt = salt
+        self._mask = slot_count - 1
+        self._records_offset = _HEADER.size + slot_count * _SLOT.size
+
+    def find(self, key):
+        """Return the record offset for an encoded key, or None"""
+        buffer = self._mmap
+        hash_val = _slot_hash(self._salt, key)
+        index = hash_val & self._mask
+        while True:
+            slot_hash, offset = _SLOT.unpack_from(buffer, _HEADER.size + index * _SLOT.size)
+            if not offset:
+                return None
+            if slot_hash == hash_val:
+                key_length = _RECORD.unpack_from(buffer, offset)[0]
+                start = offset + _RECORD.size
+                if buffer[start:start + key_length] == key:
+                    return offset
+            index = (index + 1) & self._mask
+
+    def read_record(self, offset):
+        """Return the (key bytes, value bytes) of the record at offset"""
+        key_length, value_length = _RECORD.unpack_from(self._mmap, offset)
+        start = offset + _RECORD.size
+        middle = start + key_length
+        return self._mmap[start:middle], self._mmap[middle:middle + value_length]
+
+    def iter_offsets(self):
+        """Yield the offset of every record in file order"""
+        offset = self._records_offset
+        end = len(self._mmap)
+        while offset < end:
+            yield offset
+            key_length, value_length = _RECORD.unpack_from(self._mmap, offset)
+            offset += _RECORD.size + key_length + value_length
+
+    def close(self):
+        """Unmap the file"""
+        self._mmap.close()
+
+
+def _encode_json(value):
+    return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+class MappedHashMap(MappingMixin):
+    """
+    Read-only hashmap served straight from a memory-mapped snapshot
+
+    Keys are the str() of the original keys. Values are decoded on every
+    access and never cached, so the resident cost is the pages touched.
+    """
+
+    def __init__(self, path, decode_value=json.loads, verify=True):
+        """
+        Open a snapshot written by save_snapshot
+
+        Args:
+            path: Snapshot file path
+            decode_value: Turns stored value bytes back into a value
+            verify: Check the file checksum before serving
+        """
+        self._table = SnapshotTable(path, KIND_HASHMAP, verify)
+        self._decode_value = decode_value
+
+    def _lookup(self, key):
+        offset = self._table.find(str(key).encode("utf-8", "surrogatepass"))
+        if offset is None:
+            return None
+        return self._table.read_record(offset)[1]
+
+    def get(self, key, default=None):
+        """Retrieve value for a given key, or default when it is missing"""
+        value = self._lookup(key)
+        return default if value is None else self._decode_value(value)
+
+    def contains(self, key):
+        """Check if key exists in the snapshot"""
+        return self._lookup(key) is not None
+
+    def put(self, key, value):
+        raise TypeError("MappedHashMap is read-only; use to_hashmap() for a mutable copy")
+
+    def remove(self, key):
+        raise TypeError("MappedHashMap is read-only; use to_hashmap() for a mutable copy")
+
+    def _iter_entries(self):
+        """Yield (key, value) pairs in file order, decoding each one"""
+        for offset in self._table.iter_offsets():
+            key, value = self._table.read_record(offset)
+            yield key.decode("utf-8", "surrogatepass"), self._decode_value(value)
+
+    def to_hashmap(self, map_class=HashMap, **kwargs):
+        """Decode every entry into a new mutable map of the given engine"""
+        return map_class.from_items(self.item_list(), **kwargs)
+
+    def close(self):
+        """Unmap the snapshot file"""
+        self._table.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        """Return number of key-value pairs"""
+        return self._table.count
+
+
+def save_snapshot(hashmap, path, encode_value=_encode_json):
+    """
+    Write the contents of any hashmap engine to a snapshot file
+
+    Args:
+        hashmap: HashMap, OpenHashMap, ConcurrentHashMap or MappedHashMap
+        path: Destination file path
+        encode_value: Turns a value into bytes (JSON by default)
+    """
+    records = [
+        (str(key).encode("utf-8", "surrogatepass"), encode_value(value))
+        for key, value in hashmap.items()
+    ]
+    write_table(path, KIND_HASHMAP, records)
+
+
+def load_snapshot(path, decode_value=json.loads, verify=True):
+    """Memory-map a snapshot written by save_snapshot as a read-only MappedHashMap"""
+    return MappedHashMap(path, decode_value, verify)
@@ -0,0 +1,74 @@
+import time
+
+
+class StatsMixin:
+    """
+    Introspection for hashmap engines
+
+    Engines provide _chain_lengths() (one length per bucket for chaining, one
+    probe length per entry for open addressing), _probe_length(key) and
+    _estimate_memory(), and report resizes through _record_resize().
+    Probe counters wrap get/contains on the instance only while enabled, so
+    they cost nothing when switched off.
+    """
+    resize_count = 0
+    rehash_seconds = 0.0
+    _probe_counters = None
+
+    def _record_resize(self, started_at):
+        """Account one resize (or migration step) that began at started_at"""
+        self.rehash_seconds += time.perf_counter() - started_at
+
+    def enable_probe_counters(self):
+        """Start counting lookups and the probes (nodes or slots visited) they take"""
+        counters = {"lookups": 0, "probes": 0}
+        self._probe_counters = counters
+        engine = type(self)
+
+        def counted(method):
+            def wrapper(key, *args):
+                counters["lookups"] += 1
+                counters["probes"] += self._probe_length(key)
+                return method(self, key, *args)
+            return wrapper
+
+        self.get = counted(engine.get)
+        self.contains = counted(engine.contains)
+
+    def disable_probe_counters(self):
+        """Stop counting and restore the uninstrumented lookup methods"""
+        self._probe_counters = None
+        self.__dict__.pop("get", None)
+        self.__dict__.pop("contains", None)
+
+    def stats(self):
+        """
+        Return a snapshot of the map's shape and history
+
+        Returns:
+            Dictionary with capacity, size, load factor, chain length histogram,
+            resize history, estimated memory and, when enabled, probe counters
+        """
+        histogram = {}
+        for length in self._chain_lengths():
+            histogram[length] = histogram.get(length, 0) + 1
+
+        counters = self._probe_counters
+        lookups = counters["lookups"] if counters else None
+        probes = counters["probes"] if counters else None
+        capacity = self.capacity
+        return {
+            "engine": type(self).__name__,
+            "capacity": capacity,
+            "size": len(self),
+            "load_factor": len(self) / capacity if capacity else 0.0,
+            "max_load_factor": self.load_factor,
+            "chain_length_histogram": dict(sorted(histogram.items())),
+            "max_chain_length": max(histogram, default=0),
+            "resize_count": self.resize_count,
+            "rehash_seconds": self.rehash_seconds,
+            "memory_bytes": self._estimate_memory(),
+            "lookups": lookups,
+            "probes": probes,
+            "avg_probes_per_lookup": probes / lookups if lookups else None,
+        }
@@ -0,0 +1,130 @@
+import sys
+import threading
+from django.test import TestCase
+from .concurrent_hashmap import ConcurrentHashMap
+
+
+class TestConcurrentHashMap(TestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.hashmap = ConcurrentHashMap()
+        # Switch threads far more often than usual to shake out races
+        self.original_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+
+    def tearDown(self):
+        sys.setswitchinterval(self.original_interval)
+
+    def run_threads(self, target, count):
+        threads = [threading.Thread(target=target, args=(i,)) for i in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def test_basic_operations(self):
+        """Test the single-threaded HashMap API."""
+        self.hashmap.put("key1", "value1")
+        self.hashmap.put("key1", "updated")
+        self.hashmap["key2"] = None
+        self.assertEqual(self.hashmap.get("key1"), "updated")
+        self.assertTrue(self.hashmap.contains("key2"))
+        self.assertEqual(len(self.hashmap), 2)
+        self.assertTrue(self.hashmap.remove("key1"))
+        self.assertFalse(self.hashmap.remove("key1"))
+        self.assertEqual(self.hashmap.get("key1", "default"), "default")
+        self.assertEqual(self.hashmap.item_list(), [("key2", None)])
+
+    def test_segments_grow_independently(self):
+        """Test a segment resizes without losing entries."""
+        hm = ConcurrentHashMap(capacity=2, concurrency_level=2)
+        initial_capacity = hm.capacity
+        hm.put_many((i, str(i)) for i in range(1000))
+        self.assertGreater(hm.capacity, initial_capacity)
+        self.assertEqual(len(hm), 1000)
+        self.assertEqual(hm.get_many(range(1000)), [str(i) for i in range(1000)])
+
+    def test_concurrent_writers_and_readers(self):
+        """Stress test: parallel writers with resizes while readers verify visibility."""
+        hm = ConcurrentHashMap(capacity=2, concurrency_level=4)
+        writers, per_writer = 8, 1500
+        errors = []
+
+        def writer(worker):
+            for i in range(per_writer):
+                key = f"w{worker}/file_{i}"
+                hm.put(key, i)
+                # A key this thread just wrote must be immediately visible
+                if hm.get(key) != i:
+                    errors.append(key)
+            for i in range(0, per_writer, 3):
+                hm.remove(f"w{worker}/file_{i}")
+
+        self.run_threads(writer, writers)
+
+        self.assertEqual(errors, [])
+        expected = {
+            f"w{w}/file_{i}": i
+            for w in range(writers) for i in range(per_writer) if i % 3
+        }
+        self.assertEqual(len(hm), len(expected))
+        self.assertEqual(dict(hm.items()), expected)
+
+    def test_put_if_absent_single_winner(self):
+        """Test exactly one thread wins a put_if_absent race."""
+        winners = []
+
+        def contender(worker):
+            if self.hashmap.put_if_absent("shared", worker) is None:
+                winners.append(worker)
+
+        self.run_threads(contender, 16)
+        self.assertEqual(len(winners), 1)
+        self.assertEqual(self.hashmap.get("shared"), winners[0])
+
+    def test_iteration_is_weakly_consistent(self):
+        """Test iterating while writing does not raise."""
+        for i in range(100):
+            self.hashmap.put(i, i)
+        for key in self.hashmap:
+            self.hashmap.put(key + 1000, key)
+        self.assertGreaterEqual(len(self.hashmap), 200)
+
+    def test_stats(self):
+        """Test stats aggregates every segment."""
+        hm = ConcurrentHashMap(capacity=2, concurrency_level=2)
+        hm.put_many((i, i) for i in range(100))
+        stats = hm.stats()
+        self.assertEqual(stats["size"], 100)
+        self.assertEqual(sum(stats["chain_length_histogram"].values()), hm.capacity)
+        self.assertGreater(stats["resize_count"], 0)
+        self.assertGreater(stats["memory_bytes"], 0)
+
+    def test_segments_shrink(self):
+        """Test segments shrink after mass removal and compact() fits them."""
+        hm = ConcurrentHashMap(capacity=16, concurrency_level=2)
+        initial_capacity = hm.capacity
+        hm.put_many((i, i) for i in range(2000))
+        for i in range(1990):
+            hm.remove(i)
+        self.assertLess(hm.capacity, 256)
+        hm.compact()
+        self.assertEqual(hm.capacity, initial_capacity * 2)
+        self.assertEqual(sorted(hm), list(range(1990, 2000)))
+
+    def test_batch_operations(self):
+        """Test put_many, get_many and from_items agree with the single-key API."""
+        hm = ConcurrentHashMap.from_items(((f"key{i}", i) for i in range(500)), concurrency_level=4)
+        hm.put_many([("key0", "updated"), ("extra", None)])
+        keys = [f"key{i}" for i in range(500)] + ["extra", "missing"]
+        self.assertEqual(hm.get_many(keys, default=-1), [hm.get(key, -1) for key in keys])
+        self.assertEqual(hm.get_many(["key0", "missing"]), ["updated", None])
+        self.assertEqual(len(hm), 501)
+
+    def test_from_items_keeps_larger_capacity(self):
+        """Test from_items merges an explicit capacity with the one the items need."""
+        self.assertEqual(ConcurrentHashMap.from_items([("a", 1)], capacity=1024).capacity, 1024)
+        hm = ConcurrentHashMap.from_items(((i, i) for i in range(1000)), capacity=16)
+        self.assertGreaterEqual(hm.capacity, 1000 / hm.load_factor)
+        self.assertEqual(hm.resize_count, 0)
@@ -1,3 +1,4 @@
+from itertools import product
 from django.test import TestCase
 from .hashmap import HashMap, Node
 
@@ -114,7 +115,7 @@ class TestHashMap(TestCase):
     
     def test_keys(self):
         """Test keys method."""
-        self.assertEqual(self.hashmap.keys(), [])
+        self.assertEqual(list(self.hashmap.keys()), [])
         
         self.hashmap.put("key1", "value1")
         self.hashmap.put("key2", "value2")
@@ -125,7 +126,7 @@ class TestHashMap(TestCase):
     
     def test_values(self):
         """Test values method."""
-        self.assertEqual(self.hashmap.values(), [])
+        self.assertEqual(list(self.hashmap.values()), [])
         
         self.hashmap.put("key1", "value1")
         self.hashmap.put("key2", "value2")
@@ -136,7 +137,7 @@ class TestHashMap(TestCase):
     
     def test_items(self):
         """Test items method."""
-        self.assertEqual(self.hashmap.items(), [])
+        self.assertEqual(list(self.hashmap.items()), [])
         
         self.hashmap.put("key1", "value1")
         self.hashmap.put("key2", "value2")
@@ -200,6 +201,315 @@ class TestHashMap(TestCase):
         self.assertIsNone(small_map.get("a"))
         self.assertEqual(small_map.get("c"), 3)
 
+    def test_incremental_resize_migrates_gradually(self):
+        """Test incremental mode keeps both tables and drains the old one over later operations."""
+        hm = HashMap(4, incremental_resize=True, migrate_batch=1)
+        for i in range(4):
+            hm.put(f"key{i}", i)
+
+        # The fourth put doubled capacity but left the old buckets in place
+        self.assertEqual(hm.capacity, 8)
+        self.assertIsNotNone(hm._old_buckets)
+
+        # Lookups see entries in either table while migration is in progress
+        for i in range(4):
+            self.assertEqual(hm.get(f"key{i}"), i)
+        self.assertEqual(len(hm), 4)
+
+        for _ in range(4):
+            hm.contains("missing")
+        self.assertIsNone(hm._old_buckets)
+        self.assertCountEqual(hm.items(), [(f"key{i}", i) for i in range(4)])
+
+    def test_incremental_resize_update_and_remove(self):
+        """Test updates and removals of keys that are still in the old table."""
+        hm = HashMap(8, incremental_resize=True, migrate_batch=1)
+        for i in range(7):
+            hm.put(f"key{i}", i)
+        self.assertIsNotNone(hm._old_buckets)
+
+        hm.put("key0", "updated")
+        self.assertTrue(hm.remove("key1"))
+        self.assertFalse(hm.remove("key1"))
+        self.assertEqual(hm.get("key0"), "updated")
+        self.assertFalse(hm.contains("key1"))
+        self.assertEqual(len(hm), 6)
+        self.assertEqual(len(hm.keys()), 6)
+
+    def test_incremental_resize_remove_key_put_mid_migration(self):
+        """Test removing a new key whose old bucket has not been migrated yet."""
+        hm = HashMap(8, incremental_resize=True, migrate_batch=1)
+        for i in range(7):
+            hm.put(f"key{i}", i)
+        self.assertIsNotNone(hm._old_buckets)
+
+        # A key that put() places in the new table while its old bucket is still pending
+        key = next(
+            f"new{i}" for i in range(1000)
+            if hm._hash(f"new{i}", hm._old_capacity) > hm._migrate_pos + 2
+        )
+        hm.put(key, "value")
+        self.assertIsNotNone(hm._find_old_bucket(key))
+
+        self.assertTrue(hm.remove(key))
+        self.assertFalse(hm.contains(key))
+        self.assertFalse(hm.remove(key))
+        self.assertEqual(len(hm), 7)
+
+    def test_incremental_resize_many_entries(self):
+        """Test consecutive incremental resizes never lose entries."""
+        hm = HashMap(2, incremental_resize=True)
+        for i in range(500):
+            hm.put(i, str(i))
+        self.assertEqual(len(hm), 500)
+        for i in range(500):
+            self.assertEqual(hm.get(i), str(i))
+        self.assertEqual(sorted(hm.keys()), list(range(500)))
+
+    def test_from_items_presizes(self):
+        """Test from_items builds the map with a single presized bucket array."""
+        pairs = [(f"key{i}", i) for i in range(100)]
+        hm = HashMap.from_items(pairs)
+        self.assertEqual(len(hm), 100)
+        self.assertEqual(hm.capacity, 256)  # Smallest doubling of 16 holding 100 at 0.75
+        self.assertEqual(hm.get("key42"), 42)
+
+        # Generators work too, with or without an expected size
+        hm_gen = HashMap.from_items(((i, i * 2) for i in range(10)), expected_size=10)
+        self.assertEqual(hm_gen.get(9), 18)
+        self.assertEqual(len(HashMap.from_items((i, i) for i in range(10))), 10)
+
+    def test_put_many_updates_and_inserts(self):
+        """Test put_many updates existing keys and counts only new ones."""
+        self.hashmap.put("key1", "original")
+        self.hashmap.put_many([("key1", "updated"), ("key2", "value2"), ("key2", "again")])
+        self.assertEqual(len(self.hashmap), 2)
+        self.assertEqual(self.hashmap.get("key1"), "updated")
+        self.assertEqual(self.hashmap.get("key2"), "again")
+
+    def test_get_many(self):
+        """Test get_many returns values in order, with a default for missing keys."""
+        self.hashmap.put_many([("a", 1), ("b", None)])
+        self.assertEqual(self.hashmap.get_many(["a", "b", "c"]), [1, None, None])
+        self.assertEqual(self.hashmap.get_many(["c", "a"], default=0), [0, 1])
+
+    def test_get_many_matches_get_in_every_hash_mode(self):
+        """Test the inlined get_many finds the same buckets as get for each hash mode."""
+        keys = [f"key{i}" for i in range(50)] + [7, ("tuple", 1), "naïve"]
+        for mode in ("keyed", "seeded", "polynomial"):
+            hm = HashMap.from_items(((key, i) for i, key in enumerate(keys)), hash_mode=mode)
+            self.assertEqual(hm.get_many(keys + ["missing"], default=-1), [hm.get(key, -1) for key in keys] + [-1], mode)
+            self.assertEqual(hm.get_many(keys), list(range(len(keys))), mode)
+
+    def test_batch_operations_during_incremental_resize(self):
+        """Test batch operations see entries that have not been migrated yet."""
+        hm = HashMap(8, incremental_resize=True, migrate_batch=1)
+        for i in range(7):
+            hm.put(f"key{i}", i)
+        self.assertIsNotNone(hm._old_buckets)
+        self.assertEqual(hm.get_many([f"key{i}" for i in range(7)]), list(range(7)))
+
+        hm.put_many([("key0", "updated"), ("key7", 7)])
+        self.assertIsNone(hm._old_buckets)
+        self.assertEqual(len(hm), 8)
+        self.assertEqual(hm.get("key0"), "updated")
+
+    def test_list_methods(self):
+        """Test the explicit list-returning accessors."""
+        self.assertEqual(self.hashmap.key_list(), [])
+        self.hashmap.put("key1", "value1")
+        self.hashmap.put("key2", "value2")
+        self.assertIsInstance(self.hashmap.key_list(), list)
+        self.assertCountEqual(self.hashmap.key_list(), ["key1", "key2"])
+        self.assertCountEqual(self.hashmap.value_list(), ["value1", "value2"])
+        self.assertCountEqual(self.hashmap.item_list(), [("key1", "value1"), ("key2", "value2")])
+
+    def test_views_are_live(self):
+        """Test views reflect later changes without being re-created."""
+        keys = self.hashmap.keys()
+        items = self.hashmap.items()
+        self.assertEqual(len(keys), 0)
+
+        self.hashmap.put("key1", "value1")
+        self.assertEqual(len(keys), 1)
+        self.assertIn("key1", keys)
+        self.assertIn(("key1", "value1"), items)
+        self.assertNotIn(("key1", "other"), items)
+        self.assertIn("value1", self.hashmap.values())
+
+    def test_mapping_protocol(self):
+        """Test iteration, subscription, assignment, deletion and membership."""
+        self.hashmap["key1"] = "value1"
+        self.hashmap["key2"] = None
+        self.assertEqual(self.hashmap["key1"], "value1")
+        self.assertIsNone(self.hashmap["key2"])
+        self.assertIn("key2", self.hashmap)
+        self.assertCountEqual(list(self.hashmap), ["key1", "key2"])
+        self.assertEqual(dict(self.hashmap.items()), {"key1": "value1", "key2": None})
+
+        with self.assertRaises(KeyError):
+            self.hashmap["missing"]
+        del self.hashmap["key1"]
+        self.assertNotIn("key1", self.hashmap)
+        with self.assertRaises(KeyError):
+            del self.hashmap["key1"]
+        self.assertEqual(self.hashmap.get("key1", "default"), "default")
+
+    def test_concurrent_modification_detected(self):
+        """Test structural changes during iteration raise, value updates do not."""
+        for i in range(5):
+            self.hashmap.put(i, i)
+
+        for key in self.hashmap:
+            self.hashmap.put(key, "updated")
+        self.assertEqual(self.hashmap.value_list(), ["updated"] * 5)
+
+        with self.assertRaises(RuntimeError):
+            for key in self.hashmap.keys():
+                self.hashmap.put(key + 100, key)
+        with self.assertRaises(RuntimeError):
+            for key, _ in self.hashmap.items():
+                self.hashmap.remove(key)
+
+    def test_iteration_during_incremental_resize(self):
+        """Test iteration sees every entry while a migration is pending."""
+        hm = HashMap(8, incremental_resize=True, migrate_batch=1)
+        for i in range(7):
+            hm.put(i, i)
+        self.assertIsNotNone(hm._old_buckets)
+        self.assertEqual(sorted(hm), list(range(7)))
+        for key in hm:
+            hm.get(key)
+
+    def _colliding_keys(self, blocks):
+        """Keys with equal polynomial hashes for every capacity ("Aa" and "BB" hash alike)"""
+        return ["uploads/" + "".join(parts) for parts in product(("Aa", "BB"), repeat=blocks)]
+
+    def _max_chain_length(self, hm):
+        longest = 0
+        for bucket in hm.buckets:
+            length = 0
+            while bucket:
+                length += 1
+                bucket = bucket.next
+            longest = max(longest, length)
+        return longest
+
+    def test_hash_modes_share_semantics(self):
+        """Test every hash mode supports the same operations."""
+        for mode in ("keyed", "seeded", "polynomial"):
+            hm = HashMap(4, hash_mode=mode)
+            for i in range(50):
+                hm.put(f"key{i}", i)
+            hm.put(7, "int key")
+            self.assertTrue(hm.remove("key3"))
+            self.assertEqual(len(hm), 50, mode)
+            self.assertEqual(hm.get("key49"), 49, mode)
+            self.assertEqual(hm.get(7), "int key", mode)
+            self.assertIsNone(hm.get("key3"), mode)
+
+        with self.assertRaises(ValueError):
+            HashMap(hash_mode="md5")
+
+    def test_keyed_hash_resists_crafted_collisions(self):
+        """Test crafted keys share one chain under the polynomial hash but not when keyed."""
+        keys = self._colliding_keys(8)
+        polynomial = HashMap(hash_mode="polynomial")
+        keyed = HashMap()
+        for key in keys:
+            polynomial.put(key, key)
+            keyed.put(key, key)
+
+        self.assertEqual(self._max_chain_length(polynomial), len(keys))
+        self.assertLess(self._max_chain_length(keyed), 10)
+        self.assertEqual(keyed.get(keys[-1]), keys[-1])
+
+    def test_stats(self):
+        """Test stats reports shape, resize history and memory."""
+        hm = HashMap(4)
+        for i in range(10):
+            hm.put(f"key{i}", i)
+        stats = hm.stats()
+
+        self.assertEqual(stats["engine"], "HashMap")
+        self.assertEqual(stats["capacity"], 16)
+        self.assertEqual(stats["size"], 10)
+        self.assertAlmostEqual(stats["load_factor"], 10 / 16)
+        self.assertEqual(sum(stats["chain_length_histogram"].values()), 16)
+        self.assertEqual(
+            sum(length * count for length, count in stats["chain_length_histogram"].items()), 10
+        )
+        self.assertEqual(stats["max_chain_length"], max(stats["chain_length_histogram"]))
+        self.assertEqual(stats["resize_count"], 2)
+        self.assertGreater(stats["rehash_seconds"], 0)
+        self.assertGreater(stats["memory_bytes"], 0)
+        self.assertIsNone(stats["avg_probes_per_lookup"])
+
+    def test_probe_counters(self):
+        """Test probe counters only instrument lookups while enabled."""
+        small_map = HashMap(1)
+        small_map.buckets = [None]  # Single bucket: every key shares one chain
+        small_map.load_factor = 10
+        for key in ("a", "b", "c"):
+            small_map.put(key, key)
+
+        self.assertNotIn("get", small_map.__dict__)
+        small_map.enable_probe_counters()
+        self.assertEqual(small_map.get("c"), "c")
+        self.assertTrue(small_map.contains("a"))
+        self.assertFalse(small_map.contains("missing"))
+        stats = small_map.stats()
+        self.assertEqual(stats["lookups"], 3)
+        self.assertEqual(stats["probes"], 3 + 1 + 3)
+
+        small_map.disable_probe_counters()
+        self.assertNotIn("get", small_map.__dict__)
+        self.assertIsNone(small_map.stats()["lookups"])
+
+    def test_shrinks_after_mass_removal(self):
+        """Test capacity follows the live size down, but not below the initial capacity."""
+        hm = HashMap()
+        for i in range(1000):
+            hm.put(i, i)
+        peak_capacity = hm.capacity
+        for i in range(990):
+            hm.remove(i)
+
+        self.assertLess(hm.capacity, peak_capacity)
+        self.assertEqual(hm.capacity, 64)  # 10/64 is still above the 0.125 low-water mark
+        self.assertEqual(sorted(hm), list(range(990, 1000)))
+
+        for i in range(990, 1000):
+            hm.remove(i)
+        self.assertEqual(hm.capacity, 16)
+
+    def test_shrink_hysteresis(self):
+        """Test alternating put/remove around a threshold does not resize every time."""
+        hm = HashMap()
+        for i in range(200):
+            hm.put(i, i)
+        for i in range(170):
+            hm.remove(i)
+        resizes = hm.stats()["resize_count"]
+        for i in range(100):
+            hm.put("extra", i)
+            hm.remove("extra")
+        self.assertEqual(hm.stats()["resize_count"], resizes)
+
+    def test_shrinking_disabled_and_compact(self):
+        """Test shrink_load_factor=None keeps the peak capacity until compact()."""
+        hm = HashMap(shrink_load_factor=None)
+        for i in range(1000):
+            hm.put(i, i)
+        for i in range(999):
+            hm.remove(i)
+        self.assertEqual(hm.capacity, 2048)
+
+        hm.compact()
+        self.assertEqual(hm.capacity, 16)
+        self.assertEqual(hm.get(999), 999)
+        self.assertEqual(len(hm), 1)
+
 
 class TestNode(TestCase):
     """Test the Node class."""
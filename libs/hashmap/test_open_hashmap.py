@@ -0,0 +1,179 @@
+from django.test import TestCase
+from .open_hashmap import OpenHashMap, _DELETED, _EMPTY
+
+
+class TestOpenHashMap(TestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.hashmap = OpenHashMap()
+
+    def test_initialization(self):
+        """Test capacity is rounded up to a power of two."""
+        self.assertEqual(OpenHashMap().capacity, 16)
+        self.assertEqual(OpenHashMap(20).capacity, 32)
+        self.assertEqual(OpenHashMap(1).capacity, 8)
+        self.assertEqual(len(OpenHashMap()), 0)
+
+    def test_put_get_update(self):
+        """Test basic put, get and update operations."""
+        self.hashmap.put("key1", "value1")
+        self.hashmap.put(123, "numeric_key")
+        self.assertEqual(self.hashmap.get("key1"), "value1")
+        self.assertEqual(self.hashmap.get(123), "numeric_key")
+
+        self.hashmap.put("key1", "updated")
+        self.assertEqual(self.hashmap.get("key1"), "updated")
+        self.assertEqual(len(self.hashmap), 2)
+        self.assertIsNone(self.hashmap.get("nonexistent"))
+
+    def test_remove_and_contains(self):
+        """Test remove and contains, including the None-value case."""
+        self.assertFalse(self.hashmap.remove("missing"))
+        self.hashmap.put("key1", None)
+        self.assertTrue(self.hashmap.contains("key1"))
+        self.assertTrue(self.hashmap.remove("key1"))
+        self.assertFalse(self.hashmap.contains("key1"))
+        self.assertFalse(self.hashmap.remove("key1"))
+        self.assertEqual(len(self.hashmap), 0)
+
+    def test_tombstone_keeps_probe_chain(self):
+        """Test keys past a removed slot stay reachable and tombstones are reused."""
+        # Integers hash to themselves, so these all start probing at slot 0
+        hm = OpenHashMap(8)
+        hm.put(0, "a")
+        hm.put(8, "b")
+        hm.put(16, "c")
+
+        self.assertTrue(hm.remove(8))
+        self.assertIn(_DELETED, hm._keys)
+        self.assertEqual(hm.get(16), "c")
+
+        # Re-inserting lands in the tombstone instead of consuming a fresh slot
+        used_before = hm._used
+        hm.put(24, "d")
+        self.assertEqual(hm._used, used_before)
+        self.assertEqual(hm.get(24), "d")
+        self.assertEqual(hm.get(0), "a")
+
+    def test_resize_preserves_entries(self):
+        """Test growth keeps every entry and drops tombstones."""
+        hm = OpenHashMap(8)
+        for i in range(100):
+            hm.put(f"key{i}", i)
+        for i in range(0, 100, 2):
+            hm.remove(f"key{i}")
+        for i in range(100, 200):
+            hm.put(f"key{i}", i)
+
+        self.assertEqual(len(hm), 150)
+        self.assertLessEqual(hm._used / hm.capacity, hm.load_factor)
+        for i in range(1, 200):
+            expected = None if i < 100 and i % 2 == 0 else i
+            self.assertEqual(hm.get(f"key{i}"), expected)
+
+    def test_churn_does_not_grow_unbounded(self):
+        """Test repeated put/remove cycles rebuild in place instead of growing."""
+        hm = OpenHashMap(16)
+        for i in range(1000):
+            hm.put(i, i)
+            hm.remove(i)
+        self.assertEqual(hm.capacity, 16)
+        self.assertEqual(len(hm), 0)
+
+    def test_keys_values_items(self):
+        """Test list-returning accessors skip empty and deleted slots."""
+        self.assertEqual(list(self.hashmap.items()), [])
+        self.hashmap.put("key1", "value1")
+        self.hashmap.put("key2", "value2")
+        self.hashmap.put("key3", "value3")
+        self.hashmap.remove("key2")
+
+        self.assertCountEqual(self.hashmap.keys(), ["key1", "key3"])
+        self.assertCountEqual(self.hashmap.values(), ["value1", "value3"])
+        self.assertCountEqual(self.hashmap.items(), [("key1", "value1"), ("key3", "value3")])
+        self.assertNotIn(_EMPTY, self.hashmap.keys())
+
+    def test_str(self):
+        """Test __str__ method."""
+        self.assertEqual(str(self.hashmap), "{}")
+        self.hashmap.put("key1", "value1")
+        self.assertEqual(str(self.hashmap), "{key1: value1}")
+
+    def test_from_items_and_get_many(self):
+        """Test bulk construction and batch lookups."""
+        hm = OpenHashMap.from_items((f"key{i}", i) for i in range(100))
+        self.assertEqual(len(hm), 100)
+        self.assertEqual(hm.capacity, 256)
+        self.assertEqual(hm.get_many(["key0", "key99", "missing"], default=-1), [0, 99, -1])
+
+    def test_put_many_with_tombstones_and_updates(self):
+        """Test put_many reuses tombstones and updates existing keys."""
+        hm = OpenHashMap(8)
+        hm.put_many([(0, "a"), (8, "b")])
+        hm.remove(0)
+        hm.put_many([(8, "updated"), (16, "c")])
+        self.assertEqual(len(hm), 2)
+        self.assertEqual(hm.get(8), "updated")
+        self.assertEqual(hm.get(16), "c")
+        self.assertFalse(hm.contains(0))
+
+    def test_put_many_with_low_expected_size(self):
+        """Test an underestimated expected_size still keeps the load factor."""
+        hm = OpenHashMap(8)
+        hm.put_many(((i, i) for i in range(1000)), expected_size=1)
+        self.assertEqual(len(hm), 1000)
+        self.assertLessEqual(hm._used / hm.capacity, hm.load_factor)
+        self.assertEqual(hm.get_many(range(1000)), list(range(1000)))
+
+    def test_mapping_protocol_and_views(self):
+        """Test the mapping protocol, live views and modification detection."""
+        self.hashmap["key1"] = "value1"
+        keys = self.hashmap.keys()
+        self.hashmap["key2"] = "value2"
+        self.assertEqual(len(keys), 2)
+        self.assertEqual(self.hashmap["key2"], "value2")
+        self.assertCountEqual(self.hashmap.item_list(), [("key1", "value1"), ("key2", "value2")])
+        with self.assertRaises(KeyError):
+            self.hashmap["missing"]
+
+        with self.assertRaises(RuntimeError):
+            for key in self.hashmap:
+                del self.hashmap[key]
+
+    def test_stats(self):
+        """Test stats reports probe lengths, tombstones and resizes."""
+        hm = OpenHashMap(8)
+        for i in range(20):
+            hm.put(i, i)
+        hm.remove(0)
+        hm.enable_probe_counters()
+        hm.get(5)
+        stats = hm.stats()
+
+        self.assertEqual(stats["size"], 19)
+        self.assertEqual(stats["tombstones"], 1)
+        self.assertEqual(sum(stats["chain_length_histogram"].values()), 19)
+        self.assertEqual(stats["resize_count"], 2)
+        self.assertEqual(stats["lookups"], 1)
+        self.assertGreaterEqual(stats["probes"], 1)
+
+    def test_shrink_and_compact(self):
+        """Test automatic shrinking and tombstone-purging compaction."""
+        hm = OpenHashMap()
+        for i in range(1000):
+            hm.put(i, i)
+        for i in range(995):
+            hm.remove(i)
+        self.assertEqual(hm.capacity, 32)
+        self.assertEqual(hm.get_many(range(995, 1000)), list(range(995, 1000)))
+
+        fixed = OpenHashMap(shrink_load_factor=None)
+        fixed.put_many((i, i) for i in range(100))
+        for i in range(50):
+            fixed.remove(i)
+        self.assertEqual(fixed.stats()["tombstones"], 50)
+        fixed.compact()
+        self.assertEqual(fixed.stats()["tombstones"], 0)
+        self.assertEqual(fixed.capacity, 256)
+        self.assertEqual(sorted(fixed), list(range(50, 100)))
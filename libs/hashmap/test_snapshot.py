@@ -0,0 +1,79 @@
+import os
+import tempfile
+
+from django.test import TestCase
+
+from .hashmap import HashMap
+from .open_hashmap import OpenHashMap
+from .snapshot import SNAPSHOT_VERSION, SnapshotError, load_snapshot, save_snapshot
+
+
+class TestHashMapSnapshot(TestCase):
+
+    def setUp(self):
+        """Create a scratch directory for snapshot files."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "map.snap")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        """Test every entry survives a save and a mapped load."""
+        hashmap = HashMap.from_items(
+            [(f"folder_{i}/file_{i}.pdf", {"size": i, "tags": ["a", None]}) for i in range(500)]
+        )
+        save_snapshot(hashmap, self.path)
+
+        with load_snapshot(self.path) as mapped:
+            self.assertEqual(len(mapped), 500)
+            self.assertEqual(mapped.get("folder_7/file_7.pdf"), {"size": 7, "tags": ["a", None]})
+            self.assertIsNone(mapped.get("missing"))
+            self.assertIn("folder_499/file_499.pdf", mapped)
+            self.assertEqual(dict(mapped.item_list()), dict(hashmap.item_list()))
+
+            copy = mapped.to_hashmap(OpenHashMap)
+            self.assertIsInstance(copy, OpenHashMap)
+            self.assertEqual(copy.get("folder_0/file_0.pdf"), {"size": 0, "tags": ["a", None]})
+
+    def test_empty_map(self):
+        """Test an empty map produces a valid snapshot."""
+        save_snapshot(HashMap(), self.path)
+        with load_snapshot(self.path) as mapped:
+            self.assertEqual(len(mapped), 0)
+            self.assertEqual(mapped.item_list(), [])
+
+    def test_read_only(self):
+        """Test a mapped snapshot rejects writes."""
+        save_snapshot(HashMap.from_items([("a", 1)]), self.path)
+        with load_snapshot(self.path) as mapped:
+            with self.assertRaises(TypeError):
+                mapped["b"] = 2
+
+    def test_corruption_detected(self):
+        """Test a flipped byte fails the checksum unless verification is skipped."""
+        save_snapshot(HashMap.from_items([("a", "value")]), self.path)
+        with open(self.path, "r+b") as snapshot_file:
+            snapshot_file.seek(-2, os.SEEK_END)
+            snapshot_file.write(b"X")
+
+        with self.assertRaisesRegex(SnapshotError, "checksum"):
+            load_snapshot(self.path)
+        load_snapshot(self.path, verify=False).close()
+
+    def test_version_mismatch(self):
+        """Test snapshots from another format version are rejected."""
+        save_snapshot(HashMap.from_items([("a", 1)]), self.path)
+        with open(self.path, "r+b") as snapshot_file:
+            snapshot_file.seek(8)
+            snapshot_file.write((SNAPSHOT_VERSION + 1).to_bytes(2, "little"))
+
+        with self.assertRaisesRegex(SnapshotError, "version"):
+            load_snapshot(self.path)
+
+    def test_not_a_snapshot(self):
+        """Test arbitrary files are rejected."""
+        with open(self.path, "wb") as snapshot_file:
+            snapshot_file.write(b"hello world" * 10)
+        with self.assertRaises(SnapshotError):
+            load_snapshot(self.path)
@@ -0,0 +1,111 @@
+_MISSING = object()
+
+
+class _HashMapView:
+    """Live, non-copying view over a hashmap's entries"""
+    __slots__ = ('_map',)
+
+    def __init__(self, hashmap):
+        self._map = hashmap
+
+    def __len__(self):
+        return len(self._map)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({list(self)!r})"
+
+
+class KeysView(_HashMapView):
+    """Lazy view of the keys of a hashmap"""
+    __slots__ = ()
+
+    def __iter__(self):
+        for key, _ in self._map._iter_entries():
+            yield key
+
+    def __contains__(self, key):
+        return self._map.contains(key)
+
+
+class ValuesView(_HashMapView):
+    """Lazy view of the values of a hashmap"""
+    __slots__ = ()
+
+    def __iter__(self):
+        for _, value in self._map._iter_entries():
+            yield value
+
+    def __contains__(self, value):
+        return any(item is value or item == value for item in self)
+
+
+class ItemsView(_HashMapView):
+    """Lazy view of the (key, value) pairs of a hashmap"""
+    __slots__ = ()
+
+    def __iter__(self):
+        return self._map._iter_entries()
+
+    def __contains__(self, item):
+        key, value = item
+        found = self._map.get(key, _MISSING)
+        return found is not _MISSING and (found is value or found == value)
+
+
+class MappingMixin:
+    """
+    Mapping protocol and live views for hashmap engines
+
+    Engines provide get(key, default), put, remove, contains, __len__ and
+    _iter_entries(), a generator of (key, value) pairs that raises RuntimeError
+    when the map is structurally modified while it is being iterated.
+    """
+
+    def keys(self):
+        """Return a live view of all keys"""
+        return KeysView(self)
+
+    def values(self):
+        """Return a live view of all values"""
+        return ValuesView(self)
+
+    def items(self):
+        """Return a live view of all key-value pairs as tuples"""
+        return ItemsView(self)
+
+    def key_list(self):
+        """Return list of all keys"""
+        return [key for key, _ in self._iter_entries()]
+
+    def value_list(self):
+        """Return list of all values"""
+        return [value for _, value in self._iter_entries()]
+
+    def item_list(self):
+        """Return list of all key-value pairs as tuples"""
+        return list(self._iter_entries())
+
+    def __iter__(self):
+        """Iterate over keys"""
+        for key, _ in self._iter_entries():
+            yield key
+
+    def __contains__(self, key):
+        return self.contains(key)
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self.put(key, value)
+
+    def __delitem__(self, key):
+        if not self.remove(key):
+            raise KeyError(key)
+
+    def __str__(self):
+        """String representation of hashmap"""
+        return '{' + ', '.join(f'{k}: {v}' for k, v in self._iter_entries()) + '}'